@@ -5,7 +5,6 @@ Also includes utility for setting up colored logging and a dictionary of emojis
 import os
 from pathlib import Path
 import logging
-import colorlog
 
 IN_DOCKER = os.path.exists('/.dockerenv')
 if IN_DOCKER:
@@ -24,7 +23,26 @@ DASHY_DOCKER_ICON_TEMPLATE = os.getenv("DASHY_DOCKER_ICON_TEMPLATE", "hl-{name}"
 DASHY_DOCKER_LABEL_REGEX = os.getenv("DASHY_DOCKER_LABEL_REGEX", r"^(?:dashy$|dashy\..+)")
 DASHY_DOCKER_PORT_LABEL_REGEX = os.getenv("DASHY_DOCKER_PORT_LABEL_REGEX", r"^dashy\.port$")
 DASHY_DOCKER_IGNORE_LABEL_REGEX = os.getenv("DASHY_DOCKER_IGNORE_LABEL_REGEX", r"^dashy\.ignore$")
+# Labels routing a container's entry to another section, or to another config file next to DASHY_CONFIG_PATH.
+DASHY_DOCKER_SECTION_LABEL = os.getenv("DASHY_DOCKER_SECTION_LABEL", "dashy.section")
+DASHY_DOCKER_FILE_LABEL = os.getenv("DASHY_DOCKER_FILE_LABEL", "dashy.file")
 DASHY_EXPOSED_BY_DEFAULT = os.getenv("DASHY_EXPOSED_BY_DEFAULT", "false").lower() == "true"
+DASHY_DOCKER_DAEMON_FILTERS = os.getenv("DASHY_DOCKER_DAEMON_FILTERS", "true").lower() == "true"
+DASHY_DOCKER_LABEL_FILTER = os.getenv("DASHY_DOCKER_LABEL_FILTER", "")
+# Publish one entry per Swarm service (from service labels and published ports) instead of per container.
+DASHY_SWARM_MODE = os.getenv("DASHY_SWARM_MODE", "false").lower() == "true"
+DASHY_ASYNC_RUNTIME = os.getenv("DASHY_ASYNC_RUNTIME", "false").lower() == "true"
+DASHY_ASYNC_ENRICH_CONCURRENCY = int(os.getenv("DASHY_ASYNC_ENRICH_CONCURRENCY", "8"))
+DASHY_FLUSH_INTERVAL_MS = int(os.getenv("DASHY_FLUSH_INTERVAL_MS", "500"))
+DASHY_FLUSH_MAX_BATCH = int(os.getenv("DASHY_FLUSH_MAX_BATCH", "100"))
+DASHY_RESYNC_INTERVAL_SECONDS = int(os.getenv("DASHY_RESYNC_INTERVAL_SECONDS", "300"))
+DASHY_METRICS_PORT = int(os.getenv("DASHY_METRICS_PORT", "0"))
+DASHY_METRICS_ADDRESS = os.getenv("DASHY_METRICS_ADDRESS", "0.0.0.0")
+# Container fingerprints from the last run, next to the Dashy config by default; empty disables it.
+DASHY_STATE_PATH = os.getenv("DASHY_STATE_PATH", str(DASHY_CONFIG_PATH.parent / ".dashy-docker-sync-state.json"))
+DASHY_DOCKER_WORKERS = int(os.getenv("DASHY_DOCKER_WORKERS", "8"))
+DASHY_EVENT_COALESCE_MS = int(os.getenv("DASHY_EVENT_COALESCE_MS", "250"))
+DASHY_REMOVAL_GRACE_SECONDS = float(os.getenv("DASHY_REMOVAL_GRACE_SECONDS", "30"))
 
 EMOJIS = {
     'DEBUG': '🐛',
@@ -47,6 +65,8 @@ EMOJIS = {
 
 def setup_logging():
     """Configures logging with colorlog and a custom format."""
+    import colorlog
+
     log_level_app = getattr(logging, DASHY_LOG_LEVEL, logging.INFO)
     
     logger = logging.getLogger()
@@ -0,0 +1,429 @@
+"""
+asyncio-based runtime that talks to the Docker Engine API directly over its socket.
+
+Event reading, container enrichment and config commits run as separate tasks connected
+by queues, so a slow inspect call or config write never stalls the event stream:
+
+    event reader --> enrich queues (one per worker) --> enrich workers --> write queue --> writer
+
+Events are sharded over the enrich workers by container ID, which bounds the number of
+concurrent inspect calls while keeping the events of one container in order.
+Enabled with DASHY_ASYNC_RUNTIME=true.
+"""
+import asyncio
+import functools
+import json
+import logging
+import signal
+import time
+from urllib.parse import urlencode, quote
+
+from .app_config import (
+    DASHY_ASYNC_ENRICH_CONCURRENCY,
+    DASHY_FLUSH_INTERVAL_MS,
+    DASHY_REMOVAL_GRACE_SECONDS,
+    DASHY_RESET_ON_START,
+    DASHY_RESYNC_INTERVAL_SECONDS,
+    DASHY_STATE_PATH,
+    EMOJIS
+)
+from .dashy_config import (
+    load_initial_config,
+    flush_config,
+    update_entry,
+    remove_entry,
+    reconcile,
+    write_stats
+)
+from .docker_utils import (
+    DOCKER_SOCKET,
+    DOCKER_EVENT_ACTIONS,
+    DOCKER_EVENT_ATTRIBUTE_KEYS,
+    ContainerView,
+    inspect_port_bindings,
+    docker_host_name,
+    get_container_info,
+    get_container_port,
+    get_event_filters,
+    get_list_filters,
+    reconnect_delay
+)
+from . import metrics
+from .event_queue import EventCursor
+from .scheduler import Scheduler
+from .snapshot import ContainerSnapshot
+
+QUEUE_MAX_SIZE = 1000
+
+class AsyncDockerError(Exception):
+    """Raised when the Docker API answers with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+class AsyncDockerClient:
+    """
+    A minimal asyncio HTTP/1.1 client for the few Docker Engine API calls the sync uses.
+
+    Supports `unix://` sockets (the default) and plain `tcp://` daemons. Every request
+    uses its own connection, which keeps the long-lived event stream independent of
+    the short inspect and list calls.
+    """
+
+    def __init__(self, base_url=DOCKER_SOCKET):
+        self.base_url = base_url
+        if base_url.startswith("unix://"):
+            path = base_url[len("unix://"):]
+            self._unix_path = path if path.startswith("/") else "/" + path
+        elif base_url.startswith(("tcp://", "http://")):
+            host, _, port = base_url.split("://", 1)[1].rstrip("/").partition(":")
+            self._unix_path = None
+            self._tcp_address = (host, int(port or 2375))
+        else:
+            raise ValueError(f"Unsupported Docker URL for the async runtime: {base_url}")
+
+    async def _open(self):
+        if self._unix_path:
+            return await asyncio.open_unix_connection(self._unix_path)
+        return await asyncio.open_connection(*self._tcp_address)
+
+    async def _request(self, path, params=None):
+        reader, writer = await self._open()
+        query = f"?{urlencode(params)}" if params else ""
+        writer.write(f"GET {path}{query} HTTP/1.1\r\nHost: docker\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            writer.close()
+            raise ConnectionError("Docker API closed the connection without a response")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        return status, headers, reader, writer
+
+    @staticmethod
+    async def _iter_body(headers, reader):
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await reader.readline()
+                if not size_line:
+                    return
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    await reader.readline()
+                    return
+                chunk = await reader.readexactly(size)
+                await reader.readexactly(2)
+                yield chunk
+        elif "content-length" in headers:
+            yield await reader.readexactly(int(headers["content-length"]))
+        else:
+            yield await reader.read()
+
+    async def _get_json(self, path, params=None):
+        status, headers, reader, writer = await self._request(path, params)
+        try:
+            body = b"".join([chunk async for chunk in self._iter_body(headers, reader)])
+        finally:
+            writer.close()
+        if status >= 400:
+            raise AsyncDockerError(status, body.decode(errors="replace").strip())
+        return json.loads(body) if body else None
+
+    async def ping(self):
+        status, headers, reader, writer = await self._request("/_ping")
+        writer.close()
+        if status >= 400:
+            raise AsyncDockerError(status, "ping failed")
+
+    async def list_containers(self, filters=None):
+        params = {"filters": _encode_filters(filters)} if filters else None
+        return await self._get_json("/containers/json", params)
+
+    async def inspect_container(self, container_id):
+        with metrics.DOCKER_API_SECONDS.time(call="containers.get"):
+            return await self._get_json(f"/containers/{quote(container_id)}/json")
+
+    async def events(self, filters=None, since=None, until=None):
+        """Yields decoded events until the daemon closes the stream (at `until`, if given)."""
+        params = {"filters": _encode_filters(filters)} if filters else {}
+        if since is not None:
+            params["since"] = str(since)
+        if until is not None:
+            params["until"] = str(until)
+        status, headers, reader, writer = await self._request("/events", params)
+        try:
+            if status >= 400:
+                body = b"".join([chunk async for chunk in self._iter_body(headers, reader)])
+                raise AsyncDockerError(status, body.decode(errors="replace").strip())
+            buffer = b""
+            async for chunk in self._iter_body(headers, reader):
+                buffer += chunk
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    if line.strip():
+                        yield json.loads(line)
+        finally:
+            writer.close()
+
+def _encode_filters(filters):
+    """Encodes filters the way the Engine API expects: a JSON map of string lists."""
+    return json.dumps({key: value if isinstance(value, list) else [value] for key, value in filters.items()})
+
+class AsyncRuntime:
+    """
+    Runs the startup scan and the event-driven sync on one asyncio event loop.
+
+    Attributes:
+        stats (dict): Event, commit and queue depth counters, including the current
+            and maximum depth of the enrich and write queues.
+    """
+
+    def __init__(self, client=None, concurrency=DASHY_ASYNC_ENRICH_CONCURRENCY, flush_interval_ms=DASHY_FLUSH_INTERVAL_MS,
+                 resync_interval=DASHY_RESYNC_INTERVAL_SECONDS, removal_grace=DASHY_REMOVAL_GRACE_SECONDS):
+        self.client = client or AsyncDockerClient()
+        self.resync_interval = max(0, resync_interval)
+        self.docker_host = docker_host_name(self.client.base_url)
+        self.concurrency = max(1, concurrency)
+        self.flush_interval = max(0, flush_interval_ms) / 1000
+        self.config = None
+        self.snapshot = ContainerSnapshot(DASHY_STATE_PATH)
+        self.removal_grace = max(0, removal_grace)
+        self.removals = Scheduler("removals")
+        self.enrich_queues = []
+        self.write_queue = None
+        self.stats = {
+            "events": 0,
+            "commits": 0,
+            "enrich_queue_depth": 0,
+            "enrich_queue_max_depth": 0,
+            "write_queue_depth": 0,
+            "write_queue_max_depth": 0,
+        }
+
+    def _record_depths(self):
+        enrich_depth = sum(q.qsize() for q in self.enrich_queues)
+        write_depth = self.write_queue.qsize()
+        self.stats["enrich_queue_depth"] = enrich_depth
+        self.stats["write_queue_depth"] = write_depth
+        self.stats["enrich_queue_max_depth"] = max(self.stats["enrich_queue_max_depth"], enrich_depth)
+        self.stats["write_queue_max_depth"] = max(self.stats["write_queue_max_depth"], write_depth)
+
+    async def startup_scan(self):
+        """Loads the config and reconciles it with the running containers in one write."""
+        logging.info(f"{EMOJIS['CONFIG']} Loading and initializing Dashy config...")
+        self.config = load_initial_config()
+        logging.info(f"{EMOJIS['SCAN']} Scanning existing containers on startup...")
+        await self.resync()
+        startup_seconds = metrics.observe_startup()
+        if startup_seconds is not None:
+            logging.info(f"{EMOJIS['SUCCESS']} First commit {startup_seconds * 1000:.0f} ms after process start")
+
+    async def resync(self):
+        """
+        Reconciles the config with the running containers, writing only the differences.
+
+        Pending events are applied first, so the scan never races an older event.
+        """
+        for queue in self.enrich_queues:
+            await queue.join()
+        if self.write_queue is not None:
+            await self.write_queue.join()
+
+        scan_started = time.monotonic()
+        writes_before_scan = write_stats["writes"]
+        with metrics.DOCKER_API_SECONDS.time(call="containers.list"):
+            summaries = await self.client.list_containers(get_list_filters()) or []
+        infos = self.snapshot.evaluate(self.docker_host, [ContainerView.from_summary(s) for s in summaries])
+        counts = await asyncio.to_thread(self._reconcile, infos)
+        logging.info(
+            f"{EMOJIS['SUCCESS']} Scan finished in {(time.monotonic() - scan_started) * 1000:.0f} ms: "
+            f"{len(summaries)} containers, {len(infos)} included, "
+            f"{counts['added']} added, {counts['updated']} updated, {counts['removed']} removed, "
+            f"{write_stats['writes'] - writes_before_scan} config write(s)"
+        )
+
+    def _reconcile(self, infos):
+        for info in infos:
+            self.removals.cancel(info["name"])
+        counts = reconcile(
+            self.config, infos, self.docker_host, prune=DASHY_RESET_ON_START, pending_removals=self.removals.keys()
+        )
+        flush_config()
+        self.snapshot.save()
+        return counts
+
+    async def read_events(self):
+        """
+        Reads the event stream, reconnecting on errors, and shards events to the workers.
+
+        Every resync_interval seconds the stream ends, the containers are rescanned and
+        a new stream resumes where the previous one ended. After an error the stream is
+        reopened after a jittered exponential backoff and replays the events since the
+        last one read, skipping those already seen.
+        """
+        event_filters = get_event_filters()
+        cursor = EventCursor()
+        since = None
+        failures = 0
+        while True:
+            until = int(time.time()) + self.resync_interval if self.resync_interval else None
+            try:
+                logging.info(f"{EMOJIS['EVENT']} Listening for Docker events (async runtime, daemon filters: {event_filters or 'none'})...")
+                async for event in self.client.events(event_filters, since=since, until=until):
+                    failures = 0
+                    if not cursor.advance(event):
+                        continue
+                    if event.get("Type") == "container":
+                        metrics.EVENTS_RECEIVED.inc(action=event.get("Action"))
+                    if event.get("Type") != "container" or event.get("Action") not in DOCKER_EVENT_ACTIONS:
+                        if event.get("Type") == "container":
+                            metrics.EVENTS_FILTERED.inc(action=event.get("Action"), reason="action")
+                        logging.debug(f"{EMOJIS['EVENT']} Ignoring event: Type={event.get('Type')}, Action={event.get('Action')}")
+                        continue
+                    self.stats["events"] += 1
+                    container_id = (event.get("Actor") or {}).get("ID") or event.get("id", "")
+                    await self.enrich_queues[hash(container_id) % self.concurrency].put(event)
+                    self._record_depths()
+                if until is not None and time.time() >= until:
+                    logging.debug(f"{EMOJIS['SCAN']} Periodic resync")
+                    await self.resync()
+                    failures = 0
+                    cursor.skip_to(until * 1_000_000_000)
+                    since = cursor.resume()
+                    continue
+                logging.warning(f"{EMOJIS['NETWORK']} Docker event stream closed. Reconnecting...")
+            except (OSError, ConnectionError, AsyncDockerError, asyncio.IncompleteReadError, ValueError) as e:
+                logging.error(f"{EMOJIS['FAILURE']} Docker event stream error: {e}. Reconnecting...")
+            since = cursor.resume()
+            metrics.DOCKER_RECONNECTS.inc(docker_host=self.docker_host)
+            await asyncio.sleep(reconnect_delay(failures))
+            failures += 1
+            try:
+                await self.resync()
+            except (OSError, ConnectionError, AsyncDockerError, asyncio.IncompleteReadError, ValueError) as e:
+                logging.error(f"{EMOJIS['FAILURE']} Resync after reconnect failed: {e}")
+
+    async def enrich(self, queue):
+        """Turns events into entry updates, inspecting a container only when its port is needed."""
+        while True:
+            event = await queue.get()
+            try:
+                operation = await self._enrich_event(event)
+                if operation:
+                    await self.write_queue.put(operation)
+                    self._record_depths()
+            except Exception as e:
+                logging.error(f"{EMOJIS['FAILURE']} Failed to process event {event.get('Action')} for {event.get('id')}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _enrich_event(self, event):
+        actor = event.get("Actor") or {}
+        container_id = actor.get("ID") or event.get("id")
+        attributes = actor.get("Attributes") or {}
+        name = attributes.get("name")
+        if not name:
+            try:
+                name = ((await self.client.inspect_container(container_id)) or {}).get("Name", "").lstrip("/")
+            except AsyncDockerError as e:
+                logging.warning(f"{EMOJIS['WARNING']} Container not found for ID: {container_id} ({e})")
+                metrics.EVENTS_FILTERED.inc(action=event.get("Action"), reason="not_found")
+                return None
+
+        if event.get("Action") != "start":
+            return ("remove", name, event.get("timeNano"))
+
+        labels = {k: v for k, v in attributes.items() if k not in DOCKER_EVENT_ATTRIBUTE_KEYS}
+        container = ContainerView(None, container_id, name, labels, ports={})
+        info = get_container_info(container)
+        if info and not info.get("port"):
+            # No port label: this is the only case that needs an inspect round trip.
+            try:
+                attrs = await self.client.inspect_container(container_id) or {}
+                container.ports = inspect_port_bindings(attrs)
+                info["port"] = get_container_port(container)
+            except AsyncDockerError as e:
+                logging.warning(f"{EMOJIS['WARNING']} Container {name} vanished before its ports could be inspected ({e})")
+        if not info:
+            metrics.EVENTS_FILTERED.inc(action="start", reason="labels")
+            return None
+        info["docker_host"] = self.docker_host
+        return ("update", info, event.get("timeNano"))
+
+    async def write(self):
+        """Applies entry updates in batches, one commit per DASHY_FLUSH_INTERVAL_MS window."""
+        while True:
+            batch = [await self.write_queue.get()]
+            if self.flush_interval:
+                await asyncio.sleep(self.flush_interval)
+            while not self.write_queue.empty():
+                batch.append(self.write_queue.get_nowait())
+            self._record_depths()
+            await asyncio.to_thread(self._commit, batch)
+            self.stats["commits"] += 1
+            for _ in batch:
+                self.write_queue.task_done()
+            logging.debug(
+                f"{EMOJIS['SAVE']} Committed {len(batch)} change(s); queue depths: "
+                f"enrich={self.stats['enrich_queue_depth']} (max {self.stats['enrich_queue_max_depth']}), "
+                f"write={self.stats['write_queue_depth']} (max {self.stats['write_queue_max_depth']})"
+            )
+
+    def _commit(self, batch):
+        for operation, payload, event_time_ns in batch:
+            if operation == "update":
+                if self.removals.cancel(payload["name"]):
+                    metrics.REMOVALS_CANCELLED.inc(docker_host=self.docker_host)
+                update_entry(self.config, payload, event_time_ns=event_time_ns)
+            else:
+                # Removed after the grace period, unless the container starts again first.
+                removal = functools.partial(remove_entry, self.config, payload, self.docker_host, event_time_ns=event_time_ns)
+                self.removals.call_later(payload, self.removal_grace, removal)
+        flush_config()
+
+    async def run(self):
+        """Runs the startup scan, then the reader, enrich workers and writer until cancelled."""
+        self.enrich_queues = [asyncio.Queue(QUEUE_MAX_SIZE) for _ in range(self.concurrency)]
+        self.write_queue = asyncio.Queue(QUEUE_MAX_SIZE)
+        await self.client.ping()
+        logging.info(f"{EMOJIS['SUCCESS']} Docker API reachable at {self.client.base_url}.")
+        await self.startup_scan()
+
+        tasks = [asyncio.create_task(self.read_events(), name="event-reader")]
+        tasks += [asyncio.create_task(self.enrich(q), name=f"enrich-{i}") for i, q in enumerate(self.enrich_queues)]
+        tasks.append(asyncio.create_task(self.write(), name="writer"))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            flush_config()
+
+def run():
+    """Runs the async runtime until SIGINT/SIGTERM, flushing pending changes on the way out."""
+    async def _main():
+        main_task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, main_task.cancel)
+        try:
+            await AsyncRuntime().run()
+        except (OSError, AsyncDockerError) as e:
+            logging.error(f"{EMOJIS['FAILURE']} Failed to connect to Docker: {e}")
+            raise SystemExit(1)
+        except ValueError:
+            # An invalid entry template or config file; already logged by load_initial_config.
+            raise SystemExit(1)
+        except asyncio.CancelledError:
+            logging.info(f"\n{EMOJIS['SHUTDOWN']} Gracefully shutting down Dashy Docker Sync... Bye!\n")
+
+    asyncio.run(_main())
@@ -1,22 +1,298 @@
 """
 Manages loading, modifying, and saving the Dashy YAML configuration file.
 Includes logic for adding, updating, and removing container entries in a designated section.
+Containers can be routed to other sections, and to other config files next to
+DASHY_CONFIG_PATH, with labels; every file is tracked and written on its own.
 """
 import yaml
+import os
+import re
+import string
+import hashlib
+import bisect
+import errno
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from .app_config import (
     setup_logging,
     DASHY_CONFIG_PATH,
-    DASHY_RESET_ON_START,
     DASHY_DOCKER_SECTION_NAME,
     DASHY_DOCKER_URL_HOST,
     DASHY_DOCKER_TITLE_TEMPLATE,
     DASHY_DOCKER_URL_TEMPLATE,
     DASHY_DOCKER_ICON_TEMPLATE,
+    DASHY_FLUSH_INTERVAL_MS,
+    DASHY_FLUSH_MAX_BATCH,
     EMOJIS
 )
+from . import metrics
 import logging
 
+# Prefer the libyaml C bindings; they produce the same output as the pure-Python
+# implementation, which is used when PyYAML was built without libyaml.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+YAML_BACKEND = "libyaml" if YAML_DUMPER is not yaml.SafeDumper else "pure-python"
+
+# Write-behind state. Entry changes only mark the config dirty; the actual
+# save happens once per DASHY_FLUSH_INTERVAL_MS window or DASHY_FLUSH_MAX_BATCH changes.
+_write_lock = threading.RLock()
+# Configs with unwritten changes, keyed by the path of their file.
+_pending_configs = {}
+_pending_changes = 0
+_flush_timer = None
+write_stats = {"writes": 0, "coalesced": 0, "suppressed": 0, "bytes": 0}
+# Managed section indexes, keyed by (config file path, section name).
+_managed_sections = {}
+# Configs of the extra files containers are routed to with DASHY_DOCKER_FILE_LABEL, keyed by path.
+_routed_files = {}
+# Serialized YAML of unmanaged top-level values and sections, per config file and object id.
+# The sync never mutates these in place, so only the managed sections are re-emitted per write.
+_serialized_cache = {}
+# Content hash of what is currently on disk, per config file, to skip no-op writes.
+_file_digests = {}
+# (mtime, size, inode) of each config file as last read or written, to notice external edits.
+_file_stats = {}
+
+DOCKER_HOST_PLACEHOLDER = "{docker_host}"
+# Routed files must be plain YAML file names; they are always created next to DASHY_CONFIG_PATH.
+ROUTED_FILE_PATTERN = re.compile(r"^[\w-][\w.-]*\.ya?ml$")
+
+def managed_section_name(docker_host: str = ""):
+    """
+    Returns the name of the managed section for a Docker host.
+
+    Args:
+        docker_host (str): The host name, substituted for {docker_host} in DASHY_DOCKER_SECTION_NAME.
+
+    Returns:
+        str: The section name.
+    """
+    return DASHY_DOCKER_SECTION_NAME.replace(DOCKER_HOST_PLACEHOLDER, docker_host or "")
+
+def is_managed_section_name(name):
+    """Returns True if name is DASHY_DOCKER_SECTION_NAME, or one of its per-host names."""
+    if not isinstance(name, str):
+        return False
+    if DOCKER_HOST_PLACEHOLDER not in DASHY_DOCKER_SECTION_NAME:
+        return name == DASHY_DOCKER_SECTION_NAME
+    pattern = re.escape(DASHY_DOCKER_SECTION_NAME).replace(re.escape(DOCKER_HOST_PLACEHOLDER), ".+")
+    return re.fullmatch(pattern, name) is not None
+
+def target_section_name(container_info: dict):
+    """
+    Returns the name of the section a container's entry belongs in.
+
+    Args:
+        container_info (dict): The container info, with the optional 'section' routing
+            label value and 'docker_host'.
+
+    Returns:
+        str: The routed section (with {docker_host} substituted), or the host's managed section.
+    """
+    docker_host = container_info.get("docker_host", "")
+    section = container_info.get("section")
+    if section:
+        return section.replace(DOCKER_HOST_PLACEHOLDER, docker_host or "")
+    return managed_section_name(docker_host)
+
+def config_path(config: dict):
+    """Returns the path of the file the given config is written to."""
+    for path_key, routed_config in _routed_files.items():
+        if routed_config is config:
+            return Path(path_key)
+    return Path(DASHY_CONFIG_PATH)
+
+def get_target_config(config: dict, file_name: str = None):
+    """
+    Returns the config that entries routed to the given file belong in.
+
+    Routed files are loaded (or created) next to DASHY_CONFIG_PATH on first use and
+    kept in memory; they get no default Docker section.
+
+    Args:
+        config (dict): The main Dashy configuration.
+        file_name (str): The value of the container's file routing label, e.g. "team-a.yml".
+
+    Returns:
+        dict: The routed file's config, or config itself if file_name is empty or invalid.
+    """
+    if not file_name:
+        return config
+    if not ROUTED_FILE_PATTERN.match(file_name):
+        logging.warning(f"{EMOJIS['WARNING']} Ignoring invalid config file name '{file_name}'; using {DASHY_CONFIG_PATH}")
+        return config
+    path = Path(DASHY_CONFIG_PATH).parent / file_name
+    if path == Path(DASHY_CONFIG_PATH):
+        return config
+    with _write_lock:
+        routed_config = _routed_files.get(str(path))
+        if routed_config is None:
+            try:
+                routed_config = _routed_files[str(path)] = _read_config(path)
+            except ValueError:
+                # Not valid YAML; already logged. Never overwrite it.
+                return config
+        return routed_config
+
+def _managed_section_names(config: dict):
+    """Names of the sections of config that have a managed index, e.g. routed sections."""
+    return {name for (_, name), managed_section in _managed_sections.items() if managed_section.config is config}
+
+def _live_sections(config: dict):
+    """The current managed section indexes of config and of all routed files."""
+    configs = [config] + [c for c in _routed_files.values() if c is not config]
+    return [
+        managed_section for managed_section in list(_managed_sections.values())
+        if any(managed_section.config is c for c in configs) and managed_section.is_current(managed_section.config)
+    ]
+
+def new_docker_section(name: str):
+    """Returns a new, empty managed Docker section with the default icon and color."""
+    return {
+        "name": name,
+        "icon": "https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/svg/docker.svg",
+        "displayData": {"color": "#1D63ED"},
+        "items": []
+    }
+
+class ManagedSection:
+    """
+    In-memory index of the items in the managed Docker section.
+
+    Entries live in a title-keyed dict, with their order kept in a sorted list of
+    (title.lower(), title) keys maintained by bisect insertion, so upserts and removals
+    never rescan or re-sort the section. The section's "items" list in the YAML view is
+    only rebuilt from the index by render(), which happens when the config is flushed.
+
+    The Docker host that last wrote each entry is remembered in `owners`, so a host's
+    reconcile never removes entries of other hosts sharing the section. Entries loaded
+    from the file have no owner until a reconcile claims them.
+
+    With keep_loaded_order (for hand-written sections a `dashy.section` label routes
+    containers to), the items loaded from the file keep their order and the synced
+    entries are kept sorted after them, like untitled items are kept before them.
+
+    Args:
+        config (dict): The config the section belongs to.
+        section (dict): The section.
+        keep_loaded_order (bool): Whether to keep the loaded items in place instead of sorting them.
+    """
+
+    def __init__(self, config, section, keep_loaded_order=False):
+        self.config = config
+        self.section = section
+        self.owners = {}
+        self.reconciled_hosts = set()
+        self._entries = {}
+        self._order = []
+        self._untitled = []
+        # Loaded items kept in file order (keep_loaded_order); titled ones render their current entry.
+        self._pinned = []
+        self._pinned_titles = set()
+        for entry in section.get("items") or []:
+            if not isinstance(entry, dict):
+                continue
+            title = entry.get("title")
+            if keep_loaded_order:
+                if not title or title not in self._pinned_titles:
+                    self._pinned.append(entry)
+                if title:
+                    self._pinned_titles.add(title)
+                    self._entries[title] = entry
+            elif title:
+                self._entries[title] = entry
+            else:
+                self._untitled.append(entry)
+        self._order = sorted(self._sort_key(title) for title in self._entries if title not in self._pinned_titles)
+        self._rendered_items = section.get("items")
+        self.dirty = False
+
+    @staticmethod
+    def _sort_key(title):
+        return (title.lower(), title)
+
+    def is_current(self, config):
+        """True if this index still reflects the given config's managed section."""
+        return self.config is config and self.section.get("items") is self._rendered_items
+
+    def __contains__(self, title):
+        return title in self._entries
+
+    def __len__(self):
+        return len(self._entries) + len(self._untitled) + sum(1 for entry in self._pinned if not entry.get("title"))
+
+    def get(self, title):
+        return self._entries.get(title)
+
+    def upsert(self, entry, owner=None):
+        """Adds or replaces an entry by title, recording the Docker host that owns it."""
+        title = entry["title"]
+        if title not in self._entries:
+            bisect.insort(self._order, self._sort_key(title))
+        self._entries[title] = entry
+        if owner is not None:
+            self.owners[title] = owner
+        self.dirty = True
+
+    def upsert_many(self, entries, owner=None):
+        """Adds or replaces many entries, re-sorting the order once."""
+        added = False
+        for entry in entries:
+            added = added or entry["title"] not in self._entries
+            self._entries[entry["title"]] = entry
+            if owner is not None:
+                self.owners[entry["title"]] = owner
+        if added:
+            self._order = sorted(self._sort_key(title) for title in self._entries if title not in self._pinned_titles)
+        self.dirty = True
+
+    def remove(self, title):
+        """
+        Removes the entry with the given title.
+
+        Returns:
+            bool: True if an entry was removed.
+        """
+        if self._entries.pop(title, None) is None:
+            return False
+        self.owners.pop(title, None)
+        if title in self._pinned_titles:
+            self._pinned_titles.discard(title)
+            self._pinned = [entry for entry in self._pinned if entry.get("title") != title]
+        else:
+            del self._order[bisect.bisect_left(self._order, self._sort_key(title))]
+        self.dirty = True
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.owners.clear()
+        self._order.clear()
+        self._untitled.clear()
+        self._pinned.clear()
+        self._pinned_titles.clear()
+        self.dirty = True
+
+    def titles(self):
+        """Returns the titles of all titled entries."""
+        return list(self._entries)
+
+    def items(self):
+        """Returns the entries as a sorted list, as they appear in the YAML view."""
+        pinned = [self._entries[entry["title"]] if entry.get("title") else entry for entry in self._pinned]
+        return self._untitled + pinned + [self._entries[title] for _, title in self._order]
+
+    def render(self):
+        """Rebuilds the section's "items" list from the index if it changed."""
+        if self.dirty:
+            self._rendered_items = self.items()
+            self.section["items"] = self._rendered_items
+            self.dirty = False
+        return self._rendered_items
+
 def load_initial_config():
     """
     Loads the Dashy configuration from the path specified by DASHY_CONFIG_PATH.
@@ -25,14 +301,51 @@ def load_initial_config():
 
     Returns:
         dict: The loaded or initialized Dashy configuration.
+
+    Raises:
+        ValueError: If an entry template is invalid or the config file is not valid
+            YAML, so misconfigurations surface at startup instead of on the first
+            Docker event (or by overwriting the file).
+    """
+    try:
+        get_entry_templates()
+    except ValueError as e:
+        logging.error(f"{EMOJIS['FAILURE']} Invalid entry template: {e}")
+        raise
+    config = _read_config(DASHY_CONFIG_PATH)
+    existing_section = next((s for s in config["sections"] if s.get("name") == DASHY_DOCKER_SECTION_NAME), None)
+    # Per-host sections ({docker_host} in the name) are created as their hosts report containers.
+    if not existing_section and DOCKER_HOST_PLACEHOLDER not in DASHY_DOCKER_SECTION_NAME:
+        logging.info(f"{EMOJIS['ADD']} Creating new section in config: {DASHY_DOCKER_SECTION_NAME}")
+        config["sections"].append(new_docker_section(DASHY_DOCKER_SECTION_NAME))
+    return config
+
+def _read_config(path: Path):
     """
-    if DASHY_CONFIG_PATH.exists():
-        logging.info(f"{EMOJIS['CONFIG']} Loading config from {DASHY_CONFIG_PATH}")
+    Loads a Dashy configuration file, or a default configuration if it is missing or unreadable.
+
+    Args:
+        path (Path): The config file.
+
+    Returns:
+        dict: The configuration, with a "sections" list.
+
+    Raises:
+        ValueError: If the file is not valid YAML.
+    """
+    if path.exists():
+        logging.info(f"{EMOJIS['CONFIG']} Loading config from {path} (YAML backend: {YAML_BACKEND})")
         try:
-            with open(DASHY_CONFIG_PATH, "r") as f:
-                config = yaml.safe_load(f) or {}
+            with open(path, "r") as f:
+                raw = f.read()
+            _file_digests[str(path)] = _digest(raw.encode("utf-8"))
+            _file_stats[str(path)] = _stat_signature(path)
+            config = yaml.load(raw, Loader=YAML_LOADER) or {}
+        except yaml.YAMLError as e:
+            logging.error(f"{EMOJIS['FAILURE']} Config file {path} is not valid YAML: {e}")
+            raise ValueError(f"{path} is not valid YAML") from e
         except IOError as e:
-            logging.error(f"{EMOJIS['FAILURE']} Error reading config file {DASHY_CONFIG_PATH}: {e}")
+            logging.error(f"{EMOJIS['FAILURE']} Error reading config file {path}: {e}")
             config = {
                 "pageInfo": {
                     "title": "Home Lab",
@@ -47,7 +360,7 @@ def load_initial_config():
                 "sections": []
             }
     else:
-        logging.info(f"{EMOJIS['CONFIG']} Config file not found at {DASHY_CONFIG_PATH}, initializing new config")
+        logging.info(f"{EMOJIS['CONFIG']} Config file not found at {path}, initializing new config")
         config = {
             "pageInfo": {
                 "title": "Home Lab",
@@ -65,61 +378,454 @@ def load_initial_config():
     if "sections" not in config or not isinstance(config["sections"], list):
         logging.debug(f"{EMOJIS['CONFIG']} Initializing 'sections' as an empty list in config")
         config["sections"] = []
-
-    existing_section = next((s for s in config["sections"] if s.get("name") == DASHY_DOCKER_SECTION_NAME), None)
-    if not existing_section:
-        logging.info(f"{EMOJIS['ADD']} Creating new section in config: {DASHY_DOCKER_SECTION_NAME}")
-        config["sections"].append({
-            "name": DASHY_DOCKER_SECTION_NAME,
-            "icon": "https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/svg/docker.svg",
-            "displayData": {
-                "color": "#1D63ED",
-            },
-            "items": []
-        })
     return config
 
-def apply_startup_reset(config):
-    """Applies the DASHY_RESET_ON_START logic to the loaded config."""
-    if DASHY_RESET_ON_START:
-        docker_section = next((s for s in config.get("sections", []) if s.get("name") == DASHY_DOCKER_SECTION_NAME), None)
-        if docker_section:
-            if "items" not in docker_section or not isinstance(docker_section.get("items"), list) or docker_section.get("items"):
-                logging.info(f"{EMOJIS['CONFIG']} Resetting section items for: {DASHY_DOCKER_SECTION_NAME} due to DASHY_RESET_ON_START")
-                docker_section["items"] = []
-                return True
+def _dump_yaml(data):
+    text = yaml.dump(data, Dumper=YAML_DUMPER, sort_keys=False, default_flow_style=False)
+    # libyaml folds long double-quoted scalars containing escape sequences at different
+    # columns than the pure-Python emitter. Re-emit those (rare) chunks in Python so the
+    # file stays byte-identical whichever backend is installed.
+    if YAML_DUMPER is not yaml.SafeDumper and "\\" in text:
+        text = yaml.dump(data, Dumper=yaml.SafeDumper, sort_keys=False, default_flow_style=False)
+    return text
+
+def _dump_cached(obj, wrap, previous, cache):
+    """Dumps wrap(obj), reusing the text from the previous save if obj is unchanged."""
+    cached = previous.get(id(obj))
+    text = cached[1] if cached is not None and cached[0] is obj else _dump_yaml(wrap(obj))
+    cache[id(obj)] = (obj, text)
+    return text
+
+def serialize_config(data):
+    """
+    Serializes the Dashy configuration to YAML, section by section.
+
+    The output matches a single yaml.dump of the whole document, but only the managed
+    Docker sections are emitted fresh: the serialized text of pageInfo, appConfig, other
+    top-level keys and unmanaged sections is cached (per config file) and reused between saves.
+
+    Args:
+        data (dict): The Dashy configuration dictionary to serialize.
+
+    Returns:
+        str: The YAML document.
+    """
+    if not isinstance(data, dict) or not data:
+        return _dump_yaml(data)
+
+    path_key = str(config_path(data))
+    previous = _serialized_cache.get(path_key, {})
+    managed_names = _managed_section_names(data)
+    cache = {}
+    chunks = []
+    for key, value in data.items():
+        if key == "sections" and isinstance(value, list) and value:
+            chunks.append("sections:\n")
+            for section in value:
+                name = section.get("name") if isinstance(section, dict) else None
+                if is_managed_section_name(name) or name in managed_names:
+                    chunks.append(_dump_yaml([section]))
+                else:
+                    chunks.append(_dump_cached(section, lambda s: [s], previous, cache))
+        elif isinstance(value, (dict, list)):
+            chunks.append(_dump_cached(value, lambda v, k=key: {k: v}, previous, cache))
+        else:
+            chunks.append(_dump_yaml({key: value}))
+    _serialized_cache[path_key] = cache
+    return "".join(chunks)
+
+def _stat_signature(path):
+    """Returns (mtime_ns, size, inode) of path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def merge_external_edits(config: dict):
+    """
+    Merges edits made to the config file by others (by hand, or through Dashy's UI)
+    into the in-memory config, so the next save does not overwrite them.
+
+    Detection is a stat() call: the file is only read when its mtime, size or inode
+    differ from what was last read or written, and only re-parsed when its content
+    differs too. Everything outside the managed Docker sections is then taken from
+    disk; the Docker sections keep their entries from memory (their other fields, e.g.
+    icon or displayData, are taken from disk as well). Routed sections may be
+    hand-written, so their items are taken from disk too, and only the entries the
+    sync owns are applied on top (see _merge_routed_section). The config dict and the
+    managed section dicts are updated in place.
+
+    Args:
+        config (dict): The in-memory Dashy configuration, with managed sections rendered.
+
+    Returns:
+        bool: False if the file changed but could not be parsed, True otherwise.
+    """
+    path = config_path(config)
+    path_key = str(path)
+    signature = _stat_signature(path)
+    if signature is None or signature == _file_stats.get(path_key):
+        return True
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        logging.warning(f"{EMOJIS['WARNING']} Could not read {path} to check for external edits: {e}")
+        return True
+    digest = _digest(raw)
+    if digest == _file_digests.get(path_key):
+        _file_stats[path_key] = signature
+        return True
+    try:
+        disk = yaml.load(raw.decode("utf-8"), Loader=YAML_LOADER) or {}
+    except (UnicodeDecodeError, yaml.YAMLError) as e:
+        logging.error(f"{EMOJIS['FAILURE']} {path} was edited but is not valid YAML ({e}); postponing the write")
+        return False
+    if not isinstance(disk, dict):
+        logging.error(f"{EMOJIS['FAILURE']} {path} was edited but is not a Dashy config; postponing the write")
+        return False
+
+    logging.info(f"{EMOJIS['CONFIG']} {path} was edited externally, merging the changes")
+    managed_names = _managed_section_names(config)
+    managed = {
+        s["name"]: s for s in config.get("sections") or []
+        if isinstance(s, dict) and (is_managed_section_name(s.get("name")) or s.get("name") in managed_names)
+    }
+    sections = []
+    for section in disk.get("sections") if isinstance(disk.get("sections"), list) else []:
+        name = section.get("name") if isinstance(section, dict) else None
+        if name in managed:
+            memory_section = managed.pop(name)
+            if is_managed_section_name(name):
+                items = memory_section.get("items")
+                memory_section.clear()
+                memory_section.update(section)
+                memory_section["items"] = items
             else:
-                logging.debug(f"{EMOJIS['DEBUG']} Section items for {DASHY_DOCKER_SECTION_NAME} already empty or 'items' key missing/invalid; no reset needed.")
-                return False
+                _merge_routed_section(config, path_key, memory_section, section)
+            section = memory_section
+        sections.append(section)
+    for name, memory_section in managed.items():
+        # Missing on disk: Docker sections are re-created; routed ones only with the sync's own entries.
+        if is_managed_section_name(name) or _merge_routed_section(config, path_key, memory_section, dict(memory_section, items=[])):
+            sections.append(memory_section)
         else:
-            logging.debug(f"{EMOJIS['DEBUG']} Docker section {DASHY_DOCKER_SECTION_NAME} not found; no reset applied.")
-            return False
-    else:
-        logging.debug(f"{EMOJIS['DEBUG']} DASHY_RESET_ON_START is false; no reset applied.")
-    return False
+            _managed_sections.pop((path_key, name), None)
+
+    disk["sections"] = sections
+    config.clear()
+    config.update(disk)
+    _file_digests[path_key] = digest
+    _file_stats[path_key] = signature
+    return True
+
+def _merge_routed_section(config: dict, path_key: str, memory_section: dict, disk_section: dict):
+    """
+    Replaces a routed section with its copy from disk, then re-applies the entries the sync owns.
+
+    The section's index is rebuilt from the disk items (keeping their order) and
+    takes over the owners and reconciled hosts of the old one.
+
+    Args:
+        config (dict): The in-memory config the section belongs to.
+        path_key (str): The config file's path, as used in the index keys.
+        memory_section (dict): The in-memory section, updated in place.
+        disk_section (dict): The section as read from disk.
+
+    Returns:
+        bool: Whether the section holds any entry owned by the sync.
+    """
+    name = memory_section.get("name")
+    old_index = _managed_sections.get((path_key, name))
+    owned = {}
+    if old_index is not None:
+        owned = {title: (old_index.get(title), owner) for title, owner in old_index.owners.items() if title in old_index}
+    memory_section.clear()
+    memory_section.update(disk_section)
+    managed_section = ManagedSection(config, memory_section, keep_loaded_order=True)
+    if old_index is not None:
+        managed_section.reconciled_hosts = old_index.reconciled_hosts
+    for entry, owner in owned.values():
+        managed_section.upsert(entry, owner=owner)
+    managed_section.render()
+    _managed_sections[(path_key, name)] = managed_section
+    return bool(owned)
+
+def _digest(payload: bytes):
+    return hashlib.sha256(payload).digest()
+
+def write_atomic(path: Path, payload: bytes):
+    """
+    Replaces the file at path with payload: write to a temp file, fsync, then rename.
+
+    Readers such as Dashy see either the old or the new file, never a half-written one.
+    A single-file bind mount cannot be renamed over (EBUSY/EXDEV); in that case the
+    file is rewritten in place instead, as there is no atomic option.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        try:
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if e.errno not in (errno.EBUSY, errno.EXDEV):
+                raise
+            logging.debug(f"{EMOJIS['DEBUG']} Cannot rename over {path} ({e.strerror}), rewriting it in place")
+            with open(path, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.unlink(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
 def save_config(data):
     """
-    Saves the given Dashy configuration data to the YAML file.
+    Saves the given Dashy configuration data to its YAML file (see config_path).
+
+    The file is replaced atomically (see write_atomic), and unchanged sections are
+    not re-serialized (see serialize_config). If the serialized config is identical
+    to what was last loaded or written, nothing is written and the file's mtime is
+    left alone, so e.g. a container restart (remove, then add) costs no disk I/O.
 
     Args:
         data (dict): The Dashy configuration dictionary to save.
+
+    Returns:
+        bool: True if the config was written, False if the write was suppressed or failed.
     """
     try:
-        logging.info(f"{EMOJIS['SAVE']} Saving updated config to {DASHY_CONFIG_PATH}")
-        with open(DASHY_CONFIG_PATH, "w") as f:
-            yaml.dump(data, f, sort_keys=False, default_flow_style=False)
+        with _write_lock, metrics.CONFIG_SAVE_SECONDS.time():
+            path = config_path(data)
+            payload = serialize_config(data).encode("utf-8")
+            digest = _digest(payload)
+            path_key = str(path)
+            if _file_digests.get(path_key) == digest:
+                write_stats["suppressed"] += 1
+                metrics.CONFIG_WRITES.inc(result="suppressed")
+                logging.info(f"{EMOJIS['SKIP']} Config unchanged, skipping write to {path} ({write_stats['suppressed']} writes suppressed so far)")
+                return False
+            logging.info(f"{EMOJIS['SAVE']} Saving updated config to {path}")
+            write_atomic(path, payload)
+            _file_digests[path_key] = digest
+            _file_stats[path_key] = _stat_signature(path)
+        write_stats["writes"] += 1
+        write_stats["bytes"] += len(payload)
+        metrics.CONFIG_WRITES.inc(result="written")
+        metrics.CONFIG_WRITTEN_BYTES.inc(len(payload))
+        return True
     except (IOError, yaml.YAMLError) as e:
-        logging.error(f"{EMOJIS['FAILURE']} Failed to save config to {DASHY_CONFIG_PATH}: {e}")
+        logging.error(f"{EMOJIS['FAILURE']} Failed to save config to {config_path(data)}: {e}")
     except Exception as e:
         logging.error(f"{EMOJIS['FAILURE']} An unexpected error occurred while saving config: {e}")
+    metrics.CONFIG_WRITES.inc(result="failed")
+    return False
+
+def mark_dirty(config: dict):
+    """
+    Records a pending change to the given configuration and schedules a flush.
+
+    Pending changes are tracked per config file, so the flush only writes the files
+    that changed. The config is written immediately when DASHY_FLUSH_INTERVAL_MS is 0 or when
+    DASHY_FLUSH_MAX_BATCH changes have accumulated. Otherwise a single flush is
+    scheduled at the end of the current window, coalescing all changes made in it.
+
+    Args:
+        config (dict): The Dashy configuration that has been modified.
+    """
+    global _pending_changes, _flush_timer
+    with _write_lock:
+        _pending_configs[str(config_path(config))] = config
+        _pending_changes += 1
+        if DASHY_FLUSH_INTERVAL_MS <= 0 or _pending_changes >= DASHY_FLUSH_MAX_BATCH:
+            flush_config()
+        elif _flush_timer is None:
+            logging.debug(f"{EMOJIS['DEBUG']} Scheduling config flush in {DASHY_FLUSH_INTERVAL_MS} ms")
+            _flush_timer = threading.Timer(DASHY_FLUSH_INTERVAL_MS / 1000, flush_config)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+def flush_config():
+    """
+    Writes any pending configuration changes to disk, in a single save per changed file.
+
+    Safe to call at any time (e.g. on shutdown); does nothing when nothing is pending.
+
+    Returns:
+        bool: True if a pending config was written, False otherwise.
+    """
+    global _pending_configs, _pending_changes, _flush_timer
+    with _write_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if not _pending_configs:
+            return False
+        pending, changes = _pending_configs, _pending_changes
+        _pending_configs = {}
+        _pending_changes = 0
+        if changes > len(pending):
+            write_stats["coalesced"] += changes - len(pending)
+            metrics.CONFIG_COALESCED.inc(changes - len(pending))
+            logging.debug(f"{EMOJIS['SAVE']} Coalesced {changes} config changes into {len(pending)} write(s)")
+        postponed = {}
+        for path_key, config in pending.items():
+            render_managed_section(config)
+            if not merge_external_edits(config):
+                postponed[path_key] = config
+                continue
+            save_config(config)
+        if postponed:
+            # Keep the changes pending; they are written once the file is valid again.
+            _pending_configs.update(postponed)
+            _pending_changes += changes if len(postponed) == len(pending) else len(postponed)
+        if len(postponed) == len(pending):
+            return False
+        metrics.observe_commit()
+        return True
+
+# Upper bound on memoized entries and titles; the least recently used ones are evicted first.
+ENTRY_CACHE_SIZE = 1024
+
+# Placeholders each template may use.
+TEMPLATE_FIELDS = {
+    "DASHY_DOCKER_TITLE_TEMPLATE": ("name", "docker_host"),
+    "DASHY_DOCKER_URL_TEMPLATE": ("host", "port", "name", "docker_host"),
+    "DASHY_DOCKER_ICON_TEMPLATE": ("name", "docker_host"),
+}
+
+def validate_template(setting: str, template: str):
+    """
+    Checks that a template only uses the placeholders allowed for it and renders.
+
+    Args:
+        setting (str): The template's setting name, a key of TEMPLATE_FIELDS.
+        template (str): The template, e.g. "http://{host}:{port}".
+
+    Raises:
+        ValueError: If the template is malformed or uses an unknown placeholder.
+    """
+    allowed = TEMPLATE_FIELDS[setting]
+    try:
+        fields = [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+    except ValueError as e:
+        raise ValueError(f"{setting} {template!r} is malformed: {e}") from None
+    unknown = sorted({re.split(r"[.\[]", field, maxsplit=1)[0] or "{}" for field in fields} - set(allowed))
+    if unknown:
+        raise ValueError(f"{setting} {template!r} uses unknown placeholder(s) {', '.join(unknown)}; allowed: {', '.join(allowed)}")
+    try:
+        template.format(**{field: "1" for field in allowed})
+    except (ValueError, IndexError, KeyError, AttributeError, TypeError) as e:
+        raise ValueError(f"{setting} {template!r} cannot be rendered: {e}") from None
+
+class EntryTemplates:
+    """
+    The validated title, URL and icon templates, with a memo of rendered entries.
+
+    Rendered entries are kept in an LRU cache keyed by (name, port, docker_host),
+    the only container values the templates can use, so a container restarting with
+    the same name and port costs one dictionary lookup and yields an identical entry.
+
+    Args:
+        title_template (str): DASHY_DOCKER_TITLE_TEMPLATE.
+        url_template (str): DASHY_DOCKER_URL_TEMPLATE.
+        icon_template (str): DASHY_DOCKER_ICON_TEMPLATE.
+        url_host (str): DASHY_DOCKER_URL_HOST, for the {host} placeholder.
+
+    Raises:
+        ValueError: If a template is invalid (see validate_template).
+    """
+
+    def __init__(self, title_template, url_template, icon_template, url_host):
+        validate_template("DASHY_DOCKER_TITLE_TEMPLATE", title_template)
+        validate_template("DASHY_DOCKER_URL_TEMPLATE", url_template)
+        validate_template("DASHY_DOCKER_ICON_TEMPLATE", icon_template)
+        self.settings = (title_template, url_template, icon_template, url_host)
+        self._entries = OrderedDict()
+        self._titles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_current(self, title_template, url_template, icon_template, url_host):
+        """Returns True if the templates were compiled from exactly these settings."""
+        return self.settings == (title_template, url_template, icon_template, url_host)
+
+    @staticmethod
+    def _remember(cache, key, value):
+        cache[key] = value
+        if len(cache) > ENTRY_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def title(self, name, docker_host=""):
+        """Returns the rendered title for a container name."""
+        key = (name, docker_host)
+        with self._lock:
+            title = self._titles.get(key)
+            if title is not None:
+                self._titles.move_to_end(key)
+                return title
+            title = self.settings[0].format(name=name, docker_host=docker_host)
+            self._remember(self._titles, key, title)
+            return title
+
+    def entry(self, name, port, docker_host=""):
+        """
+        Returns the rendered Dashy item for a container.
+
+        Returns:
+            dict: A new dict with "title", "url" and "icon".
+        """
+        key = (name, port, docker_host)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return dict(entry)
+        title_template, url_template, icon_template, url_host = self.settings
+        entry = {
+            "title": self.title(name, docker_host),
+            "url": url_template.format(host=url_host, port=port, name=name, docker_host=docker_host),
+            "icon": icon_template.format(name=name, docker_host=docker_host),
+        }
+        with self._lock:
+            self._remember(self._entries, key, entry)
+        return dict(entry)
+
+_entry_templates = None
+
+def get_entry_templates():
+    """
+    Returns the entry templates for the current template settings.
+
+    The templates are validated once, on first use (at startup, by load_initial_config),
+    and again only if the module's template settings are replaced.
+
+    Raises:
+        ValueError: If a template is invalid.
+    """
+    global _entry_templates
+    settings = (DASHY_DOCKER_TITLE_TEMPLATE, DASHY_DOCKER_URL_TEMPLATE, DASHY_DOCKER_ICON_TEMPLATE, DASHY_DOCKER_URL_HOST)
+    templates = _entry_templates
+    if templates is None or not templates.is_current(*settings):
+        templates = _entry_templates = EntryTemplates(*settings)
+    return templates
 
 def generate_entry(container_info: dict):
     """
     Generates a Dashy item entry dictionary based on container information and templates.
 
     Args:
-        container_info (dict): A dictionary containing 'name' and 'port' of the container.
+        container_info (dict): A dictionary containing 'name' and 'port' of the container,
+            and optionally the 'docker_host' it runs on.
 
     Returns:
         dict: A Dashy item entry, or None if 'name' is missing in container_info.
@@ -127,25 +833,84 @@ def generate_entry(container_info: dict):
     if not container_info.get("name"):
         logging.warning(f"{EMOJIS['WARNING']} Skipping container entry generation: 'name' is missing.")
         return None
-    host = DASHY_DOCKER_URL_HOST
-    name = container_info.get("name", "")
-    port = container_info.get("port", "")
-    return {
-        "title": DASHY_DOCKER_TITLE_TEMPLATE.format(name=name),
-        "url": DASHY_DOCKER_URL_TEMPLATE.format(host=host, port=port, name=name),
-        "icon": DASHY_DOCKER_ICON_TEMPLATE.format(name=name),
-    }
+    return get_entry_templates().entry(container_info["name"], container_info.get("port", ""), container_info.get("docker_host", ""))
+
+def get_managed_section(config: dict, create: bool = True, docker_host: str = "", section_name: str = None):
+    """
+    Returns the in-memory index of a managed Docker section of the given config.
+
+    The section is looked up once and the index is reused for every following change,
+    until the config object or the section's items list is replaced from outside.
+
+    Args:
+        config (dict): The current Dashy configuration.
+        create (bool): Whether to create the section if it is missing.
+        docker_host (str): The Docker host whose section to return, if
+            DASHY_DOCKER_SECTION_NAME contains {docker_host}.
+        section_name (str): The section to return instead, e.g. a routed section.
+
+    Returns:
+        ManagedSection: The index, or None if the section is missing and create is False.
+    """
+    section_name = section_name or managed_section_name(docker_host)
+    index_key = (str(config_path(config)), section_name)
+    with _write_lock:
+        managed_section = _managed_sections.get(index_key)
+        if managed_section is not None and managed_section.is_current(config):
+            return managed_section
+
+        sections = config.get("sections")
+        if not isinstance(sections, list):
+            sections = []
+        docker_section = next((s for s in sections if isinstance(s, dict) and s.get("name") == section_name), None)
+        if not docker_section:
+            if not create:
+                return None
+            if section_name == DASHY_DOCKER_SECTION_NAME:
+                logging.error(f"{EMOJIS['FAILURE']} Docker section '{section_name}' not found. This should not happen. Creating it.")
+            else:
+                logging.info(f"{EMOJIS['ADD']} Creating new section in config: {section_name}")
+            docker_section = new_docker_section(section_name)
+            sections.append(docker_section)
+            config["sections"] = sections
+
+        # A routed section may be hand-written; its own items stay as they are.
+        managed_section = ManagedSection(config, docker_section, keep_loaded_order=not is_managed_section_name(section_name))
+        _managed_sections[index_key] = managed_section
+        return managed_section
+
+def render_managed_section(config: dict):
+    """
+    Writes the managed entries back into the "items" lists of the config's managed sections.
+
+    Called when flushing; in between, changes only touch the in-memory indexes.
+
+    Args:
+        config (dict): The current Dashy configuration.
+    """
+    with _write_lock:
+        for managed_section in _managed_sections.values():
+            if managed_section.config is config:
+                managed_section.render()
 
-def update_entry(config: dict, container_info: dict):
+def update_entry(config: dict, container_info: dict, event_time_ns: int = None):
     """
     Adds or updates an entry for a container in the Dashy configuration.
 
     If an entry with the same title (generated from container_info['name']) exists,
     it's replaced. Otherwise, a new entry is added. Entries are sorted by title.
 
+    The entry goes to the section and file the container is routed to (see
+    target_section_name and get_target_config); a copy of it that the same Docker host
+    left in another managed section, e.g. before its routing labels changed, is removed.
+    An entry identical to the existing one (e.g. after a restart) changes nothing.
+    The change is written to disk by the write-behind flush (see mark_dirty).
+
     Args:
         config (dict): The current Dashy configuration.
         container_info (dict): Information about the container to add/update.
+        event_time_ns (int): The timeNano of the Docker event behind the change, if any,
+            for the event-to-commit lag metric.
     """
     if not container_info or not container_info.get("name"):
         logging.warning(f"{EMOJIS['WARNING']} Skipping update: invalid container_info.")
@@ -153,63 +918,163 @@ def update_entry(config: dict, container_info: dict):
 
     logging.info(f"{EMOJIS['ADD']} Updating entry for container: {container_info['name']}")
 
-    sections = config.get("sections", [])
-    docker_section = next((s for s in sections if s.get("name") == DASHY_DOCKER_SECTION_NAME), None)
-
-    if not docker_section:
-        logging.error(f"{EMOJIS['FAILURE']} Docker section '{DASHY_DOCKER_SECTION_NAME}' not found. This should not happen. Creating it.")
-        docker_section = {
-            "name": DASHY_DOCKER_SECTION_NAME,
-            "icon": "https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/svg/docker.svg",
-            "displayData": {"color": "#1D63ED"},
-            "items": []
-        }
-        sections.append(docker_section)
-        config["sections"] = sections
-
-    items = docker_section.get("items") or []
-    
-    expected_title = DASHY_DOCKER_TITLE_TEMPLATE.format(name=container_info["name"])
-    items = [e for e in items if isinstance(e, dict) and e.get("title") != expected_title]
-    
     new_entry = generate_entry(container_info)
-    if new_entry:
-        logging.info(f"{EMOJIS['ADD']} Appending new entry: {new_entry['title']}")
-        items.append(new_entry)
-        items.sort(key=lambda e: e.get("title", "").lower())
-        docker_section["items"] = items
-    else:
+    if not new_entry:
         logging.warning(f"{EMOJIS['WARNING']} Failed to generate entry for {container_info['name']}, not adding.")
+        return
 
-    save_config(config)
+    with _write_lock:
+        docker_host = container_info.get("docker_host", "")
+        target_config = get_target_config(config, container_info.get("file"))
+        managed_section = get_managed_section(target_config, section_name=target_section_name(container_info))
+        if managed_section.get(new_entry["title"]) == new_entry and managed_section.owners.get(new_entry["title"]) == docker_host:
+            # E.g. a restart with the same name and port: nothing to write.
+            logging.debug(f"{EMOJIS['DEBUG']} Entry {new_entry['title']} is unchanged")
+            return
+        managed_section.upsert(new_entry, owner=docker_host)
+        logging.info(f"{EMOJIS['ADD']} Appending new entry: {new_entry['title']}")
+        for other_section in _live_sections(config):
+            if other_section is not managed_section and other_section.owners.get(new_entry["title"]) == docker_host:
+                other_section.remove(new_entry["title"])
+                logging.info(f"{EMOJIS['REMOVE']} Moved entry {new_entry['title']} out of section {other_section.section.get('name')}")
+                mark_dirty(other_section.config)
+        metrics.record_pending_event(event_time_ns)
+        mark_dirty(target_config)
 
-def remove_entry(config: dict, container_name: str):
+def remove_entry(config: dict, container_name: str, docker_host: str = "", event_time_ns: int = None):
     """
     Removes an entry for a container from the Dashy configuration.
 
     The entry is identified by its title, which is generated from the container_name
-    using DASHY_DOCKER_TITLE_TEMPLATE.
+    using DASHY_DOCKER_TITLE_TEMPLATE. It is removed from the host's managed section and
+    from every routed section (in any file) where the host owns it.
 
     Args:
         config (dict): The current Dashy configuration.
         container_name (str): The name of the container whose entry should be removed.
+        docker_host (str): The Docker host the container ran on.
+        event_time_ns (int): The timeNano of the Docker event behind the change, if any.
     """
     logging.info(f"{EMOJIS['REMOVE']} Attempting to remove entry for container: {container_name}")
 
-    sections = config.get("sections", [])
-    docker_section = next((s for s in sections if s.get("name") == DASHY_DOCKER_SECTION_NAME), None)
+    with _write_lock:
+        expected_title = get_entry_templates().title(container_name, docker_host)
+        managed_section = get_managed_section(config, create=False, docker_host=docker_host)
+        removed_from = []
+        if managed_section is not None and managed_section.remove(expected_title):
+            removed_from.append(managed_section)
+        for routed_section in _live_sections(config):
+            if routed_section.owners.get(expected_title) == docker_host and routed_section.remove(expected_title):
+                removed_from.append(routed_section)
 
-    if docker_section:
-        items = docker_section.get("items", [])
-        expected_title = DASHY_DOCKER_TITLE_TEMPLATE.format(name=container_name)
-        original_item_count = len(items)
-        new_items = [e for e in items if not (isinstance(e, dict) and e.get("title") == expected_title)]
-        
-        if len(new_items) < original_item_count:
+        if removed_from:
             logging.info(f"{EMOJIS['SUCCESS']} Entry found and removed for: {container_name}")
-            docker_section["items"] = new_items
-            save_config(config)
+            metrics.record_pending_event(event_time_ns)
+            for section in removed_from:
+                mark_dirty(section.config)
+        elif managed_section is None:
+            logging.warning(f"{EMOJIS['WARNING']} Docker section '{managed_section_name(docker_host)}' not found during remove operation for {container_name}.")
         else:
             logging.info(f"{EMOJIS['INFO']} No matching entry found for title: {expected_title} during remove.")
-    else:
-        logging.warning(f"{EMOJIS['WARNING']} Docker section '{DASHY_DOCKER_SECTION_NAME}' not found during remove operation for {container_name}.")
\ No newline at end of file
+
+def reconcile(config: dict, container_infos: list, docker_host: str = "", docker_hosts=None, prune: bool = True, pending_removals=()):
+    """
+    Brings a Docker host's managed entries in line with its running containers.
+
+    The desired entries (generated from container_infos) are compared with the current
+    ones and only the differences are applied: new entries are added, changed entries
+    replaced and entries of containers that are no longer running removed.
+    All changes are applied together and mark each changed config file dirty once, so
+    they reach every file in a single write; if nothing differs, nothing is written.
+
+    Every managed section is considered: the host's own section, the sections its
+    containers are routed to, and routed sections it wrote to before (so an entry
+    whose container's routing labels changed moves).
+
+    Only entries owned by docker_host are removed, so a periodic resync catches missed
+    `die` events whatever prune is. Entries without an owner (e.g. loaded from the file
+    at startup) are only removed with prune, from the Docker section(s), once every host
+    sharing the section has reconciled at least once, as by then all live entries have
+    been claimed. Unowned entries of routed sections are never removed: those sections
+    may be hand-written, and their own items are not the sync's. Entries of containers
+    in pending_removals are kept too: their grace-period removal decides.
+
+    Args:
+        config (dict): The current Dashy configuration.
+        container_infos (list): Info dicts of all matching running containers on the host.
+        docker_host (str): The host the containers run on.
+        docker_hosts (iterable): All watched hosts; defaults to only docker_host.
+        prune (bool): Whether to also remove unowned entries that no running container matches.
+        pending_removals (iterable): Names of stopped containers on docker_host whose removal is scheduled.
+
+    Returns:
+        dict: The number of entries "added", "updated" and "removed".
+    """
+    desired = {}
+    for container_info in container_infos:
+        if not container_info or not container_info.get("name"):
+            logging.warning(f"{EMOJIS['WARNING']} Skipping reconcile: invalid container_info.")
+            continue
+        container_info = {**container_info, "docker_host": docker_host}
+        entry = generate_entry(container_info)
+        if entry:
+            target = (container_info.get("file") or "", target_section_name(container_info))
+            desired.setdefault(target, {})[entry["title"]] = entry
+
+    counts = {"added": 0, "updated": 0, "removed": 0}
+    all_hosts = set(docker_hosts or (docker_host,))
+    templates = get_entry_templates()
+    pending_titles = {templates.title(name, docker_host) for name in pending_removals}
+    with _write_lock:
+        # The host's own section first, then every routed target and known section.
+        wanted = {}
+        own_section = get_managed_section(config, create=False, docker_host=docker_host)
+        if own_section is not None:
+            wanted[id(own_section)] = (own_section, {})
+        for (file_name, section_name), entries in desired.items():
+            managed_section = get_managed_section(get_target_config(config, file_name), section_name=section_name)
+            wanted.setdefault(id(managed_section), (managed_section, {}))[1].update(entries)
+        for managed_section in _live_sections(config):
+            wanted.setdefault(id(managed_section), (managed_section, {}))
+
+        for managed_section, section_desired in wanted.values():
+            section_name = managed_section.section.get("name")
+            section_counts = {"added": 0, "updated": 0, "removed": 0}
+            changed = []
+            for title, entry in section_desired.items():
+                current = managed_section.get(title)
+                if current is None:
+                    section_counts["added"] += 1
+                    changed.append(entry)
+                elif current != entry:
+                    section_counts["updated"] += 1
+                    changed.append(entry)
+                else:
+                    managed_section.owners[title] = docker_host
+
+            claim_unowned = False
+            if prune and is_managed_section_name(section_name):
+                managed_section.reconciled_hosts.add(docker_host)
+                sharing_hosts = {h for h in all_hosts if managed_section_name(h) == section_name}
+                claim_unowned = sharing_hosts <= managed_section.reconciled_hosts
+            for title in managed_section.titles():
+                if title in section_desired or title in pending_titles:
+                    continue
+                owner = managed_section.owners.get(title)
+                if owner == docker_host or (owner is None and claim_unowned):
+                    managed_section.remove(title)
+                    section_counts["removed"] += 1
+
+            if changed:
+                managed_section.upsert_many(changed, owner=docker_host)
+            if changed or section_counts["removed"]:
+                logging.info(
+                    f"{EMOJIS['CONFIG']} Reconciled section {section_name}: {section_counts['added']} added, "
+                    f"{section_counts['updated']} updated, {section_counts['removed']} removed"
+                )
+                mark_dirty(managed_section.config)
+            else:
+                logging.debug(f"{EMOJIS['DEBUG']} Section {section_name} already matches the running containers of {docker_host or 'Docker'}")
+            for key in counts:
+                counts[key] += section_counts[key]
+    return counts
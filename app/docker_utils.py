@@ -3,7 +3,11 @@ Handles Docker client interaction, container information extraction,
 and filtering based on labels and configuration.
 """
 import os
+import random
 import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import docker
 from .app_config import (
     setup_logging,
@@ -11,34 +15,503 @@ from .app_config import (
     DASHY_DOCKER_PORT_LABEL_REGEX,
     DASHY_EXPOSED_BY_DEFAULT,
     DASHY_DOCKER_IGNORE_LABEL_REGEX,
+    DASHY_DOCKER_DAEMON_FILTERS,
+    DASHY_DOCKER_LABEL_FILTER,
+    DASHY_DOCKER_SECTION_LABEL,
+    DASHY_DOCKER_FILE_LABEL,
+    DASHY_DOCKER_WORKERS,
+    DASHY_SWARM_MODE,
     EMOJIS
 )
+from . import metrics
 import logging
 
 
 DOCKER_SOCKET = os.getenv("DOCKER_SOCKET", "unix://var/run/docker.sock")
+# Comma-separated list of daemons to watch, each optionally named: "nas=tcp://10.0.0.5:2375,unix://var/run/docker.sock".
+DOCKER_HOSTS = os.getenv("DOCKER_HOSTS", "")
 DOCKER_LABEL_PATTERN = re.compile(DASHY_DOCKER_LABEL_REGEX, re.IGNORECASE)
 DOCKER_PORT_LABEL_PATTERN = re.compile(DASHY_DOCKER_PORT_LABEL_REGEX, re.IGNORECASE)
 DOCKER_IGNORE_LABEL_PATTERN = re.compile(DASHY_DOCKER_IGNORE_LABEL_REGEX, re.IGNORECASE)
+# Container lifecycle actions the sync reacts to; everything else is filtered out by the daemon.
+DOCKER_EVENT_ACTIONS = ("start", "die", "stop")
+# Service lifecycle actions the sync reacts to in Swarm mode; task (replica) churn emits none of these.
+SWARM_SERVICE_EVENT_ACTIONS = ("create", "update", "remove")
+# Reconnect backoff: the first retry waits about RECONNECT_BASE_SECONDS, doubling per failure up to RECONNECT_MAX_SECONDS.
+RECONNECT_BASE_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30.0
+# Keys Docker adds to container event attributes next to the container's labels.
+DOCKER_EVENT_ATTRIBUTE_KEYS = frozenset({"name", "image", "exitCode", "signal", "execDuration"})
 
-def get_docker_client():
+class ContainerView:
+    """
+    A compact container record decoded from raw Docker API JSON (an event's Actor
+    attributes, a container list summary or an inspect), usable wherever a docker
+    SDK Container is expected.
+
+    Only the fields the sync uses are kept (id, name, labels, port bindings and
+    state), in slots, instead of the whole inspect JSON of a Container model.
+    Docker puts the container name and all its labels in the event payload, so the
+    name and labels are available without an inspect call. Port bindings are not,
+    so unless they are given up front they are fetched with a single inspect the
+    first time `ports` is read.
+    """
+
+    __slots__ = ("id", "name", "labels", "state", "_client", "_ports")
+
+    def __init__(self, client, container_id, name, labels, ports=None, state=None):
+        self.id = container_id
+        self.name = name
+        self.labels = labels
+        self.state = state
+        self._client = client
+        self._ports = ports
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Builds a view from a `GET /containers/json` entry, which includes port bindings."""
+        names = summary.get("Names") or []
+        name = names[0].lstrip("/") if names else summary.get("Id", "")[:12]
+        return cls(None, summary.get("Id"), name, summary.get("Labels") or {},
+                   ports=summary_ports_to_bindings(summary.get("Ports")), state=summary.get("State"))
+
+    @classmethod
+    def from_inspect(cls, attrs):
+        """Builds a view from a `GET /containers/{id}/json` response."""
+        return cls(None, attrs.get("Id"), (attrs.get("Name") or "").lstrip("/"), (attrs.get("Config") or {}).get("Labels") or {},
+                   ports=inspect_port_bindings(attrs), state=(attrs.get("State") or {}).get("Status"))
+
+    @property
+    def ports(self):
+        if self._ports is None and self._client is not None:
+            logging.debug(f"{EMOJIS['DOCKER']} Inspecting container {self.name} for port bindings")
+            try:
+                with metrics.DOCKER_API_SECONDS.time(call="containers.get"):
+                    self._ports = inspect_port_bindings(self._client.api.inspect_container(self.id))
+            except docker.errors.NotFound:
+                logging.warning(f"{EMOJIS['WARNING']} Container {self.name} vanished before its ports could be inspected")
+                self._ports = {}
+        return self._ports or {}
+
+    @ports.setter
+    def ports(self, ports):
+        self._ports = ports
+
+class ServiceView:
+    """
+    A Swarm service seen as a single container, usable wherever a container is expected.
+
+    The name and labels come from the service spec (service labels, e.g. Compose
+    `deploy.labels`, not container labels), and the ports from its published ports,
+    in the same shape as Container.ports. However many task replicas the service
+    runs, or however often they are rescheduled, it yields one entry.
+    """
+
+    __slots__ = ("id", "name", "labels", "ports")
+
+    def __init__(self, service_id, name, labels, ports=None):
+        self.id = service_id
+        self.name = name
+        self.labels = labels
+        self.ports = ports or {}
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        """Builds a view from a `GET /services` entry or a service inspect."""
+        spec = attrs.get("Spec") or {}
+        published = (attrs.get("Endpoint") or {}).get("Ports") or (spec.get("EndpointSpec") or {}).get("Ports") or []
+        ports = {}
+        for port in published:
+            key = f"{port.get('TargetPort')}/{port.get('Protocol', 'tcp')}"
+            mappings = ports.setdefault(key, [])
+            if port.get("PublishedPort"):
+                mappings.append({"HostIp": "", "HostPort": str(port["PublishedPort"])})
+        return cls(attrs.get("ID"), spec.get("Name") or attrs.get("ID", "")[:12], spec.get("Labels") or {},
+                   {key: mappings or None for key, mappings in ports.items()})
+
+def inspect_port_bindings(attrs):
+    """Returns the port bindings of a container inspect response, as in Container.ports."""
+    return ((attrs or {}).get("NetworkSettings") or {}).get("Ports") or {}
+
+def summary_ports_to_bindings(ports):
+    """
+    Converts the port list of a container list summary into inspect-style bindings.
+
+    Args:
+        ports (list): e.g. [{"PrivatePort": 80, "PublicPort": 8080, "Type": "tcp", "IP": "0.0.0.0"}]
+
+    Returns:
+        dict: e.g. {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8080"}]}, as in Container.ports.
+    """
+    bindings = {}
+    for port in ports or []:
+        key = f"{port.get('PrivatePort')}/{port.get('Type', 'tcp')}"
+        mappings = bindings.setdefault(key, [])
+        if port.get("PublicPort"):
+            mappings.append({"HostIp": port.get("IP", ""), "HostPort": str(port["PublicPort"])})
+    return {key: bindings[key] or None for key in sorted(bindings)}
+
+def docker_host_name(base_url: str):
+    """
+    Derives the {docker_host} name of a daemon from its URL.
+
+    Args:
+        base_url (str): e.g. "tcp://10.0.0.5:2375" or "unix://var/run/docker.sock".
+
+    Returns:
+        str: The URL's host (e.g. "10.0.0.5"), or "local" for unix sockets.
+    """
+    scheme, _, rest = base_url.partition("://")
+    if not rest or scheme in ("unix", "npipe"):
+        return "local"
+    return rest.split("/", 1)[0].rsplit(":", 1)[0] or "local"
+
+def get_docker_hosts():
+    """
+    Returns the Docker daemons to watch.
+
+    DOCKER_HOSTS lists daemon URLs separated by commas, each optionally prefixed with
+    the name used for the {docker_host} placeholder (e.g. "nas=tcp://10.0.0.5:2375").
+    Unnamed daemons are named after their URL (see docker_host_name). Without
+    DOCKER_HOSTS, only DOCKER_SOCKET is watched.
+
+    Returns:
+        list: (name, base_url) tuples, in the configured order.
+    """
+    hosts = []
+    for spec in (DOCKER_HOSTS or DOCKER_SOCKET).split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        name, sep, base_url = spec.partition("=")
+        if not sep or "://" in name:
+            name, base_url = docker_host_name(spec), spec
+        hosts.append((name.strip(), base_url.strip()))
+    return hosts
+
+def get_docker_client(base_url: str = None):
     """
     Initializes and returns a Docker client instance.
 
+    Its HTTP connection pool holds one connection per Docker worker thread, plus
+    one for the long-lived event stream, so parallel lookups never queue for (or
+    discard) a connection.
+
+    Args:
+        base_url (str): The daemon to connect to. Defaults to DOCKER_SOCKET.
+
     Raises:
         docker.errors.DockerException: If the client fails to initialize or connect.
 
     Returns:
         docker.DockerClient: An initialized Docker client.
     """
-    logging.debug(f"{EMOJIS['DOCKER']} Creating Docker client with socket: {DOCKER_SOCKET}...")
+    base_url = base_url or DOCKER_SOCKET
+    logging.debug(f"{EMOJIS['DOCKER']} Creating Docker client with socket: {base_url}...")
     try:
-        client = docker.DockerClient(base_url=DOCKER_SOCKET)
+        client = docker.DockerClient(base_url=base_url, max_pool_size=DASHY_DOCKER_WORKERS + 1)
     except docker.errors.DockerException as e:
-        logging.error(f"{EMOJIS['FAILURE']} Failed to initialize Docker client with socket {DOCKER_SOCKET}: {e}")
+        logging.error(f"{EMOJIS['FAILURE']} Failed to initialize Docker client with socket {base_url}: {e}")
         raise
     return client
 
+def reconnect_delay(attempt: int):
+    """
+    Returns how long to wait before a reconnect to a Docker daemon.
+
+    The delay doubles with every consecutive failure, up to RECONNECT_MAX_SECONDS, and
+    is drawn between half and all of that, so hosts (or replicas of the sync) that lost
+    the same daemon do not all reconnect at the same moment.
+
+    Args:
+        attempt (int): The number of consecutive failed attempts so far, from 0.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    ceiling = min(RECONNECT_MAX_SECONDS, RECONNECT_BASE_SECONDS * 2 ** min(attempt, 32))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+_docker_executor = None
+_docker_executor_lock = threading.Lock()
+
+def get_docker_executor():
+    """
+    Returns the process-wide pool of DASHY_DOCKER_WORKERS threads for Docker lookups.
+
+    The pool is shared by all watched hosts, which bounds the number of in-flight
+    Docker API calls of the whole process.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: The shared executor, created on first use.
+    """
+    global _docker_executor
+    with _docker_executor_lock:
+        if _docker_executor is None:
+            _docker_executor = ThreadPoolExecutor(max_workers=max(1, DASHY_DOCKER_WORKERS), thread_name_prefix="docker")
+        return _docker_executor
+
+def get_container_infos(containers):
+    """
+    Runs get_container_info for many containers on the Docker worker pool.
+
+    Containers whose ports are not known yet need an inspect call each; running them
+    in parallel turns N round trips to a remote daemon into about N / DASHY_DOCKER_WORKERS.
+
+    Args:
+        containers (list): Docker containers or ContainerViews.
+
+    Returns:
+        list: The result of get_container_info (a dict or None) for every container,
+              in the same order as the containers.
+    """
+    if len(containers) <= 1 or DASHY_DOCKER_WORKERS <= 1:
+        return [get_container_info(container) for container in containers]
+    return list(get_docker_executor().map(get_container_info, containers))
+
+def list_containers(client):
+    """
+    Lists the running containers of a daemon in one call, as ContainerViews.
+
+    Uses the low-level API, so the summaries are decoded straight into compact
+    records instead of docker SDK Container models.
+
+    Args:
+        client (docker.DockerClient): The Docker client.
+
+    Returns:
+        list: A ContainerView per running container, with its port bindings.
+    """
+    with metrics.DOCKER_API_SECONDS.time(call="containers.list"):
+        summaries = client.api.containers(filters=get_list_filters())
+    return [ContainerView.from_summary(summary) for summary in summaries]
+
+def list_services(client):
+    """
+    Lists the Swarm services of a manager in one call, as ServiceViews.
+
+    Args:
+        client (docker.DockerClient): The Docker client of a Swarm manager.
+
+    Returns:
+        list: A ServiceView per service, with its published ports.
+    """
+    with metrics.DOCKER_API_SECONDS.time(call="services.list"):
+        services = client.api.services(filters=get_list_filters())
+    return [ServiceView.from_attrs(attrs) for attrs in services]
+
+def get_event_filters():
+    """
+    Builds the filters passed to the Docker events API.
+
+    With DASHY_DOCKER_DAEMON_FILTERS enabled, the daemon only sends container events
+    for DOCKER_EVENT_ACTIONS (service events for SWARM_SERVICE_EVENT_ACTIONS with
+    DASHY_SWARM_MODE), instead of every network, volume, image and exec event.
+
+    Returns:
+        dict: The event filters, or None to receive all events.
+    """
+    if not DASHY_DOCKER_DAEMON_FILTERS:
+        return None
+    if DASHY_SWARM_MODE:
+        return {"type": "service", "event": list(SWARM_SERVICE_EVENT_ACTIONS)}
+    return {"type": "container", "event": list(DOCKER_EVENT_ACTIONS)}
+
+def get_event_type():
+    """Returns the event type and actions the sync reacts to: ("service", ...) with DASHY_SWARM_MODE, else ("container", ...)."""
+    if DASHY_SWARM_MODE:
+        return "service", SWARM_SERVICE_EVENT_ACTIONS
+    return "container", DOCKER_EVENT_ACTIONS
+
+def get_list_filters():
+    """
+    Builds the filters passed to the Docker container (or service) list API for the startup scan.
+
+    A label filter is only applied when containers are not exposed by default and
+    DASHY_DOCKER_LABEL_FILTER names a label key (or key=value) every included container carries.
+    Daemon label filters are exact and case-sensitive, unlike DASHY_DOCKER_LABEL_REGEX.
+
+    Returns:
+        dict: The list filters, or None to list all running containers.
+    """
+    if not DASHY_DOCKER_DAEMON_FILTERS or DASHY_EXPOSED_BY_DEFAULT or not DASHY_DOCKER_LABEL_FILTER:
+        return None
+    return {"label": DASHY_DOCKER_LABEL_FILTER}
+
+def get_event_container(client, event):
+    """
+    Builds a container view for a container event without an inspect round trip.
+
+    Falls back to an inspect only when the event carries no container name in its
+    Actor attributes (e.g. very old Docker daemons).
+
+    Args:
+        client (docker.DockerClient): The Docker client, used for lazy port lookups.
+        event (dict): A decoded Docker container event.
+
+    Returns:
+        ContainerView: The container view, or None if the container could not be resolved.
+    """
+    actor = event.get("Actor") or {}
+    container_id = actor.get("ID") or event.get("id")
+    attributes = actor.get("Attributes") or {}
+    name = attributes.get("name")
+    if name:
+        labels = {k: v for k, v in attributes.items() if k not in DOCKER_EVENT_ATTRIBUTE_KEYS}
+        return ContainerView(client, container_id, name, labels)
+
+    logging.debug(f"{EMOJIS['DOCKER']} Event for {container_id} has no Actor name, inspecting container")
+    try:
+        with metrics.DOCKER_API_SECONDS.time(call="containers.get"):
+            return ContainerView.from_inspect(client.api.inspect_container(container_id))
+    except docker.errors.NotFound:
+        logging.warning(f"{EMOJIS['WARNING']} Container not found for ID: {container_id}")
+        return None
+
+def get_event_service(client, event):
+    """
+    Builds a service view for a Swarm service event.
+
+    Removals only need the service name, which the event carries. For creates and
+    updates the service is inspected once, as events carry neither labels nor ports.
+
+    Args:
+        client (docker.DockerClient): The Docker client of a Swarm manager.
+        event (dict): A decoded Docker service event.
+
+    Returns:
+        ServiceView: The service view, or None if the service could not be resolved.
+    """
+    actor = event.get("Actor") or {}
+    service_id = actor.get("ID") or event.get("id")
+    name = (actor.get("Attributes") or {}).get("name")
+    if event.get("Action") == "remove":
+        return ServiceView(service_id, name, {}) if name else None
+    try:
+        with metrics.DOCKER_API_SECONDS.time(call="services.get"):
+            return ServiceView.from_attrs(client.api.inspect_service(service_id))
+    except docker.errors.NotFound:
+        logging.warning(f"{EMOJIS['WARNING']} Service not found for ID: {service_id}")
+        return None
+
+# Upper bound on cached label decisions; the cache is simply cleared when it is full.
+LABEL_CACHE_SIZE = 1024
+
+LabelDecision = namedtuple("LabelDecision", ["included", "reason", "port"])
+
+class LabelClassifier:
+    """
+    Decides from a container's labels whether it is ignored or included, and its port label.
+
+    All three questions are answered in a single pass over the labels. Which patterns
+    a label key matches is remembered per key (Compose and Docker Desktop repeat the
+    same label keys on every container), and whole decisions are cached by label set,
+    so a container restart costs one dictionary lookup.
+
+    Args:
+        include_pattern (re.Pattern): Label keys that include a container (unless "false").
+        ignore_pattern (re.Pattern): Label keys that exclude a container when "true".
+        port_pattern (re.Pattern): Label keys whose value is the container's port.
+        exposed_by_default (bool): Whether containers are included without an include label.
+    """
+
+    def __init__(self, include_pattern, ignore_pattern, port_pattern, exposed_by_default):
+        self.include_pattern = include_pattern
+        self.ignore_pattern = ignore_pattern
+        self.port_pattern = port_pattern
+        self.exposed_by_default = exposed_by_default
+        self._key_roles = {}
+        self._decisions = {}
+        logging.debug(
+            "%s Label classifier: include=%r ignore=%r port=%r exposed_by_default=%s",
+            EMOJIS['DEBUG'], include_pattern.pattern, ignore_pattern.pattern, port_pattern.pattern, exposed_by_default
+        )
+
+    def is_current(self, include_pattern, ignore_pattern, port_pattern, exposed_by_default):
+        """Returns True if the classifier was compiled from exactly these settings."""
+        return (self.include_pattern is include_pattern and self.ignore_pattern is ignore_pattern
+                and self.port_pattern is port_pattern and self.exposed_by_default == exposed_by_default)
+
+    def _roles(self, key):
+        roles = self._key_roles.get(key)
+        if roles is None:
+            if len(self._key_roles) >= LABEL_CACHE_SIZE:
+                self._key_roles.clear()
+            roles = (
+                self.ignore_pattern.match(key) is not None,
+                self.include_pattern.match(key) is not None,
+                self.port_pattern.match(key) is not None,
+            )
+            self._key_roles[key] = roles
+        return roles
+
+    def classify(self, labels):
+        """
+        Classifies a label set.
+
+        Args:
+            labels (dict): The container's labels.
+
+        Returns:
+            LabelDecision: Whether the container is included, why, and the value of its
+            port label (None if it has none).
+        """
+        try:
+            cache_key = frozenset(labels.items())
+            decision = self._decisions.get(cache_key)
+        except TypeError:
+            cache_key, decision = None, None
+        if decision is not None:
+            return decision
+
+        include_key = None
+        port = None
+        port_found = False
+        ignore_key = None
+        for key, value in labels.items():
+            is_ignore, is_include, is_port = self._roles(key)
+            if is_ignore and isinstance(value, str) and value.lower() == "true":
+                ignore_key = key
+                break
+            if is_include and include_key is None and not (isinstance(value, str) and value.lower() == "false"):
+                include_key = key
+            if is_port and not port_found:
+                port, port_found = value, True
+
+        if ignore_key is not None:
+            decision = LabelDecision(False, f"label '{ignore_key}' matched DASHY_DOCKER_IGNORE_LABEL_REGEX with value 'true'", None)
+        elif self.exposed_by_default:
+            decision = LabelDecision(True, "DASHY_EXPOSED_BY_DEFAULT is true", port)
+        elif include_key is not None:
+            decision = LabelDecision(True, f"label '{include_key}' matched DASHY_DOCKER_LABEL_REGEX and value is not 'false'", port)
+        else:
+            decision = LabelDecision(False, "not exposed by default and no matching include label", port)
+
+        if cache_key is not None:
+            if len(self._decisions) >= LABEL_CACHE_SIZE:
+                self._decisions.clear()
+            self._decisions[cache_key] = decision
+        return decision
+
+_label_classifier = None
+
+def get_label_classifier():
+    """
+    Returns the label classifier for the current label patterns.
+
+    The classifier is compiled once and rebuilt only if the module's patterns or
+    DASHY_EXPOSED_BY_DEFAULT are replaced.
+
+    Returns:
+        LabelClassifier: The shared classifier.
+    """
+    global _label_classifier
+    settings = (DOCKER_LABEL_PATTERN, DOCKER_IGNORE_LABEL_PATTERN, DOCKER_PORT_LABEL_PATTERN, DASHY_EXPOSED_BY_DEFAULT)
+    classifier = _label_classifier
+    if classifier is None or not classifier.is_current(*settings):
+        classifier = _label_classifier = LabelClassifier(*settings)
+    return classifier
+
 def get_container_port(container):
     """
     Extracts the port for a given container.
@@ -53,31 +526,33 @@ def get_container_port(container):
         str: The determined port number as a string, or None if no suitable port is found.
     """
     try:
-        labels = container.labels
-        port = next((v for k, v in labels.items() if DOCKER_PORT_LABEL_PATTERN.match(k)), None)
+        port = get_label_classifier().classify(container.labels).port
         if port:
-            logging.debug(f"{EMOJIS['DEBUG']} Port {port} found from label for container {container.name}")
+            logging.debug("%s Port %s found from label for container %s", EMOJIS['DEBUG'], port, container.name)
         else:
-            logging.debug(f"{EMOJIS['DEBUG']} No specific Dashy port label found for {container.name}, checking exposed ports.")
-            ports = container.ports or {}
-            for port_mappings in ports.values():
-                if port_mappings and isinstance(port_mappings, list):
-                    for mapping in port_mappings:
-                        if "HostPort" in mapping:
-                            port = mapping["HostPort"]
-                            logging.debug(f"{EMOJIS['DEBUG']} Port {port} found from exposed HostPort for container {container.name}")
-                            break
-                    if port:
-                        break
-            if not port:
-                logging.debug(f"{EMOJIS['DEBUG']} No suitable port found for container {container.name} after checking labels and exposed ports.")
-
-        logging.debug(f"{EMOJIS['DEBUG']} Final port extracted: {port} for container {container.name}")
+            logging.debug("%s No specific Dashy port label found for %s, checking exposed ports.", EMOJIS['DEBUG'], container.name)
+            port = _first_host_port(container.ports)
+            if port:
+                logging.debug("%s Port %s found from exposed HostPort for container %s", EMOJIS['DEBUG'], port, container.name)
+            else:
+                logging.debug("%s No suitable port found for container %s after checking labels and exposed ports.", EMOJIS['DEBUG'], container.name)
         return port
     except Exception as e:
         logging.error(f"{EMOJIS['FAILURE']} Failed to extract port for {container.name}: {e}")
         return None
 
+def _first_host_port(ports):
+    # Inspect returns the bindings sorted by key, list summaries do not; going by key
+    # order makes both paths (and so scans and start events) pick the same port.
+    ports = ports or {}
+    for key in sorted(ports):
+        port_mappings = ports[key]
+        if port_mappings and isinstance(port_mappings, list):
+            for mapping in port_mappings:
+                if "HostPort" in mapping:
+                    return mapping["HostPort"]
+    return None
+
 def get_container_info(container):
     """
     Extracts relevant information (name, port) from a container if it meets inclusion criteria.
@@ -90,62 +565,36 @@ def get_container_info(container):
           matching DASHY_DOCKER_LABEL_REGEX AND the value of that label is NOT "false"
           (case-insensitive).
 
+    The labels are classified in a single pass by the shared LabelClassifier, which
+    also yields the port label; exposed ports are only read when there is none.
+
     Args:
         container: The Docker container object.
 
     Returns:
         dict: A dictionary containing 'name' and 'port' if the container should be included,
-              otherwise None.
-    """
-    labels = container.labels
-    logging.debug(f"{EMOJIS['DEBUG']} Trying to match labels for container {container.name} with pattern string from app_config: {DASHY_DOCKER_LABEL_REGEX}")
-    logging.debug(f"{EMOJIS['DEBUG']} Compiled DOCKER_LABEL_PATTERN is using pattern string: '{DOCKER_LABEL_PATTERN.pattern}' with flags {DOCKER_LABEL_PATTERN.flags}")
-    logging.debug(f"{EMOJIS['DEBUG']} Compiled DOCKER_IGNORE_LABEL_PATTERN is using pattern string: '{DOCKER_IGNORE_LABEL_PATTERN.pattern}' with flags {DOCKER_IGNORE_LABEL_PATTERN.flags}")
-    logging.debug(f"{EMOJIS['SCAN']} Inspecting container: {container.name}, labels: {labels}")
-
-    # 1. Check for ignore label first
-    for k_ignore, v_ignore in labels.items(): # Iterate over items (key, value)
-        if DOCKER_IGNORE_LABEL_PATTERN.match(k_ignore):
-            logging.debug(f"{EMOJIS['DEBUG']} Found potential ignore label key '{k_ignore}' with value '{v_ignore}'.")
-            if isinstance(v_ignore, str) and v_ignore.lower() == "true":
-                logging.debug(f"{EMOJIS['SKIP']} Container {container.name} ignored because label key '{k_ignore}' matched DASHY_DOCKER_IGNORE_LABEL_REGEX and its value is 'true'.")
-                return None # Ignore the container
-            else:
-                # If a label matches the ignore pattern but its value is not "true",
-                # it does not cause an ignore. The loop continues to check other labels,
-                # in case another label matches the ignore pattern with a "true" value.
-                logging.debug(f"{EMOJIS['DEBUG']} Ignore label key '{k_ignore}' matched, but value is not 'true' (it's '{v_ignore}'). Not ignoring based on this specific label.")
-    
-    # 2. If not ignored by a "true" ignore label, proceed with inclusion logic
-    include_container = False
-    if DASHY_EXPOSED_BY_DEFAULT:
-        include_container = True
-        logging.debug(f"{EMOJIS['DEBUG']} Container {container.name} considered for inclusion because DASHY_EXPOSED_BY_DEFAULT is true.")
-    else:
-        for k_include, v_include in labels.items():
-            if DOCKER_LABEL_PATTERN.match(k_include):
-                logging.debug(f"{EMOJIS['DEBUG']} Found potential inclusion label key '{k_include}' with value '{v_include}'.")
-                if isinstance(v_include, str) and v_include.lower() == "false":
-                    logging.debug(f"{EMOJIS['DEBUG']} Inclusion label key '{k_include}' has value 'false'. Not including based on this label. Checking other labels.")
-                    # This label explicitly says "false", so it doesn't grant inclusion.
-                    # Continue to check if other labels might grant inclusion.
-                else:
-                    # Label key matches and value is not "false" (e.g., "true", any other string, or no value)
-                    include_container = True
-                    logging.debug(f"{EMOJIS['DEBUG']} Container {container.name} considered for inclusion because label key '{k_include}' matched DASHY_DOCKER_LABEL_REGEX and value is not 'false'.")
-                    break # Found a valid inclusion label
-    
-    if not include_container:
-        logging.debug(f"{EMOJIS['SKIP']} Container {container.name} skipped (not exposed by default and no matching include label, or was explicitly ignored).")
+              otherwise None. The values of the routing labels (DASHY_DOCKER_SECTION_LABEL
+              and DASHY_DOCKER_FILE_LABEL) are added as 'section' and 'file' when set.
+    """
+    decision = get_label_classifier().classify(container.labels)
+    if not decision.included:
+        logging.debug("%s Container %s skipped: %s.", EMOJIS['SKIP'], container.name, decision.reason)
         return None
+    logging.debug("%s Container %s included: %s.", EMOJIS['DEBUG'], container.name, decision.reason)
 
     try:
         container_info = {
             "name": container.name,
-            "port": get_container_port(container)
+            "port": decision.port or get_container_port(container)
         }
-        logging.info(f"{EMOJIS['SUCCESS']} Including container: {container.name}")
-        logging.debug(f"{EMOJIS['DEBUG']} Container info extracted: {container_info}")
+        section = container.labels.get(DASHY_DOCKER_SECTION_LABEL)
+        if section:
+            container_info["section"] = section
+        file_name = container.labels.get(DASHY_DOCKER_FILE_LABEL)
+        if file_name:
+            container_info["file"] = file_name
+        logging.info("%s Including container: %s", EMOJIS['SUCCESS'], container.name)
+        logging.debug("%s Container info extracted: %s", EMOJIS['DEBUG'], container_info)
         return container_info
     except Exception as e:
         logging.error(f"{EMOJIS['FAILURE']} Failed to extract container info for {container.name}: {e}")
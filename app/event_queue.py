@@ -0,0 +1,178 @@
+"""
+A queue of Docker events that keeps only the latest event per container, and the
+cursor that lets a broken event stream resume where it stopped.
+
+Each event waits a short window before it can be taken. A later event for the same
+container within that window replaces it in place, so bursts like start, die, start,
+die for one container are processed once, with their final state.
+"""
+import threading
+import time
+from . import metrics
+
+
+class EventQueue:
+    """
+    Thread-safe FIFO of events keyed by container ID, with per-container coalescing.
+
+    Containers are taken in the order of their first pending event; the event returned
+    is the latest one received for that container. Like queue.Queue, every get() must
+    be followed by a task_done(), and join() waits until all taken events are done.
+
+    Args:
+        window_seconds (float): How long an event is held back before get() returns it.
+        docker_host (str): The host the events come from, for the metrics labels.
+    """
+
+    def __init__(self, window_seconds=0.0, docker_host=""):
+        self.window = max(0.0, window_seconds)
+        self.docker_host = docker_host
+        # container ID -> [ready_at, event]; dicts keep insertion order, which is the FIFO order.
+        self._pending = {}
+        self._unfinished = 0
+        self._condition = threading.Condition()
+        self.received = 0
+        self.collapsed = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        """The number of containers with an event waiting to be taken."""
+        return len(self._pending)
+
+    def put(self, container_id, event):
+        """
+        Queues an event, replacing the pending event of the same container if any.
+
+        Args:
+            container_id (str): The container the event is about.
+            event (dict): The Docker event.
+        """
+        with self._condition:
+            self.received += 1
+            pending = self._pending.get(container_id)
+            if pending is not None:
+                pending[1] = event
+                self.collapsed += 1
+                metrics.EVENTS_COLLAPSED.inc(docker_host=self.docker_host)
+                return
+            self._pending[container_id] = [time.monotonic() + self.window, event]
+            self._unfinished += 1
+            self.max_depth = max(self.max_depth, len(self._pending))
+            metrics.EVENT_QUEUE_DEPTH.set(len(self._pending), docker_host=self.docker_host)
+            self._condition.notify_all()
+
+    def get(self):
+        """
+        Takes the oldest pending event once its window has passed, blocking until then.
+
+        Returns:
+            dict: The latest event received for that container.
+        """
+        with self._condition:
+            while True:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                container_id = next(iter(self._pending))
+                ready_at, event = self._pending[container_id]
+                delay = ready_at - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                del self._pending[container_id]
+                metrics.EVENT_QUEUE_DEPTH.set(len(self._pending), docker_host=self.docker_host)
+                return event
+
+    def task_done(self):
+        """Marks an event returned by get() as fully processed."""
+        with self._condition:
+            self._unfinished -= 1
+            if self._unfinished <= 0:
+                self._unfinished = 0
+                self._condition.notify_all()
+
+    def join(self):
+        """Blocks until every queued event has been taken and marked done."""
+        with self._condition:
+            while self._unfinished:
+                self._condition.wait()
+
+
+class EventCursor:
+    """
+    The position of a consumer in a Docker event stream, for resuming it after a reconnect.
+
+    Holds the timeNano of the newest event seen and the events seen at exactly that
+    time. A stream opened with resume() replays the events from that instant on, so
+    those are the only ones seen twice; advance() tells them apart from new events
+    until the replay is over. Out-of-order events of a live stream are never dropped.
+    """
+
+    def __init__(self):
+        self.time_ns = None
+        # (Type, Action, actor ID) of the events seen at time_ns.
+        self._seen = set()
+        # The resume point and the events seen there, while its replay lasts.
+        self._replay_ns = None
+        self._replayed = set()
+        self.duplicates = 0
+
+    def since(self):
+        """
+        Returns the `since` value that resumes the stream at the newest event seen.
+
+        Returns:
+            str: Seconds with a nanosecond fraction, e.g. "1700000000.000000123", or None before the first event.
+        """
+        if self.time_ns is None:
+            return None
+        seconds, nanos = divmod(self.time_ns, 1_000_000_000)
+        return f"{seconds}.{nanos:09d}"
+
+    def resume(self):
+        """
+        Marks the newest event seen as the resume point of a new stream, whose replay advance() skips.
+
+        Returns:
+            str: The stream's `since` value (see since()).
+        """
+        self._replay_ns = self.time_ns
+        self._replayed = set(self._seen)
+        return self.since()
+
+    def advance(self, event):
+        """
+        Moves the cursor to an event from the stream.
+
+        Args:
+            event (dict): The Docker event.
+
+        Returns:
+            bool: False if the event was seen before (replayed after a resume), True otherwise.
+        """
+        time_ns = event.get("timeNano")
+        if time_ns is None:
+            return True
+        time_ns = int(time_ns)
+        key = (event.get("Type"), event.get("Action"), (event.get("Actor") or {}).get("ID") or event.get("id"))
+        if self._replay_ns is not None:
+            if time_ns < self._replay_ns or (time_ns == self._replay_ns and key in self._replayed):
+                self.duplicates += 1
+                return False
+            if time_ns > self._replay_ns:
+                # Past the resume point: the replay is over.
+                self._replay_ns = None
+                self._replayed = set()
+        if self.time_ns is None or time_ns > self.time_ns:
+            self.time_ns = time_ns
+            self._seen = {key}
+        elif time_ns == self.time_ns:
+            self._seen.add(key)
+        return True
+
+    def skip_to(self, time_ns):
+        """Moves the cursor forward to time_ns (e.g. the `until` of a stream that ended), if it is behind."""
+        if self.time_ns is None or time_ns > self.time_ns:
+            self.time_ns = time_ns
+            self._seen = set()
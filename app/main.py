@@ -1,91 +1,449 @@
 """
-Main application entry point.
-Initializes Docker client, loads Dashy configuration, performs an initial scan of running containers,
-and then listens for Docker events to dynamically update the Dashy configuration.
-Handles graceful shutdown and retries on connection errors.
+Main application entry point (`python -m app.main [--once | --check]`).
+Loads the Dashy configuration, then watches every configured Docker host in its own thread:
+each performs an initial scan of running containers and then listens for Docker events to
+dynamically update the shared Dashy configuration. Events are coalesced per container, their
+Docker lookups run on a shared, bounded worker pool and their changes are applied in event
+order. Removals of stopped containers wait out a grace period, so crash-looping containers
+keep their entries. With DASHY_SWARM_MODE, Swarm services take the place of containers.
+Handles graceful shutdown and retries on connection errors per host. With --once every
+host is reconciled a single time and the process exits, for cron jobs and CI.
 """
-from .docker_utils import get_docker_client, get_container_info
-from .dashy_config import (
-    load_initial_config,
-    apply_startup_reset,
-    save_config,
-    update_entry,
-    remove_entry
-)
-import docker
+import argparse
+import atexit
+import functools
+import logging
+import queue
+import signal
+import threading
+import time
 from .app_config import (
     setup_logging,
+    DASHY_ASYNC_RUNTIME,
+    DASHY_RESET_ON_START,
+    DASHY_RESYNC_INTERVAL_SECONDS,
+    DASHY_STATE_PATH,
+    DASHY_DOCKER_WORKERS,
+    DASHY_EVENT_COALESCE_MS,
+    DASHY_REMOVAL_GRACE_SECONDS,
+    DASHY_SWARM_MODE,
     EMOJIS
 )
-import requests
-import time
-import logging
+from . import metrics
+from .event_queue import EventCursor, EventQueue
+from .scheduler import Scheduler
+
+# docker, requests and yaml (docker_utils, dashy_config, snapshot) are imported by the
+# functions that use them, so `--help` and `--check` never load the Docker SDK.
+
+# Set by main().
+current_config = None
+container_snapshot = None
+host_names = []
+# One timer thread for the grace periods of all hosts' stopped containers.
+pending_removals = Scheduler("removals")
+
+def _handle_sigterm(signum, frame):
+    """Turns `docker stop` (SIGTERM) into the same graceful shutdown as Ctrl+C."""
+    raise KeyboardInterrupt
+
+def scan_host(client, docker_host: str):
+    """
+    Reconciles the entries of one Docker host with its matching running containers.
+
+    Only the differences are written, in one commit. Entries this host wrote whose
+    containers are no longer running are removed (by their grace-period removal, if
+    one is pending); entries loaded from the file
+    only if DASHY_RESET_ON_START is true. With
+    DASHY_SWARM_MODE the host's Swarm services are listed instead, in one call.
+
+    Args:
+        client (docker.DockerClient): A connected client for the host.
+        docker_host (str): The host's name, for the {docker_host} placeholder.
+    """
+    from .dashy_config import reconcile
+    from .docker_utils import list_containers, list_services
+    logging.info(f"{EMOJIS['SCAN']} Scanning existing containers on {docker_host}...")
+    scan_started = time.monotonic()
+    # A single raw API call: names, labels and ports come from the list summary
+    # instead of one inspect per container, decoded into compact records.
+    containers = list_services(client) if DASHY_SWARM_MODE else list_containers(client)
+    misses_before = container_snapshot.misses
+    infos = container_snapshot.evaluate(docker_host, containers)
+    for info in infos:
+        info["docker_host"] = docker_host
+    for info in infos:
+        # Still (or again) running, so a removal from an earlier stop no longer applies.
+        cancel_removal(docker_host, info["name"])
+    pending = [name for host, name in pending_removals.keys() if host == docker_host]
+    counts = reconcile(
+        current_config, infos, docker_host, docker_hosts=host_names, prune=DASHY_RESET_ON_START, pending_removals=pending
+    )
+    container_snapshot.save()
+    logging.info(
+        f"{EMOJIS['SUCCESS']} Scan of {docker_host} finished in {(time.monotonic() - scan_started) * 1000:.0f} ms: "
+        f"{len(containers)} containers ({container_snapshot.misses - misses_before} new or changed), {len(infos)} included, "
+        f"{counts['added']} added, {counts['updated']} updated, {counts['removed']} removed"
+    )
+
+def schedule_removal(docker_host: str, name: str, event_time_ns: int = None):
+    """Removes a stopped container's entry once DASHY_REMOVAL_GRACE_SECONDS have passed without it starting again."""
+    from .dashy_config import remove_entry
+    if DASHY_REMOVAL_GRACE_SECONDS > 0:
+        logging.debug(f"{EMOJIS['REMOVE']} Removing entry for {name} ({docker_host}) in {DASHY_REMOVAL_GRACE_SECONDS}s unless it starts again")
+    removal = functools.partial(remove_entry, current_config, name, docker_host, event_time_ns=event_time_ns)
+    pending_removals.call_later((docker_host, name), DASHY_REMOVAL_GRACE_SECONDS, removal)
 
-setup_logging()
-
-logging.info(f"{EMOJIS['DOCKER']} Initializing Docker client...")
-try:
-    client = get_docker_client()
-    client.ping()
-    logging.info(f"{EMOJIS['SUCCESS']} Docker client initialized and connected.")
-except docker.errors.DockerException as e:
-    logging.error(f"{EMOJIS['FAILURE']} Failed to connect to Docker: {e}")
-    exit(1) 
-
-logging.info(f"{EMOJIS['CONFIG']} Loading and initializing Dashy config...")
-current_config = load_initial_config()
-if apply_startup_reset(current_config):
-    save_config(current_config)
-
-logging.info(f"{EMOJIS['SCAN']} Scanning existing containers on startup...")
-for container in client.containers.list():
-    logging.debug(f"{EMOJIS['DOCKER']} Found container: {container.name}")
-    info = get_container_info(container)
+def cancel_removal(docker_host: str, name: str):
+    """Keeps the entry of a container that started again within the grace period."""
+    if pending_removals.cancel((docker_host, name)):
+        metrics.REMOVALS_CANCELLED.inc(docker_host=docker_host)
+        logging.info(f"{EMOJIS['ADD']} Container {name} ({docker_host}) restarted within the grace period; keeping its entry")
+
+def start_entry(info: dict, event_time_ns: int = None):
+    """Cancels any pending removal of a started container's entry, then updates the entry."""
+    from .dashy_config import update_entry
+    cancel_removal(info["docker_host"], info["name"])
+    update_entry(current_config, info, event_time_ns=event_time_ns)
+
+def event_actor_id(event: dict):
+    """Returns the ID of the container or service an event is about."""
+    return (event.get("Actor") or {}).get("ID") or event.get("id")
+
+def is_actionable_event(docker_host: str, event: dict):
+    """Returns True for container (or, in Swarm mode, service) events the sync reacts to; counts and logs every event."""
+    from .docker_utils import get_event_type
+    event_type, event_actions = get_event_type()
+    if event["Type"] != event_type:
+        logging.debug(f"{EMOJIS['EVENT']} Received non-{event_type} event: Type={event.get('Type')}, Action={event.get('Action')}")
+        return False
+    action = event["Action"]
+    metrics.EVENTS_RECEIVED.inc(action=action)
+    logging.debug(f"{EMOJIS['EVENT']} Received event: {action} for {event_type} ID: {event_actor_id(event)} on {docker_host}")
+    if action not in event_actions:
+        metrics.EVENTS_FILTERED.inc(action=action, reason="action")
+        return False
+    return True
+
+def prepare_event(client, docker_host: str, event: dict):
+    """
+    Does the Docker lookups for one event from the given host, on a worker thread.
+
+    Returns:
+        callable: Applies the event's change to the config, or None if it changes nothing.
+    """
+    from .docker_utils import get_container_info, get_event_container
+    action = event["Action"]
+    if event["Type"] == "service":
+        return prepare_service_event(client, docker_host, event)
+    # Name and labels come from the event itself, so `--rm` containers
+    # that are already gone can still be removed.
+    container = get_event_container(client, event)
+    if container is None:
+        metrics.EVENTS_FILTERED.inc(action=action, reason="not_found")
+        return None
+
+    if action == "start":
+        info = get_container_info(container)
+        if info:
+            logging.info(f"{EMOJIS['ADD']} Updating entry for started container: {info['name']} ({docker_host})")
+            info["docker_host"] = docker_host
+            return functools.partial(start_entry, info, event_time_ns=event.get("timeNano"))
+        metrics.EVENTS_FILTERED.inc(action=action, reason="labels")
+        logging.debug(f"{EMOJIS['SKIP']} Started container {container.name} does not meet exposure criteria")
+        return None
+    logging.info(f"{EMOJIS['REMOVE']} Removing entry for stopped/died container: {container.name} ({docker_host})")
+    return functools.partial(schedule_removal, docker_host, container.name, event_time_ns=event.get("timeNano"))
+
+def prepare_service_event(client, docker_host: str, event: dict):
+    """
+    Does the Docker lookups for one Swarm service event, on a worker thread.
+
+    Creates and updates (re)publish the service's entry; an update that drops the
+    service's Dashy labels removes it. Task (replica) churn sends no service events,
+    so it never reaches the config.
+
+    Returns:
+        callable: Applies the event's change to the config, or None if it changes nothing.
+    """
+    from .dashy_config import remove_entry
+    from .docker_utils import get_container_info, get_event_service
+    action = event["Action"]
+    service = get_event_service(client, event)
+    if service is None:
+        metrics.EVENTS_FILTERED.inc(action=action, reason="not_found")
+        return None
+    if action == "remove":
+        logging.info(f"{EMOJIS['REMOVE']} Removing entry for removed service: {service.name} ({docker_host})")
+        return functools.partial(schedule_removal, docker_host, service.name, event_time_ns=event.get("timeNano"))
+
+    info = get_container_info(service)
     if info:
-        logging.info(f"{EMOJIS['ADD']} Adding existing container on startup: {info['name']}")
-        update_entry(current_config, info)
-    else:
-        logging.debug(f"{EMOJIS['SKIP']} Container {container.name} does not meet exposure criteria for startup scan")
+        logging.info(f"{EMOJIS['ADD']} Updating entry for service: {info['name']} ({docker_host})")
+        info["docker_host"] = docker_host
+        return functools.partial(start_entry, info, event_time_ns=event.get("timeNano"))
+    metrics.EVENTS_FILTERED.inc(action=action, reason="labels")
+    if action == "update":
+        return functools.partial(remove_entry, current_config, service.name, docker_host, event_time_ns=event.get("timeNano"))
+    logging.debug(f"{EMOJIS['SKIP']} Service {service.name} does not meet exposure criteria")
+    return None
+
+def dispatch_events(docker_host: str, events: EventQueue, prepared: queue.Queue):
+    """
+    Hands the coalesced events of one host to the Docker worker pool, in queue order.
+
+    Each event is queued together with the client of the connection it arrived on.
+    """
+    from .docker_utils import get_docker_executor
+    executor = get_docker_executor()
+    while True:
+        client, event = events.get()
+        try:
+            prepared.put(executor.submit(prepare_event, client, docker_host, event))
+        finally:
+            events.task_done()
 
-logging.info(f"{EMOJIS['EVENT']} Listening for Docker events...")
+def apply_prepared_events(docker_host: str, prepared: queue.Queue):
+    """
+    Applies the changes of one host's events in the order the events arrived.
 
-while True:
+    The queue holds the futures of prepare_event in event order; each is waited for
+    in turn, so a slow lookup holds back later changes instead of being overtaken.
+    """
+    while True:
+        future = prepared.get()
+        try:
+            apply = future.result()
+            if apply is not None:
+                apply()
+        except Exception as e:
+            logging.error(f"{EMOJIS['FAILURE']} Failed to apply Docker event of {docker_host}: {e}")
+        finally:
+            prepared.task_done()
+
+def watch_host(docker_host: str, base_url: str):
+    """
+    Watches one Docker daemon for the lifetime of the process.
+
+    Connects, scans the running containers, then applies the event stream. Every
+    DASHY_RESYNC_INTERVAL_SECONDS the stream is ended and the host rescanned, to catch
+    anything missed; the next stream resumes at the end of the previous one, so no
+    event is lost around the rescan. On any error the host reconnects (and rescans)
+    on its own, without affecting other hosts, after a jittered exponential backoff.
+    The new stream replays the events since the last one read, skipping those already
+    seen, so nothing that happened while disconnected is lost. All hosts share one
+    config, written by the single write-behind flush.
+
+    Args:
+        docker_host (str): The host's name, for the {docker_host} placeholder.
+        base_url (str): The daemon URL, e.g. "unix://var/run/docker.sock".
+    """
+    import docker
+    import requests
+    from .dashy_config import write_stats
+    from .docker_utils import get_docker_client, get_event_filters, reconnect_delay
+    event_filters = get_event_filters()
+    cursor = EventCursor()
+    # Holds at most one event per container, so bursts cost one lookup per container.
+    events = EventQueue(DASHY_EVENT_COALESCE_MS / 1000, docker_host)
+    # Bounded, so a stalled daemon cannot make the backlog of lookups grow without limit.
+    prepared = queue.Queue(maxsize=DASHY_DOCKER_WORKERS * 4)
+    threading.Thread(target=dispatch_events, args=(docker_host, events, prepared), name=f"dispatch-{docker_host}", daemon=True).start()
+    threading.Thread(target=apply_prepared_events, args=(docker_host, prepared), name=f"apply-{docker_host}", daemon=True).start()
+
+    def drain():
+        events.join()
+        prepared.join()
+    connected_before = False
+    failures = 0
+    while True:
+        if failures:
+            delay = reconnect_delay(failures - 1)
+            logging.info(f"{EMOJIS['NETWORK']} Reconnecting to Docker host {docker_host} in {delay:.1f}s (attempt {failures})")
+            time.sleep(delay)
+        if connected_before:
+            metrics.DOCKER_RECONNECTS.inc(docker_host=docker_host)
+        connected_before = True
+        # Events of the previous connection are applied before the rescan.
+        drain()
+        try:
+            logging.info(f"{EMOJIS['DOCKER']} Connecting to Docker host {docker_host} at {base_url}...")
+            client = get_docker_client(base_url)
+            client.ping()
+            logging.info(f"{EMOJIS['SUCCESS']} Docker client for {docker_host} initialized and connected.")
+            writes_before = write_stats["writes"]
+            scan_host(client, docker_host)
+            commit_startup_scan(writes_before)
+            since = cursor.resume()
+            logging.info(
+                f"{EMOJIS['EVENT']} Listening for Docker events on {docker_host} (daemon filters: {event_filters or 'none'}"
+                f"{f', replaying since {since}' if since else ''})..."
+            )
+            while True:
+                until = int(time.time()) + DASHY_RESYNC_INTERVAL_SECONDS if DASHY_RESYNC_INTERVAL_SECONDS > 0 else None
+                for event in client.events(decode=True, filters=event_filters, since=since, until=until):
+                    failures = 0
+                    if not cursor.advance(event):
+                        logging.debug(f"{EMOJIS['SKIP']} Skipping replayed event {event.get('Action')} for {event_actor_id(event)} on {docker_host}")
+                        continue
+                    if is_actionable_event(docker_host, event):
+                        events.put(event_actor_id(event), (client, event))
+                if until is None:
+                    logging.warning(f"{EMOJIS['NETWORK']} Docker event stream of {docker_host} closed. Reconnecting...")
+                    failures = 1
+                    break
+                failures = 0
+                drain()
+                logging.debug(
+                    f"{EMOJIS['SCAN']} Periodic resync of {docker_host}; {events.received} events received so far, "
+                    f"{events.collapsed} collapsed, max queue depth {events.max_depth}"
+                )
+                scan_host(client, docker_host)
+                cursor.skip_to(until * 1_000_000_000)
+                since = cursor.resume()
+        except requests.exceptions.ReadTimeout:
+            logging.warning(f"{EMOJIS['NETWORK']} Docker event stream of {docker_host} timed out. Reconnecting...")
+            failures += 1
+        except docker.errors.APIError as e:
+            logging.error(f"{EMOJIS['FAILURE']} Docker API error in event stream of {docker_host}: {e}. Reconnecting...")
+            failures += 1
+        except docker.errors.DockerException as e:
+            logging.error(f"{EMOJIS['FAILURE']} Failed to connect to Docker host {docker_host}: {e}. Retrying...")
+            failures += 1
+        except Exception as e:
+            logging.error(f"{EMOJIS['FAILURE']} Unexpected error in event stream of {docker_host}: {e}. Attempting to reconnect...")
+            failures += 1
+
+def commit_startup_scan(writes_before: int):
+    """
+    Writes the changes of a host's first scan right away, instead of at the end of the
+    flush window, and logs the number of config writes the scan cost and the time from
+    process start to the first such commit.
+
+    Args:
+        writes_before (int): write_stats["writes"] before the scan.
+    """
+    from .dashy_config import flush_config, write_stats
+    flush_config()
+    logging.info(f"{EMOJIS['SAVE']} Scan committed with {write_stats['writes'] - writes_before} config write(s)")
+    startup_seconds = metrics.observe_startup()
+    if startup_seconds is not None:
+        logging.info(f"{EMOJIS['SUCCESS']} First commit {startup_seconds * 1000:.0f} ms after process start")
+
+def run_once(docker_hosts: list):
+    """
+    Reconciles every Docker host a single time and writes the config, without watching events.
+
+    A host that cannot be reached is skipped; its entries are left as they are.
+
+    Args:
+        docker_hosts (list): (name, base_url) tuples, as returned by get_docker_hosts.
+
+    Returns:
+        int: The exit code, 0 if every host was reconciled and 1 otherwise.
+    """
+    import docker
+    import requests
+    from .dashy_config import write_stats
+    from .docker_utils import get_docker_client
+    writes_before = write_stats["writes"]
+    failed = []
+    for docker_host, base_url in docker_hosts:
+        try:
+            scan_host(get_docker_client(base_url), docker_host)
+        except (docker.errors.DockerException, requests.exceptions.RequestException) as e:
+            logging.error(f"{EMOJIS['FAILURE']} Failed to reconcile Docker host {docker_host}: {e}")
+            failed.append(docker_host)
+    commit_startup_scan(writes_before)
+    if failed:
+        logging.error(f"{EMOJIS['FAILURE']} One-shot sync finished with errors on: {', '.join(failed)}")
+        return 1
+    logging.info(f"{EMOJIS['SUCCESS']} One-shot sync of {len(docker_hosts)} Docker host(s) finished")
+    return 0
+
+def parse_args(argv=None):
+    """Parses the command line; see `python -m app.main --help`."""
+    parser = argparse.ArgumentParser(prog="python -m app.main", description="Keeps the Docker section(s) of a Dashy config in sync with running containers.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="reconcile every Docker host once, write the config and exit (for cron and CI)")
+    mode.add_argument("--check", action="store_true", help="validate the Dashy config and entry templates without connecting to Docker, then exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Runs Dashy Docker Sync.
+
+    Without options every Docker host is watched until SIGINT/SIGTERM. The options
+    select one of the one-shot modes instead; neither starts the metrics server.
+
+    Args:
+        argv (list): The command-line arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit code.
+    """
+    global current_config, container_snapshot, host_names
+    args = parse_args(argv)
+    setup_logging()
+    from .dashy_config import load_initial_config, flush_config
+
+    if args.check:
+        logging.info(f"{EMOJIS['CONFIG']} Checking Dashy config and entry templates...")
+        try:
+            load_initial_config()
+        except ValueError:
+            # An invalid entry template or config file; already logged.
+            return 1
+        logging.info(f"{EMOJIS['SUCCESS']} Config and entry templates are valid")
+        return 0
+
+    # Pending write-behind changes must never be lost, however the process exits.
+    atexit.register(flush_config)
+    if not args.once:
+        signal.signal(signal.SIGTERM, _handle_sigterm)
+        metrics.start_metrics_server()
+        if DASHY_ASYNC_RUNTIME and DASHY_SWARM_MODE:
+            logging.warning(f"{EMOJIS['WARNING']} DASHY_SWARM_MODE is not supported by the async runtime; using the threaded runtime")
+        elif DASHY_ASYNC_RUNTIME:
+            from .docker_utils import DOCKER_HOSTS
+            if DOCKER_HOSTS:
+                logging.warning(f"{EMOJIS['WARNING']} DOCKER_HOSTS is not supported by the async runtime; only DOCKER_SOCKET is watched")
+            from .async_runtime import run
+            run()
+            return 0
+
+    from .docker_utils import get_docker_hosts
+    from .snapshot import ContainerSnapshot
+    logging.info(f"{EMOJIS['CONFIG']} Loading and initializing Dashy config...")
     try:
-        event_stream = client.events(decode=True)
-        for event in event_stream:
-            if event["Type"] == "container":
-                action = event["Action"]
-                container_id = event["id"]
-                logging.debug(f"{EMOJIS['EVENT']} Received event: {action} for container ID: {container_id}")
-                try:
-                    container = client.containers.get(container_id)
-                except docker.errors.NotFound:
-                    logging.warning(f"{EMOJIS['WARNING']} Container not found for ID: {container_id}")
-                    continue
-
-                if action == "start":
-                    info = get_container_info(container)
-                    if info:
-                        logging.info(f"{EMOJIS['ADD']} Updating entry for started container: {info['name']}")
-                        update_entry(current_config, info)
-                    else:
-                        logging.debug(f"{EMOJIS['SKIP']} Started container {container.name} does not meet exposure criteria")
-
-                elif action in ("die", "stop"):
-                    logging.info(f"{EMOJIS['REMOVE']} Removing entry for stopped/died container: {container.name}")
-                    remove_entry(current_config, container.name)
-            else:
-                logging.debug(f"{EMOJIS['EVENT']} Received non-container event: Type={event.get('Type')}, Action={event.get('Action')}")
-    
+        current_config = load_initial_config()
+    except ValueError:
+        # An invalid entry template or config file; already logged.
+        return 1
+    container_snapshot = ContainerSnapshot(DASHY_STATE_PATH)
+
+    docker_hosts = get_docker_hosts()
+    host_names = [name for name, _ in docker_hosts]
+    if len(set(host_names)) != len(host_names):
+        logging.warning(f"{EMOJIS['WARNING']} Duplicate Docker host names in {host_names}; their entries will share sections and titles.")
+    if args.once:
+        return run_once(docker_hosts)
+
+    watchers = [
+        threading.Thread(target=watch_host, args=(name, base_url), name=f"watch-{name}", daemon=True)
+        for name, base_url in docker_hosts
+    ]
+    for watcher in watchers:
+        watcher.start()
+
+    try:
+        # The watchers reconnect forever; the main thread only waits for Ctrl+C / SIGTERM.
+        while any(watcher.is_alive() for watcher in watchers):
+            time.sleep(1)
     except KeyboardInterrupt:
         logging.info(f"\n{EMOJIS['SHUTDOWN']} Gracefully shutting down Dashy Docker Sync... Bye!\n")
-        break
-    except requests.exceptions.ReadTimeout:
-        logging.warning(f"{EMOJIS['NETWORK']} Docker event stream timed out. Reconnecting...")
-        time.sleep(5)
-    except docker.errors.APIError as e:
-        logging.error(f"{EMOJIS['FAILURE']} Docker API error in event stream: {e}. Reconnecting...")
-        time.sleep(5)
-    except Exception as e:
-        logging.error(f"{EMOJIS['FAILURE']} Unexpected error in event stream: {e}. Attempting to reconnect...")
-        time.sleep(10)
\ No newline at end of file
+        flush_config()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,271 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Counters and histograms are kept in memory and, when DASHY_METRICS_PORT is set,
+served on /metrics by a small HTTP server running in a background thread.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .app_config import (
+    DASHY_METRICS_PORT,
+    DASHY_METRICS_ADDRESS,
+    EMOJIS
+)
+import logging
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """
+    A monotonically increasing counter, optionally split by labels.
+
+    Args:
+        name (str): The metric name.
+        documentation (str): The HELP text.
+        labelnames (tuple): The label names, given as keyword arguments to inc().
+    """
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Returns the current value for the given labels (0 if never incremented)."""
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+class Gauge:
+    """
+    A value that can go up and down (e.g. a queue depth), optionally split by labels.
+
+    Args:
+        name (str): The metric name.
+        documentation (str): The HELP text.
+        labelnames (tuple): The label names, given as keyword arguments to set().
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def set(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        """Returns the current value for the given labels (0 if never set)."""
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+class Histogram:
+    """
+    A histogram of observed values (e.g. durations in seconds), optionally split by labels.
+
+    Args:
+        name (str): The metric name.
+        documentation (str): The HELP text.
+        labelnames (tuple): The label names, given as keyword arguments to observe().
+        buckets (tuple): The upper bounds of the buckets; +Inf is added automatically.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the with-block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        """Returns the number of observations for the given labels."""
+        counts, _ = self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), ([0], 0.0))
+        return counts[-1]
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(bound))])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {counts[-1]}")
+        return lines
+
+EVENTS_RECEIVED = Counter("dashy_sync_events_received_total", "Docker events received, by action.", ("action",))
+EVENTS_FILTERED = Counter("dashy_sync_events_filtered_total", "Docker events dropped without changing the config, by action and reason.", ("action", "reason"))
+EVENT_COMMIT_LAG = Histogram("dashy_sync_event_commit_lag_seconds", "Time from a Docker event (timeNano) to the commit of its change.", buckets=LAG_BUCKETS)
+EVENTS_COLLAPSED = Counter("dashy_sync_events_collapsed_total", "Docker events superseded by a later event for the same container before being processed, by Docker host.", ("docker_host",))
+EVENT_QUEUE_DEPTH = Gauge("dashy_sync_event_queue_depth", "Containers with an event waiting to be processed, by Docker host.", ("docker_host",))
+REMOVALS_CANCELLED = Counter("dashy_sync_removals_cancelled_total", "Entry removals cancelled because the container started again within the grace period, by Docker host.", ("docker_host",))
+DOCKER_API_SECONDS = Histogram("dashy_sync_docker_api_seconds", "Latency of Docker API calls, by call.", ("call",))
+DOCKER_RECONNECTS = Counter("dashy_sync_docker_reconnects_total", "Reconnects to the Docker event stream, by Docker host.", ("docker_host",))
+CONFIG_SAVE_SECONDS = Histogram("dashy_sync_config_save_seconds", "Duration of save_config, including suppressed writes.")
+CONFIG_WRITES = Counter("dashy_sync_config_writes_total", "Config saves, by result (written, suppressed, failed).", ("result",))
+CONFIG_WRITTEN_BYTES = Counter("dashy_sync_config_written_bytes_total", "Bytes written to the Dashy config file.")
+STARTUP_SECONDS = Gauge("dashy_sync_startup_seconds", "Time from process start to the first committed scan of the Docker hosts.")
+CONFIG_COALESCED = Counter("dashy_sync_config_coalesced_changes_total", "Config changes folded into another change's write by the write-behind flush.")
+
+# Event timestamps (nanoseconds) whose changes have not been committed yet.
+_pending_event_times = []
+_pending_lock = threading.Lock()
+
+def record_pending_event(time_nano):
+    """Remembers the timestamp of an event whose change will be committed by the next flush."""
+    if time_nano:
+        with _pending_lock:
+            _pending_event_times.append(time_nano)
+
+def observe_commit():
+    """Observes the event-to-commit lag of all pending events; called after each flush."""
+    with _pending_lock:
+        pending = _pending_event_times[:]
+        _pending_event_times.clear()
+    now = time.time_ns()
+    for time_nano in pending:
+        EVENT_COMMIT_LAG.observe(max(0, now - int(time_nano)) / 1e9)
+
+# Used as the process start when /proc is not available; metrics is imported early.
+_imported_at = time.monotonic()
+_startup_lock = threading.Lock()
+_startup_observed = False
+
+def process_uptime():
+    """Returns the seconds since the process started (from /proc on Linux, else since this module was imported)."""
+    try:
+        with open("/proc/self/stat") as f:
+            # starttime is field 22; the fields after the ")" of the command name start at field 3.
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.monotonic() - _imported_at
+
+def observe_startup():
+    """
+    Sets STARTUP_SECONDS to the current process uptime, the first time it is called.
+
+    Returns:
+        float: The startup time in seconds, or None if it was already observed.
+    """
+    global _startup_observed
+    with _startup_lock:
+        if _startup_observed:
+            return None
+        _startup_observed = True
+    seconds = process_uptime()
+    STARTUP_SECONDS.set(seconds)
+    return seconds
+
+def render():
+    """Returns all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{EMOJIS['NETWORK']} Metrics request: {format % args}")
+
+def start_metrics_server(port: int = DASHY_METRICS_PORT, address: str = DASHY_METRICS_ADDRESS):
+    """
+    Serves /metrics on the given address and port from a background thread.
+
+    Args:
+        port (int): The port to listen on; 0 or less disables the endpoint.
+        address (str): The address to bind to.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if disabled.
+    """
+    if port <= 0:
+        return None
+    server = ThreadingHTTPServer((address, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logging.info(f"{EMOJIS['NETWORK']} Serving metrics on http://{address}:{server.server_address[1]}/metrics")
+    return server
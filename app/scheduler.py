@@ -0,0 +1,110 @@
+"""
+Runs keyed actions after a delay, all from one background thread.
+
+Used for the removal grace period: a stopped container's removal is scheduled
+instead of applied, and cancelled if the container starts again in time. Pending
+actions sit in a heap ordered by due time, so thousands of them cost one thread.
+"""
+import heapq
+import itertools
+import threading
+import time
+from .app_config import EMOJIS
+import logging
+
+
+class Scheduler:
+    """
+    A timer heap with one worker thread, started on first use.
+
+    Each action has a key; scheduling a key that is already pending keeps the
+    original due time, and cancel(key) drops the pending action.
+
+    Args:
+        name (str): The worker thread's name.
+    """
+
+    def __init__(self, name="scheduler"):
+        self.name = name
+        # (due, sequence, key); entries whose sequence no longer matches _actions are stale.
+        self._heap = []
+        self._actions = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    @property
+    def pending(self):
+        """The number of actions waiting to run."""
+        return len(self._actions)
+
+    def keys(self):
+        """Returns the keys of the actions waiting to run."""
+        with self._condition:
+            return list(self._actions)
+
+    def call_later(self, key, delay, action):
+        """
+        Runs action() after delay seconds unless cancel(key) is called first.
+
+        With a delay of 0 or less the action runs right away, in the calling thread.
+
+        Args:
+            key: Identifies the action, e.g. (docker_host, container name).
+            delay (float): Seconds to wait.
+            action (callable): Called without arguments.
+
+        Returns:
+            bool: False if an action with this key was already pending (it is kept).
+        """
+        if delay <= 0:
+            action()
+            return True
+        with self._condition:
+            if key in self._actions:
+                return False
+            due = time.monotonic() + delay
+            sequence = next(self._sequence)
+            self._actions[key] = (sequence, action)
+            heapq.heappush(self._heap, (due, sequence, key))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return True
+
+    def cancel(self, key):
+        """
+        Drops the pending action with this key.
+
+        Returns:
+            bool: True if an action was pending.
+        """
+        with self._condition:
+            # The heap entry is left behind and skipped when it comes up.
+            return self._actions.pop(key, None) is not None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    due, sequence, key = self._heap[0]
+                    pending = self._actions.get(key)
+                    if pending is None or pending[0] != sequence:
+                        heapq.heappop(self._heap)
+                        continue
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    del self._actions[key]
+                    action = pending[1]
+                    break
+            try:
+                action()
+            except Exception as e:
+                logging.error(f"{EMOJIS['FAILURE']} Scheduled action for {key} failed: {e}")
@@ -0,0 +1,139 @@
+"""
+Persists what the sync learned about each running container between restarts.
+
+For every container the snapshot stores a fingerprint of everything the inclusion
+decision depends on (name, labels and port bindings) together with the resulting
+container info. On a warm restart only containers whose fingerprint changed are
+evaluated again.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from .app_config import EMOJIS
+from . import docker_utils
+from .dashy_config import write_atomic
+import logging
+
+SNAPSHOT_VERSION = 1
+
+def container_fingerprint(container):
+    """
+    Returns a fingerprint of the container's name, labels and port bindings.
+
+    Args:
+        container: A Docker container or ContainerView with known ports.
+
+    Returns:
+        str: A short hex digest that changes whenever any of the three changes.
+    """
+    payload = json.dumps([container.name, container.labels, container.ports], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def _settings_fingerprint():
+    """Fingerprint of the settings the inclusion decision depends on; a change invalidates the snapshot."""
+    settings = [
+        docker_utils.DOCKER_LABEL_PATTERN.pattern,
+        docker_utils.DOCKER_IGNORE_LABEL_PATTERN.pattern,
+        docker_utils.DOCKER_PORT_LABEL_PATTERN.pattern,
+        docker_utils.DASHY_EXPOSED_BY_DEFAULT,
+        docker_utils.DASHY_DOCKER_SECTION_LABEL,
+        docker_utils.DASHY_DOCKER_FILE_LABEL,
+    ]
+    return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()[:32]
+
+class ContainerSnapshot:
+    """
+    The on-disk state file: per Docker host and container ID, a fingerprint and the
+    container info (None for excluded containers) from the last evaluation.
+
+    Args:
+        path (str or Path): The state file; None or "" keeps the snapshot in memory only.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path) if path else None
+        self.settings = _settings_fingerprint()
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            state = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logging.warning(f"{EMOJIS['WARNING']} Ignoring unreadable state file {self.path}: {e}")
+            return
+        if state.get("version") != SNAPSHOT_VERSION or state.get("settings") != self.settings:
+            logging.info(f"{EMOJIS['CONFIG']} Label settings changed since the last run; re-evaluating all containers")
+            return
+        self._hosts = state.get("hosts") or {}
+        logging.debug(f"{EMOJIS['DEBUG']} Loaded state for {sum(len(c) for c in self._hosts.values())} containers from {self.path}")
+
+    def evaluate(self, docker_host, containers):
+        """
+        Returns the container info of every included container, re-evaluating only
+        containers that are new or whose fingerprint changed.
+
+        Containers of the host that are no longer running are dropped from the snapshot.
+        The re-evaluations run on the Docker worker pool; the result keeps the order
+        of the containers.
+
+        Args:
+            docker_host (str): The host the containers run on.
+            containers (list): The host's running containers, with known ports.
+
+        Returns:
+            list: Container info dicts (copies), as returned by get_container_info.
+        """
+        with self._lock:
+            previous = self._hosts.get(docker_host, {})
+        fingerprints = [container_fingerprint(container) for container in containers]
+        changed = [
+            container for container, fingerprint in zip(containers, fingerprints)
+            if (previous.get(container.id) or {}).get("fingerprint") != fingerprint
+        ]
+        # Evaluated outside the lock, so other hosts are not held up by this one's Docker calls.
+        evaluated = dict(zip((container.id for container in changed), docker_utils.get_container_infos(changed)))
+
+        infos = []
+        current = {}
+        for container, fingerprint in zip(containers, fingerprints):
+            if container.id in evaluated:
+                info = evaluated[container.id]
+            else:
+                info = previous[container.id].get("info")
+            current[container.id] = {"fingerprint": fingerprint, "info": info}
+            if info:
+                infos.append(dict(info))
+        with self._lock:
+            self.hits += len(containers) - len(changed)
+            self.misses += len(changed)
+            if changed or current.keys() != previous.keys():
+                self._dirty = True
+            self._hosts[docker_host] = current
+        return infos
+
+    def save(self):
+        """
+        Writes the state file if anything changed since it was loaded or last saved.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return False
+            payload = json.dumps({"version": SNAPSHOT_VERSION, "settings": self.settings, "hosts": self._hosts}, sort_keys=True)
+            self._dirty = False
+        try:
+            write_atomic(self.path, payload.encode("utf-8"))
+            return True
+        except OSError as e:
+            logging.warning(f"{EMOJIS['WARNING']} Could not write state file {self.path}: {e}")
+            return False
@@ -0,0 +1,237 @@
+"""
+Replays startup scans and event storms from a synthetic Docker fleet through the sync.
+
+Runs fully offline: containers are generated in memory (with Compose-style labels and
+port bindings) and served by a fake Docker client, while the Dashy config is written
+to a temporary directory through the real get_container_info, update_entry,
+remove_entry and save_config code paths.
+
+Usage:
+    python -m benchmarks.fleet [--sizes 10,100,1000,10000] [--batch 100] [--json results.json]
+"""
+import argparse
+import json
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app import dashy_config
+from app.docker_utils import ContainerView, get_container_info, get_event_container, list_containers
+
+# Run in this order on one config: start all, stop all, scan them back in, then flap.
+SCENARIOS = ("mass_start", "mass_stop", "startup_scan", "restart_flapping")
+
+
+class FakeDockerAPI:
+    """In-memory stand-in for docker.APIClient, answering with raw Engine API JSON."""
+
+    def __init__(self, fleet):
+        self._by_id = {container.id: container for container in fleet}
+
+    def containers(self, filters=None):
+        """GET /containers/json: one summary per running container."""
+        return [
+            {
+                "Id": c.id,
+                "Names": [f"/{c.name}"],
+                "Labels": c.labels,
+                "State": "running",
+                "Ports": [
+                    {"PrivatePort": int(key.split("/")[0]), "Type": key.split("/")[1], **(
+                        {"IP": m["HostIp"], "PublicPort": int(m["HostPort"])} if m else {})}
+                    for key, mappings in c.ports.items() for m in (mappings or [None])
+                ],
+            }
+            for c in self._by_id.values()
+        ]
+
+    def inspect_container(self, container_id):
+        """GET /containers/{id}/json, reduced to the fields the sync reads."""
+        c = self._by_id[container_id]
+        return {"Id": c.id, "Name": f"/{c.name}", "State": {"Status": "running"},
+                "Config": {"Labels": c.labels}, "NetworkSettings": {"Ports": c.ports}}
+
+
+class FakeDockerClient:
+    """In-memory stand-in for docker.DockerClient, serving a synthetic fleet."""
+
+    def __init__(self, fleet):
+        self.api = FakeDockerAPI(fleet)
+
+
+def generate_fleet(size: int, seed: int = 42) -> list:
+    """
+    Builds a reproducible fleet of containers with realistic labels and ports.
+
+    Every container carries Compose and OCI image labels (15 to 45 in total). About
+    60% have a Dashy include label, half of those a port label, and a few are ignored.
+    """
+    rng = random.Random(seed)
+    fleet = []
+    for i in range(size):
+        project = f"stack{i % max(1, size // 8)}"
+        service = f"svc{i}"
+        labels = {
+            "com.docker.compose.project": project,
+            "com.docker.compose.service": service,
+            "com.docker.compose.container-number": "1",
+            "com.docker.compose.oneoff": "False",
+            "com.docker.compose.version": "2.27.0",
+            "com.docker.compose.project.working_dir": f"/srv/{project}",
+            "com.docker.compose.project.config_files": f"/srv/{project}/compose.yml",
+            "com.docker.compose.config-hash": f"{rng.getrandbits(128):032x}",
+            "com.docker.compose.image": f"sha256:{rng.getrandbits(256):064x}",
+            "com.docker.compose.depends_on": "",
+            "org.opencontainers.image.source": f"https://github.com/example/{service}",
+            "org.opencontainers.image.version": f"{rng.randint(1, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}",
+            "org.opencontainers.image.revision": f"{rng.getrandbits(160):040x}",
+            "org.opencontainers.image.created": "2024-05-01T12:00:00Z",
+            "maintainer": "ops@example.com",
+        }
+        for j in range(rng.randint(0, 30)):
+            labels[f"traefik.http.routers.{service}.rule{j}"] = f"Host(`{service}.example.com`)"
+        roll = rng.random()
+        if roll < 0.6:
+            labels["dashy"] = "true"
+            if rng.random() < 0.5:
+                labels["dashy.port"] = str(10000 + i)
+        elif roll < 0.65:
+            labels["dashy"] = "true"
+            labels["dashy.ignore"] = "true"
+        container_port = rng.choice((80, 443, 3000, 8080, 9000))
+        ports = {
+            f"{container_port}/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(20000 + i)}, {"HostIp": "::", "HostPort": str(20000 + i)}],
+            "9100/tcp": None,
+        }
+        fleet.append(ContainerView(None, f"{rng.getrandbits(256):064x}", f"{project}-{service}-1", labels, ports=ports))
+    return fleet
+
+
+def container_event(container, action: str) -> dict:
+    """Builds the Docker event the daemon sends for a container lifecycle action."""
+    return {
+        "Type": "container",
+        "Action": action,
+        "id": container.id,
+        "Actor": {"ID": container.id, "Attributes": {**container.labels, "name": container.name, "image": "example/image:latest"}},
+        "timeNano": time.time_ns(),
+    }
+
+
+def _apply_event(client, config, event):
+    container = get_event_container(client, event)
+    if event["Action"] == "start":
+        info = get_container_info(container)
+        if info:
+            dashy_config.update_entry(config, info, event_time_ns=event["timeNano"])
+    else:
+        dashy_config.remove_entry(config, container.name, event_time_ns=event["timeNano"])
+
+
+def _replay(client, config, events) -> list:
+    """Applies events one by one and returns the per-event latencies in seconds."""
+    latencies = []
+    for event in events:
+        started = time.perf_counter()
+        _apply_event(client, config, event)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _startup_scan(client, config, fleet) -> list:
+    """Runs the startup scan as one batch; every container is attributed the average cost."""
+    started = time.perf_counter()
+    infos = [info for info in (get_container_info(c) for c in list_containers(client)) if info]
+    dashy_config.reconcile(config, infos)
+    dashy_config.flush_config()
+    elapsed = time.perf_counter() - started
+    return [elapsed / max(1, len(fleet))] * len(fleet)
+
+
+def _reset_state(config_path: Path, batch: int):
+    """Points dashy_config at a fresh config file and clears its caches."""
+    dashy_config.flush_config()
+    dashy_config.DASHY_CONFIG_PATH = config_path
+    # Only the batch size triggers writes, so results do not depend on timing.
+    dashy_config.DASHY_FLUSH_INTERVAL_MS = 3_600_000
+    dashy_config.DASHY_FLUSH_MAX_BATCH = batch
+    dashy_config._managed_sections.clear()
+    dashy_config._routed_files.clear()
+    dashy_config._serialized_cache = {}
+    dashy_config._file_digests.clear()
+
+
+def percentile(values: list, p: float) -> float:
+    """Returns the p-th percentile (nearest rank) of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))]
+
+
+def run_size(size: int, batch: int, seed: int, flaps: int) -> list:
+    """Runs every scenario against a fleet of the given size and returns one result per scenario."""
+    fleet = generate_fleet(size, seed)
+    client = FakeDockerClient(fleet)
+    rng = random.Random(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _reset_state(Path(tmp_dir) / "conf.yml", batch)
+        config = dashy_config.load_initial_config()
+        for scenario in SCENARIOS:
+            writes_before = dashy_config.write_stats["writes"]
+            bytes_before = dashy_config.write_stats["bytes"]
+            started = time.perf_counter()
+            if scenario == "startup_scan":
+                latencies = _startup_scan(client, config, fleet)
+            elif scenario == "mass_start":
+                latencies = _replay(client, config, [container_event(c, "start") for c in fleet])
+            elif scenario == "mass_stop":
+                latencies = _replay(client, config, [container_event(c, "die") for c in fleet])
+            else:
+                flapping = rng.sample(fleet, max(1, size // 10))
+                events = [container_event(c, action) for _ in range(flaps) for c in flapping for action in ("die", "start")]
+                latencies = _replay(client, config, events)
+            dashy_config.flush_config()
+            elapsed = time.perf_counter() - started
+            events_count = len(latencies)
+            written = dashy_config.write_stats["bytes"] - bytes_before
+            results.append({
+                "size": size,
+                "scenario": scenario,
+                "events": events_count,
+                "events_per_second": events_count / elapsed if elapsed else float("inf"),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": max(latencies) * 1000,
+                "writes": dashy_config.write_stats["writes"] - writes_before,
+                "bytes_per_event": written / events_count if events_count else 0,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma-separated fleet sizes")
+    parser.add_argument("--batch", type=int, default=100, help="changes per config write (DASHY_FLUSH_MAX_BATCH); 1 = write-through")
+    parser.add_argument("--flaps", type=int, default=3, help="restart rounds in the flapping scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"YAML backend: {dashy_config.YAML_BACKEND}, batch: {args.batch}")
+    print(f"{'size':>6} {'scenario':<17} {'events':>7} {'events/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'writes':>6} {'bytes/event':>11}")
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        for r in run_size(size, args.batch, args.seed, args.flaps):
+            results.append(r)
+            print(f"{r['size']:>6} {r['scenario']:<17} {r['events']:>7} {r['events_per_second']:>10.0f} "
+                  f"{r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['max_ms']:>8.1f} {r['writes']:>6} {r['bytes_per_event']:>11.0f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
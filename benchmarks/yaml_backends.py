@@ -0,0 +1,87 @@
+"""
+Benchmarks the pure-Python and libyaml (C) YAML backends on a generated Dashy config.
+
+Usage:
+    python -m benchmarks.yaml_backends [--sections 60] [--items 6] [--repeat 5]
+"""
+import argparse
+import time
+import yaml
+
+
+def generate_config(sections: int, items: int) -> dict:
+    """Builds a large, hand-written-looking Dashy config plus a managed Docker section."""
+    config = {
+        "pageInfo": {
+            "title": "Home Lab",
+            "description": "Generated benchmark dashboard",
+            "navLinks": [{"title": "GitHub", "path": "https://github.com/Lissy93/dashy"}],
+        },
+        "appConfig": {"theme": "nord-frost", "layout": "auto", "iconSize": "medium"},
+        "sections": [],
+    }
+    for s in range(sections):
+        config["sections"].append({
+            "name": f"Section {s}",
+            "icon": "fas fa-server",
+            "displayData": {"collapsed": False, "cols": 2},
+            "items": [
+                {
+                    "title": f"Service {s}-{i}",
+                    "description": f"Hand-written entry {i} of section {s}",
+                    "url": f"http://host-{s}.lan:{8000 + i}",
+                    "icon": f"hl-service-{i}",
+                    "tags": ["homelab", f"rack-{s % 4}"],
+                }
+                for i in range(items)
+            ],
+        })
+    config["sections"].append({
+        "name": "Docker Containers",
+        "items": [{"title": f"container-{i}", "url": f"http://localhost:{9000 + i}", "icon": f"hl-container-{i}"} for i in range(50)],
+    })
+    return config
+
+
+def _time(fn, repeat: int) -> float:
+    """Returns the best wall time of fn over repeat runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(sections: int, items: int, repeat: int) -> list:
+    config = generate_config(sections, items)
+    text = yaml.dump(config, Dumper=yaml.SafeDumper, sort_keys=False, default_flow_style=False)
+    results = [("lines", len(text.splitlines()), None)]
+
+    backends = [("pure-python", yaml.SafeLoader, yaml.SafeDumper)]
+    if hasattr(yaml, "CSafeLoader"):
+        backends.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+
+    for name, loader, dumper in backends:
+        load_ms = _time(lambda: yaml.load(text, Loader=loader), repeat)
+        dump_ms = _time(lambda: yaml.dump(config, Dumper=dumper, sort_keys=False, default_flow_style=False), repeat)
+        results.append((f"{name} load", load_ms, "ms"))
+        results.append((f"{name} dump", dump_ms, "ms"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=60)
+    parser.add_argument("--items", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not hasattr(yaml, "CSafeLoader"):
+        print("libyaml is not available; only the pure-Python backend is measured.")
+    for label, value, unit in run(args.sections, args.items, args.repeat):
+        print(f"{label:<20} {value:>10.1f} {unit}" if unit else f"{label:<20} {value:>10}")
+
+
+if __name__ == "__main__":
+    main()
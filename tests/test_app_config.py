@@ -31,6 +31,22 @@ class TestAppConfig(unittest.TestCase):
         self.assertEqual(app_config.DASHY_DOCKER_PORT_LABEL_REGEX, r"^dashy\.port$")
         self.assertEqual(app_config.DASHY_DOCKER_IGNORE_LABEL_REGEX, r"^dashy\.ignore$")
         self.assertFalse(app_config.DASHY_EXPOSED_BY_DEFAULT)
+        self.assertTrue(app_config.DASHY_DOCKER_DAEMON_FILTERS)
+        self.assertEqual(app_config.DASHY_DOCKER_LABEL_FILTER, "")
+        self.assertFalse(app_config.DASHY_ASYNC_RUNTIME)
+        self.assertEqual(app_config.DASHY_ASYNC_ENRICH_CONCURRENCY, 8)
+        self.assertEqual(app_config.DASHY_FLUSH_INTERVAL_MS, 500)
+        self.assertEqual(app_config.DASHY_FLUSH_MAX_BATCH, 100)
+        self.assertEqual(app_config.DASHY_RESYNC_INTERVAL_SECONDS, 300)
+        self.assertEqual(app_config.DASHY_METRICS_PORT, 0)
+        self.assertEqual(app_config.DASHY_METRICS_ADDRESS, "0.0.0.0")
+        self.assertEqual(app_config.DASHY_STATE_PATH, str(app_config.DASHY_CONFIG_PATH.parent / ".dashy-docker-sync-state.json"))
+        self.assertEqual(app_config.DASHY_DOCKER_WORKERS, 8)
+        self.assertEqual(app_config.DASHY_EVENT_COALESCE_MS, 250)
+        self.assertEqual(app_config.DASHY_REMOVAL_GRACE_SECONDS, 30)
+        self.assertEqual(app_config.DASHY_DOCKER_SECTION_LABEL, "dashy.section")
+        self.assertEqual(app_config.DASHY_DOCKER_FILE_LABEL, "dashy.file")
+        self.assertFalse(app_config.DASHY_SWARM_MODE)
 
     @patch.dict(os.environ, {
         "DASHY_LOG_LEVEL": "DEBUG",
@@ -45,6 +61,22 @@ class TestAppConfig(unittest.TestCase):
         "DASHY_DOCKER_PORT_LABEL_REGEX": r"^custom\.port$",
         "DASHY_DOCKER_IGNORE_LABEL_REGEX": r"^custom\.ignore$",
         "DASHY_EXPOSED_BY_DEFAULT": "true",
+        "DASHY_DOCKER_DAEMON_FILTERS": "false",
+        "DASHY_DOCKER_LABEL_FILTER": "dashy",
+        "DASHY_ASYNC_RUNTIME": "true",
+        "DASHY_ASYNC_ENRICH_CONCURRENCY": "4",
+        "DASHY_FLUSH_INTERVAL_MS": "0",
+        "DASHY_FLUSH_MAX_BATCH": "25",
+        "DASHY_RESYNC_INTERVAL_SECONDS": "60",
+        "DASHY_METRICS_PORT": "9100",
+        "DASHY_METRICS_ADDRESS": "127.0.0.1",
+        "DASHY_STATE_PATH": "",
+        "DASHY_DOCKER_WORKERS": "16",
+        "DASHY_EVENT_COALESCE_MS": "0",
+        "DASHY_REMOVAL_GRACE_SECONDS": "2.5",
+        "DASHY_DOCKER_SECTION_LABEL": "homepage.group",
+        "DASHY_DOCKER_FILE_LABEL": "homepage.file",
+        "DASHY_SWARM_MODE": "true",
     }, clear=True)
     def test_env_overrides(self):
         import importlib
@@ -62,6 +94,22 @@ class TestAppConfig(unittest.TestCase):
         self.assertEqual(app_config.DASHY_DOCKER_PORT_LABEL_REGEX, r"^custom\.port$")
         self.assertEqual(app_config.DASHY_DOCKER_IGNORE_LABEL_REGEX, r"^custom\.ignore$")
         self.assertTrue(app_config.DASHY_EXPOSED_BY_DEFAULT)
+        self.assertFalse(app_config.DASHY_DOCKER_DAEMON_FILTERS)
+        self.assertEqual(app_config.DASHY_DOCKER_LABEL_FILTER, "dashy")
+        self.assertTrue(app_config.DASHY_ASYNC_RUNTIME)
+        self.assertEqual(app_config.DASHY_ASYNC_ENRICH_CONCURRENCY, 4)
+        self.assertEqual(app_config.DASHY_FLUSH_INTERVAL_MS, 0)
+        self.assertEqual(app_config.DASHY_FLUSH_MAX_BATCH, 25)
+        self.assertEqual(app_config.DASHY_RESYNC_INTERVAL_SECONDS, 60)
+        self.assertEqual(app_config.DASHY_METRICS_PORT, 9100)
+        self.assertEqual(app_config.DASHY_METRICS_ADDRESS, "127.0.0.1")
+        self.assertEqual(app_config.DASHY_STATE_PATH, "")
+        self.assertEqual(app_config.DASHY_DOCKER_WORKERS, 16)
+        self.assertEqual(app_config.DASHY_EVENT_COALESCE_MS, 0)
+        self.assertEqual(app_config.DASHY_REMOVAL_GRACE_SECONDS, 2.5)
+        self.assertEqual(app_config.DASHY_DOCKER_SECTION_LABEL, "homepage.group")
+        self.assertEqual(app_config.DASHY_DOCKER_FILE_LABEL, "homepage.file")
+        self.assertTrue(app_config.DASHY_SWARM_MODE)
 
     def test_setup_logging(self):
         with patch.dict(os.environ, {"DASHY_LOG_LEVEL": "CRITICAL"}, clear=True):
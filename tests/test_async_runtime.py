@@ -0,0 +1,180 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from app import async_runtime
+from app import dashy_config
+
+
+class FakeDockerAPI:
+    """A tiny Docker Engine API served on a unix socket, for testing without a daemon."""
+
+    def __init__(self, containers, inspect, events):
+        self.containers = containers
+        self.inspect = inspect
+        self.events = events
+        self.requests = []
+        self.events_sent = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        request_line = (await reader.readline()).decode()
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        path = request_line.split()[1]
+        self.requests.append(path)
+        route = path.split("?")[0]
+
+        if route == "/_ping":
+            self._respond(writer, 200, b"OK")
+        elif route == "/containers/json":
+            self._respond(writer, 200, json.dumps(self.containers).encode())
+        elif route.startswith("/containers/"):
+            container_id = route.split("/")[2]
+            if container_id in self.inspect:
+                self._respond(writer, 200, json.dumps(self.inspect[container_id]).encode())
+            else:
+                self._respond(writer, 404, b'{"message": "No such container"}')
+        elif route == "/events":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for event in self.events:
+                payload = json.dumps(event).encode() + b"\n"
+                writer.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+                await writer.drain()
+            self.events_sent.set()
+            await asyncio.sleep(3600)
+        await writer.drain()
+        writer.close()
+
+    @staticmethod
+    def _respond(writer, status, body):
+        writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+
+
+def _event(action, container_id, attributes):
+    return {"Type": "container", "Action": action, "id": container_id,
+            "Actor": {"ID": container_id, "Attributes": attributes}, "timeNano": 1}
+
+
+class TestAsyncRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.tmp_dir.name) / "conf.yml"
+        self.socket_path = os.path.join(self.tmp_dir.name, "docker.sock")
+        self.patches = [
+            patch.object(dashy_config, 'DASHY_CONFIG_PATH', self.config_path),
+            patch.object(dashy_config, 'DASHY_DOCKER_SECTION_NAME', "Docker Containers"),
+            patch.object(dashy_config, 'DASHY_DOCKER_TITLE_TEMPLATE', "{name}"),
+            patch.object(dashy_config, 'DASHY_DOCKER_URL_TEMPLATE', "http://{host}:{port}"),
+            patch.object(dashy_config, 'DASHY_DOCKER_URL_HOST', "localhost"),
+            patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 0),
+            patch.object(async_runtime, 'DASHY_STATE_PATH', os.path.join(self.tmp_dir.name, "state.json")),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp_dir.cleanup()
+
+    def _items(self):
+        config = yaml.safe_load(self.config_path.read_text())
+        section = next(s for s in config["sections"] if s["name"] == "Docker Containers")
+        return {item["title"]: item["url"] for item in section["items"]}
+
+    def test_scan_and_events_against_fake_docker_api(self):
+        api = FakeDockerAPI(
+            containers=[
+                {"Id": "old1", "Names": ["/old"], "Labels": {"dashy": "true"},
+                 "Ports": [{"PrivatePort": 80, "PublicPort": 8000, "Type": "tcp", "IP": "0.0.0.0"}]},
+                {"Id": "other1", "Names": ["/other"], "Labels": {}, "Ports": []},
+            ],
+            inspect={"web1": {"Name": "/web", "NetworkSettings": {"Ports": {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8081"}]}}}},
+            events=[
+                _event("exec_start: healthcheck", "web1", {"name": "web"}),
+                _event("start", "web1", {"name": "web", "image": "nginx", "dashy": "true"}),
+                _event("start", "api1", {"name": "api", "image": "api", "dashy": "true", "dashy.port": "9000"}),
+                _event("die", "old1", {"name": "old", "image": "old", "exitCode": "0"}),
+            ],
+        )
+
+        async def scenario():
+            server = await asyncio.start_unix_server(api.handle, path=self.socket_path)
+            client = async_runtime.AsyncDockerClient(f"unix://{self.socket_path}")
+            runtime = async_runtime.AsyncRuntime(client, concurrency=2, flush_interval_ms=0, removal_grace=0)
+            task = asyncio.create_task(runtime.run())
+            try:
+                await asyncio.wait_for(api.events_sent.wait(), 5)
+                for _ in range(200):
+                    if self.config_path.exists() and self._items() == {"web": "http://localhost:8081", "api": "http://localhost:9000"}:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                server.close()
+                await server.wait_closed()
+            return runtime
+
+        runtime = asyncio.run(scenario())
+
+        self.assertEqual(self._items(), {"api": "http://localhost:9000", "web": "http://localhost:8081"})
+        self.assertEqual(runtime.stats["events"], 3)
+        self.assertGreaterEqual(runtime.stats["commits"], 1)
+        self.assertGreaterEqual(runtime.stats["enrich_queue_max_depth"], 1)
+        # Only the container without a port label needed an inspect call.
+        self.assertEqual([r for r in api.requests if r.startswith("/containers/") and r.endswith("/json") and r != "/containers/json"],
+                         ["/containers/web1/json"])
+        events_request = next(r for r in api.requests if r.startswith("/events"))
+        self.assertIn("filters=", events_request)
+
+    def test_startup_scan_uses_list_summary_without_inspect(self):
+        api = FakeDockerAPI(
+            containers=[{"Id": "a1", "Names": ["/app"], "Labels": {"dashy": "true"},
+                         "Ports": [{"PrivatePort": 80, "PublicPort": 8080, "Type": "tcp", "IP": "0.0.0.0"}]}],
+            inspect={},
+            events=[],
+        )
+
+        async def scenario():
+            server = await asyncio.start_unix_server(api.handle, path=self.socket_path)
+            runtime = async_runtime.AsyncRuntime(async_runtime.AsyncDockerClient(f"unix://{self.socket_path}"))
+            await runtime.startup_scan()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+        self.assertEqual(self._items(), {"app": "http://localhost:8080"})
+        self.assertEqual(api.requests, ["/containers/json"])
+
+    def test_client_raises_on_error_status(self):
+        api = FakeDockerAPI(containers=[], inspect={}, events=[])
+
+        async def scenario():
+            server = await asyncio.start_unix_server(api.handle, path=self.socket_path)
+            client = async_runtime.AsyncDockerClient(f"unix://{self.socket_path}")
+            try:
+                with self.assertRaises(async_runtime.AsyncDockerError) as ctx:
+                    await client.inspect_container("missing")
+                self.assertEqual(ctx.exception.status, 404)
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        asyncio.run(scenario())
+
+    def test_client_rejects_unsupported_url(self):
+        with self.assertRaises(ValueError):
+            async_runtime.AsyncDockerClient("ssh://docker-host")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 from unittest.mock import patch, mock_open, MagicMock, call
 import yaml
 import os
+import errno
+import tempfile
 from pathlib import Path
 
 from app import dashy_config
@@ -28,6 +30,8 @@ class TestDashyConfig(unittest.TestCase):
         dashy_config.DASHY_CONFIG_PATH = Path(app_config.DASHY_CONFIG_PATH)
 
     def tearDown(self):
+        with patch.object(dashy_config, 'save_config'):
+            dashy_config.flush_config()
         self.patch_env.stop()
         import importlib
         with patch.dict(os.environ, {}, clear=True):
@@ -35,7 +39,7 @@ class TestDashyConfig(unittest.TestCase):
         importlib.reload(dashy_config)
 
     @patch('builtins.open', new_callable=mock_open)
-    @patch('yaml.safe_load')
+    @patch('yaml.load')
     @patch('pathlib.Path.exists')
     def test_load_initial_config_exists_valid(self, mock_exists, mock_yaml_load, mock_file_open):
         mock_exists.return_value = True
@@ -53,7 +57,7 @@ class TestDashyConfig(unittest.TestCase):
         self.assertEqual(config, mock_config_data)
 
     @patch('builtins.open', new_callable=mock_open)
-    @patch('yaml.safe_load')
+    @patch('yaml.load')
     @patch('pathlib.Path.exists')
     def test_load_initial_config_exists_empty_or_invalid_yaml(self, mock_exists, mock_yaml_load, mock_file_open):
         mock_exists.return_value = True
@@ -82,7 +86,7 @@ class TestDashyConfig(unittest.TestCase):
 
     @patch('pathlib.Path.exists')
     @patch('builtins.open', new_callable=mock_open, read_data='sections:\n  - name: Other Section')
-    @patch('yaml.safe_load', return_value={"sections": [{"name": "Other Section"}]})
+    @patch('yaml.load', return_value={"sections": [{"name": "Other Section"}]})
     def test_load_initial_config_docker_section_missing(self, mock_yaml_load, mock_file_open, mock_exists):
         mock_exists.return_value = True
         config = dashy_config.load_initial_config()
@@ -90,43 +94,489 @@ class TestDashyConfig(unittest.TestCase):
         self.assertIsNotNone(docker_section)
         self.assertEqual(len(config["sections"]), 2)
 
-    def test_apply_startup_reset_true_items_exist(self):
-        config = {"sections": [{"name": "Test Docker Section", "items": [{"title": "item1"}]}]}
-        with patch.object(dashy_config, 'DASHY_RESET_ON_START', True):
-            changed = dashy_config.apply_startup_reset(config)
-            self.assertTrue(changed)
-            self.assertEqual(config["sections"][0]["items"], [])
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_applies_only_differences(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": [
+            {"title": "Title-keep", "url": "http://testhost:1/keep", "icon": "icon/keep.png"},
+            {"title": "Title-change", "url": "http://testhost:2/change", "icon": "icon/change.png"},
+            {"title": "Title-gone", "url": "http://testhost:3/gone", "icon": "icon/gone.png"},
+            {"url": "http://manual"},
+        ]}]}
 
-    def test_apply_startup_reset_true_items_empty(self):
-        config = {"sections": [{"name": "Test Docker Section", "items": []}]}
-        with patch.object(dashy_config, 'DASHY_RESET_ON_START', True):
-            changed = dashy_config.apply_startup_reset(config)
-            self.assertFalse(changed)
-            self.assertEqual(config["sections"][0]["items"], [])
-            
-    def test_apply_startup_reset_true_section_missing(self):
+        counts = dashy_config.reconcile(config, [
+            {"name": "keep", "port": "1"}, {"name": "change", "port": "22"}, {"name": "new", "port": "4"},
+        ])
+        dashy_config.render_managed_section(config)
+
+        self.assertEqual(counts, {"added": 1, "updated": 1, "removed": 1})
+        self.assertEqual([e.get("title") for e in config["sections"][0]["items"]], [None, "Title-change", "Title-keep", "Title-new"])
+        self.assertEqual(config["sections"][0]["items"][1]["url"], "http://testhost:22/change")
+        mock_mark_dirty.assert_called_once_with(config)
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_without_differences_does_not_mark_dirty(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": [
+            {"title": "Title-keep", "url": "http://testhost:1/keep", "icon": "icon/keep.png"},
+        ]}]}
+        counts = dashy_config.reconcile(config, [{"name": "keep", "port": "1"}])
+        self.assertEqual(counts, {"added": 0, "updated": 0, "removed": 0})
+        mock_mark_dirty.assert_not_called()
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_without_prune_keeps_stale_entries(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": [{"title": "Title-gone"}]}]}
+        counts = dashy_config.reconcile(config, [{"name": "new", "port": "1"}], prune=False)
+        dashy_config.render_managed_section(config)
+        self.assertEqual(counts, {"added": 1, "updated": 0, "removed": 0})
+        self.assertEqual([e["title"] for e in config["sections"][0]["items"]], ["Title-gone", "Title-new"])
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_without_prune_removes_owned_stale_entries(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": [{"title": "Title-loaded"}]}]}
+        dashy_config.update_entry(config, {"name": "missed", "port": "1", "docker_host": "local"})
+
+        # The die event of "missed" was lost; the periodic resync still removes its entry.
+        counts = dashy_config.reconcile(config, [], "local", prune=False)
+        self.assertEqual(counts, {"added": 0, "updated": 0, "removed": 1})
+        self.assertEqual(dashy_config.get_managed_section(config).titles(), ["Title-loaded"])
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_keeps_entries_with_a_pending_removal(self, mock_mark_dirty):
+        config = {"sections": []}
+        dashy_config.update_entry(config, {"name": "stopped", "port": "1", "docker_host": "local"})
+        dashy_config.update_entry(config, {"name": "gone", "port": "1", "docker_host": "local"})
+
+        # "stopped" is within its grace period: the scheduled removal decides, not the rescan.
+        counts = dashy_config.reconcile(config, [], "local", pending_removals=["stopped"])
+        self.assertEqual(counts, {"added": 0, "updated": 0, "removed": 1})
+        self.assertEqual(dashy_config.get_managed_section(config).titles(), ["Title-stopped"])
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_section_missing_and_nothing_running(self, mock_mark_dirty):
         config = {"sections": [{"name": "Another Section", "items": [{"title": "item1"}]}]}
-        with patch.object(dashy_config, 'DASHY_RESET_ON_START', True):
-            changed = dashy_config.apply_startup_reset(config)
-            self.assertFalse(changed)
-            self.assertEqual(len(config["sections"][0]["items"]), 1)
+        counts = dashy_config.reconcile(config, [])
+        self.assertEqual(counts, {"added": 0, "updated": 0, "removed": 0})
+        self.assertEqual(len(config["sections"]), 1)
+        mock_mark_dirty.assert_not_called()
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_shared_section_only_prunes_own_entries(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": [
+            {"title": "Title-stale"}, {"title": "Title-a1"}, {"title": "Title-b1"},
+        ]}]}
+        hosts = ["a", "b"]
 
+        dashy_config.reconcile(config, [{"name": "a1", "port": "1"}], "a", docker_hosts=hosts)
+        dashy_config.update_entry(config, {"name": "b2", "port": "2", "docker_host": "b"})
+        # Host b has not reconciled yet, so unowned entries (b1, stale) are kept.
+        self.assertEqual(sorted(dashy_config.get_managed_section(config).titles()), ["Title-a1", "Title-b1", "Title-b2", "Title-stale"])
 
-    def test_apply_startup_reset_false(self):
-        config = {"sections": [{"name": "Test Docker Section", "items": [{"title": "item1"}]}]}
-        with patch.object(dashy_config, 'DASHY_RESET_ON_START', False):
-            changed = dashy_config.apply_startup_reset(config)
-            self.assertFalse(changed)
-            self.assertEqual(len(config["sections"][0]["items"]), 1)
+        counts = dashy_config.reconcile(config, [{"name": "b1", "port": "1"}], "b", docker_hosts=hosts)
+        self.assertEqual(counts["removed"], 2)
+        self.assertEqual(sorted(dashy_config.get_managed_section(config).titles()), ["Title-a1", "Title-b1"])
 
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('yaml.dump')
-    def test_save_config(self, mock_yaml_dump, mock_file_open):
-        test_data = {"key": "value"}
-        dashy_config.save_config(test_data)
-        
-        mock_file_open.assert_called_once_with(dashy_config.DASHY_CONFIG_PATH, "w")
-        mock_yaml_dump.assert_called_once_with(test_data, mock_file_open(), sort_keys=False, default_flow_style=False)
+        dashy_config.reconcile(config, [], "a", docker_hosts=hosts)
+        self.assertEqual(dashy_config.get_managed_section(config).titles(), ["Title-b1"])
+
+    def _sample_config(self):
+        return {
+            "pageInfo": {"title": "My Dashy", "navLinks": [{"title": "GitHub", "path": "https://github.com"}]},
+            "appConfig": {"theme": "dark"},
+            "sections": [
+                {"name": "Hand Written", "items": [{"title": "Router", "url": "http://10.0.0.1"}]},
+                {"name": "Test Docker Section", "items": [{"title": "Title-app1", "url": "http://testhost:1/app1", "icon": "icon/app1.png"}]},
+            ],
+        }
+
+    def test_save_config(self):
+        test_data = self._sample_config()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+
+            self.assertTrue(dashy_config.save_config(test_data))
+
+            written = dashy_config.DASHY_CONFIG_PATH.read_text()
+            self.assertEqual(written, yaml.dump(test_data, sort_keys=False, default_flow_style=False))
+            self.assertEqual(os.listdir(tmp_dir), ["conf.yml"])
+            self.assertEqual(dashy_config.write_stats["writes"], 1)
+            self.assertEqual(dashy_config.write_stats["bytes"], len(written.encode()))
+
+    def test_flush_merges_external_edits(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000):
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(self._sample_config(), sort_keys=False))
+            config = dashy_config.load_initial_config()
+            docker_section = config["sections"][1]
+
+            edited = self._sample_config()
+            edited["appConfig"]["theme"] = "light"
+            edited["sections"][0]["items"].append({"title": "NAS", "url": "http://10.0.0.2"})
+            edited["sections"][1]["icon"] = "fas fa-docker"
+            edited["sections"].insert(0, {"name": "New From UI", "items": []})
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(edited, sort_keys=False) + "\n")
+
+            dashy_config.update_entry(config, {"name": "app2", "port": "2"})
+            dashy_config.flush_config()
+
+            on_disk = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            self.assertEqual(on_disk["appConfig"], {"theme": "light"})
+            self.assertEqual([s["name"] for s in on_disk["sections"]], ["New From UI", "Hand Written", "Test Docker Section"])
+            self.assertEqual([i["title"] for i in on_disk["sections"][1]["items"]], ["Router", "NAS"])
+            self.assertEqual(on_disk["sections"][2]["icon"], "fas fa-docker")
+            self.assertEqual([i["title"] for i in on_disk["sections"][2]["items"]], ["Title-app1", "Title-app2"])
+            # The in-memory config and its managed section index were updated in place.
+            self.assertIs(config["sections"][2], docker_section)
+            self.assertIs(dashy_config.get_managed_section(config).section, docker_section)
+
+    def test_unchanged_file_is_not_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            config = self._sample_config()
+            dashy_config.save_config(config)
+
+            with patch('yaml.load') as mock_yaml_load:
+                self.assertTrue(dashy_config.merge_external_edits(config))
+                os.utime(dashy_config.DASHY_CONFIG_PATH, ns=(1, 1))
+                self.assertTrue(dashy_config.merge_external_edits(config))
+            mock_yaml_load.assert_not_called()
+
+    @patch('app.dashy_config.save_config')
+    def test_flush_postpones_write_while_file_is_invalid(self, mock_save_config):
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000):
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(self._sample_config()))
+            config = dashy_config.load_initial_config()
+            dashy_config.DASHY_CONFIG_PATH.write_text("sections: [unclosed\n")
+
+            dashy_config.update_entry(config, {"name": "app2", "port": "2"})
+            self.assertFalse(dashy_config.flush_config())
+            mock_save_config.assert_not_called()
+
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(self._sample_config()))
+            self.assertTrue(dashy_config.flush_config())
+            mock_save_config.assert_called_once_with(config)
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_update_entry_routes_to_labelled_section_and_moves(self, mock_mark_dirty):
+        config = self._sample_config()
+
+        dashy_config.update_entry(config, {"name": "jellyfin", "port": "1", "section": "Media"})
+        dashy_config.render_managed_section(config)
+        self.assertEqual([s["name"] for s in config["sections"]], ["Hand Written", "Test Docker Section", "Media"])
+        self.assertEqual([i["title"] for i in config["sections"][2]["items"]], ["Title-jellyfin"])
+
+        # The routing label changed: the entry moves, and is not left behind.
+        dashy_config.update_entry(config, {"name": "jellyfin", "port": "1", "section": "Streaming"})
+        dashy_config.render_managed_section(config)
+        self.assertEqual(config["sections"][2]["items"], [])
+        self.assertEqual([i["title"] for i in config["sections"][3]["items"]], ["Title-jellyfin"])
+
+        dashy_config.remove_entry(config, "jellyfin")
+        dashy_config.render_managed_section(config)
+        self.assertEqual(config["sections"][3]["items"], [])
+        self.assertEqual([i["title"] for i in config["sections"][1]["items"]], ["Title-app1"])
+
+    def test_routed_file_is_written_on_its_own(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000):
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(self._sample_config(), sort_keys=False))
+            config = dashy_config.load_initial_config()
+            main_before = dashy_config.DASHY_CONFIG_PATH.read_bytes()
+
+            dashy_config.update_entry(config, {"name": "wiki", "port": "2", "section": "Docs", "file": "team-a.yml"})
+            dashy_config.update_entry(config, {"name": "ci", "port": "3", "file": "team-a.yml"})
+            writes_before = dashy_config.write_stats["writes"]
+            self.assertTrue(dashy_config.flush_config())
+
+            # Only the routed file changed, so only it was written.
+            self.assertEqual(dashy_config.write_stats["writes"] - writes_before, 1)
+            self.assertEqual(dashy_config.DASHY_CONFIG_PATH.read_bytes(), main_before)
+            team = yaml.safe_load((Path(tmp_dir) / "team-a.yml").read_text())
+            self.assertEqual({s["name"]: [i["title"] for i in s["items"]] for s in team["sections"]},
+                             {"Docs": ["Title-wiki"], "Test Docker Section": ["Title-ci"]})
+
+            dashy_config.update_entry(config, {"name": "app2", "port": "4"})
+            dashy_config.flush_config()
+            self.assertEqual(dashy_config.write_stats["writes"] - writes_before, 2)
+            self.assertIn("Title-app2", dashy_config.DASHY_CONFIG_PATH.read_text())
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_invalid_routed_file_name_falls_back_to_main_config(self, mock_mark_dirty):
+        config = self._sample_config()
+        for file_name in ("../etc/passwd.yml", "sub/dir.yml", ".hidden.yml", "notes.txt"):
+            with self.assertLogs(level="WARNING"):
+                self.assertIs(dashy_config.get_target_config(config, file_name), config)
+        self.assertIs(dashy_config.get_target_config(config, dashy_config.DASHY_CONFIG_PATH.name), config)
+
+    def test_malformed_config_is_reported_not_replaced(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text("sections: [\n")
+            with self.assertLogs(level="ERROR"), self.assertRaises(ValueError):
+                dashy_config.load_initial_config()
+
+            config = self._sample_config()
+            (Path(tmp_dir) / "team.yml").write_text("sections: [\n")
+            with self.assertLogs(level="ERROR"):
+                self.assertIs(dashy_config.get_target_config(config, "team.yml"), config)
+            self.assertEqual((Path(tmp_dir) / "team.yml").read_text(), "sections: [\n")
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_reconcile_covers_routed_sections(self, mock_mark_dirty):
+        config = self._sample_config()
+        dashy_config.reconcile(config, [
+            {"name": "app1", "port": "1"},
+            {"name": "jellyfin", "port": "2", "section": "Media"},
+            {"name": "plex", "port": "3", "section": "Media"},
+        ])
+        counts = dashy_config.reconcile(config, [
+            {"name": "app1", "port": "1"},
+            {"name": "jellyfin", "port": "2"},
+        ])
+        dashy_config.render_managed_section(config)
+
+        # plex is gone, jellyfin lost its section label and moved back.
+        self.assertEqual(counts, {"added": 1, "updated": 0, "removed": 2})
+        sections = {s["name"]: [i["title"] for i in s["items"]] for s in config["sections"]}
+        self.assertEqual(sections["Media"], [])
+        self.assertEqual(sections["Test Docker Section"], ["Title-app1", "Title-jellyfin"])
+
+    def test_routing_into_hand_written_section_keeps_its_items(self):
+        config = self._sample_config()
+        config["sections"].append({"name": "Media", "items": [
+            {"title": "My NAS", "url": "http://10.0.0.2"}, {"title": "Router", "url": "http://10.0.0.1"},
+        ]})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(config, sort_keys=False))
+            config = dashy_config.load_initial_config()
+
+            counts = dashy_config.reconcile(config, [{"name": "plex", "port": "32400", "section": "Media"}], "local", prune=True)
+            dashy_config.update_entry(config, {"name": "emby", "port": "8096", "section": "Media", "docker_host": "local"})
+            dashy_config.flush_config()
+
+            # Only the stale entry of the Docker section goes; Media's own items stay.
+            self.assertEqual(counts, {"added": 1, "updated": 0, "removed": 1})
+            saved = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            media = next(s for s in saved["sections"] if s["name"] == "Media")
+            self.assertEqual([i["title"] for i in media["items"]], ["My NAS", "Router", "Title-emby", "Title-plex"])
+
+            # Only the entries the sync wrote are removed when their containers are gone.
+            counts = dashy_config.reconcile(config, [], "local", prune=True)
+            dashy_config.flush_config()
+            self.assertEqual(counts["removed"], 2)
+            saved = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            media = next(s for s in saved["sections"] if s["name"] == "Media")
+            self.assertEqual(media["items"], [{"title": "My NAS", "url": "http://10.0.0.2"}, {"title": "Router", "url": "http://10.0.0.1"}])
+
+    def test_flush_keeps_external_edits_to_routed_hand_written_section(self):
+        config = self._sample_config()
+        config["sections"].append({"name": "Media", "items": [{"title": "Plex", "url": "http://10.0.0.3"}]})
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000):
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(config, sort_keys=False))
+            config = dashy_config.load_initial_config()
+            dashy_config.update_entry(config, {"name": "emby", "port": "8096", "section": "Media", "docker_host": "local"})
+            dashy_config.flush_config()
+
+            edited = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            media = next(s for s in edited["sections"] if s["name"] == "Media")
+            media["items"] = [{"title": "Plex", "url": "http://10.0.0.4"}, {"title": "NAS", "url": "http://10.0.0.2"}]
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(edited, sort_keys=False) + "\n")
+
+            dashy_config.update_entry(config, {"name": "jellyfin", "port": "8097", "section": "Media", "docker_host": "local"})
+            dashy_config.flush_config()
+
+            # The hand edits survive; the sync's own entries (including the one dropped on disk) are re-applied.
+            saved = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            media = next(s for s in saved["sections"] if s["name"] == "Media")
+            self.assertEqual(
+                [(i["title"], i.get("url")) for i in media["items"]],
+                [("Plex", "http://10.0.0.4"), ("NAS", "http://10.0.0.2"),
+                 ("Title-emby", "http://testhost:8096/emby"), ("Title-jellyfin", "http://testhost:8097/jellyfin")]
+            )
+
+            # Renaming the section by hand keeps its items under the new name only.
+            edited = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            media = next(s for s in edited["sections"] if s["name"] == "Media")
+            media["name"] = "Movies"
+            media["items"] = [i for i in media["items"] if not i["title"].startswith("Title-")]
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(edited, sort_keys=False) + "\n")
+            dashy_config.remove_entry(config, "emby", "local")
+            dashy_config.flush_config()
+
+            saved = yaml.safe_load(dashy_config.DASHY_CONFIG_PATH.read_text())
+            sections = {s["name"]: [i["title"] for i in s["items"]] for s in saved["sections"]}
+            self.assertEqual(sections["Movies"], ["Plex", "NAS"])
+            self.assertEqual(sections["Media"], ["Title-jellyfin"])
+
+    def test_save_config_suppresses_identical_write(self):
+        test_data = self._sample_config()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            self.assertTrue(dashy_config.save_config(test_data))
+            mtime = os.stat(dashy_config.DASHY_CONFIG_PATH).st_mtime_ns
+
+            with patch('app.dashy_config.write_atomic') as mock_write:
+                self.assertFalse(dashy_config.save_config(test_data))
+                mock_write.assert_not_called()
+
+            self.assertEqual(os.stat(dashy_config.DASHY_CONFIG_PATH).st_mtime_ns, mtime)
+            self.assertEqual(dashy_config.write_stats["writes"], 1)
+            self.assertEqual(dashy_config.write_stats["suppressed"], 1)
+
+            test_data["appConfig"] = {"theme": "light"}
+            self.assertTrue(dashy_config.save_config(test_data))
+            self.assertEqual(dashy_config.write_stats["writes"], 2)
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_save_config_suppresses_write_after_restart_of_loaded_config(self, mock_mark_dirty):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text(yaml.dump(self._sample_config(), sort_keys=False, default_flow_style=False))
+            config = dashy_config.load_initial_config()
+
+            dashy_config.remove_entry(config, "app1")
+            dashy_config.update_entry(config, {"name": "app1", "port": "1"})
+            dashy_config.render_managed_section(config)
+
+            with patch('app.dashy_config.write_atomic') as mock_write:
+                self.assertFalse(dashy_config.save_config(config))
+                mock_write.assert_not_called()
+
+    def test_save_config_preserves_file_mode(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text("old: true\n")
+            os.chmod(dashy_config.DASHY_CONFIG_PATH, 0o664)
+
+            dashy_config.save_config({"key": "value"})
+
+            self.assertEqual(dashy_config.DASHY_CONFIG_PATH.read_text(), "key: value\n")
+            self.assertEqual(os.stat(dashy_config.DASHY_CONFIG_PATH).st_mode & 0o777, 0o664)
+
+    def test_save_config_falls_back_to_in_place_write_on_bind_mount(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text("old: true\n")
+
+            with patch('os.replace', side_effect=OSError(errno.EBUSY, "Device or resource busy")):
+                self.assertTrue(dashy_config.save_config({"key": "value"}))
+
+            self.assertEqual(dashy_config.DASHY_CONFIG_PATH.read_text(), "key: value\n")
+            self.assertEqual(os.listdir(tmp_dir), ["conf.yml"])
+
+    def test_save_config_failure_keeps_original_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dashy_config.DASHY_CONFIG_PATH = Path(tmp_dir) / "conf.yml"
+            dashy_config.DASHY_CONFIG_PATH.write_text("old: true\n")
+
+            with patch('os.replace', side_effect=OSError(errno.EACCES, "Permission denied")):
+                self.assertFalse(dashy_config.save_config({"key": "value"}))
+
+            self.assertEqual(dashy_config.DASHY_CONFIG_PATH.read_text(), "old: true\n")
+            self.assertEqual(os.listdir(tmp_dir), ["conf.yml"])
+
+    def test_serialize_config_matches_full_dump(self):
+        config = self._sample_config()
+        expected = yaml.dump(config, sort_keys=False, default_flow_style=False)
+        self.assertEqual(dashy_config.serialize_config(config), expected)
+        self.assertEqual(dashy_config.serialize_config({"sections": []}), "sections: []\n")
+        self.assertEqual(dashy_config.serialize_config({}), "{}\n")
+
+    def test_yaml_backends_produce_identical_output(self):
+        config = self._sample_config()
+        config["pageInfo"]["description"] = "Ünïcode and a long line " * 10
+        python_text = yaml.dump(config, Dumper=yaml.SafeDumper, sort_keys=False, default_flow_style=False)
+
+        self.assertEqual(dashy_config.serialize_config(config), python_text)
+        self.assertEqual(yaml.load(python_text, Loader=dashy_config.YAML_LOADER), config)
+
+    def test_yaml_backend_falls_back_without_libyaml(self):
+        import importlib
+        with patch.object(yaml, 'CSafeLoader', create=True), patch.object(yaml, 'CSafeDumper', create=True):
+            del yaml.CSafeLoader, yaml.CSafeDumper
+            importlib.reload(dashy_config)
+            self.assertIs(dashy_config.YAML_LOADER, yaml.SafeLoader)
+            self.assertIs(dashy_config.YAML_DUMPER, yaml.SafeDumper)
+            self.assertEqual(dashy_config.YAML_BACKEND, "pure-python")
+            self.assertEqual(dashy_config.serialize_config(self._sample_config()),
+                             yaml.dump(self._sample_config(), sort_keys=False, default_flow_style=False))
+        importlib.reload(dashy_config)
+        self.assertTrue(hasattr(yaml, 'CSafeDumper') == (dashy_config.YAML_BACKEND == "libyaml"))
+
+    def test_serialize_config_only_reemits_managed_section(self):
+        config = self._sample_config()
+        dashy_config.serialize_config(config)
+        config["sections"][1]["items"].append({"title": "Title-app2"})
+
+        with patch('app.dashy_config._dump_yaml', wraps=dashy_config._dump_yaml) as mock_dump:
+            text = dashy_config.serialize_config(config)
+
+        mock_dump.assert_called_once_with([config["sections"][1]])
+        self.assertEqual(text, yaml.dump(config, sort_keys=False, default_flow_style=False))
+
+    @patch('app.dashy_config.save_config')
+    def test_mark_dirty_write_through_when_interval_zero(self, mock_save_config):
+        config = {"sections": []}
+        with patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 0):
+            dashy_config.mark_dirty(config)
+        mock_save_config.assert_called_once_with(config)
+
+    @patch('app.dashy_config.save_config')
+    def test_mark_dirty_coalesces_until_flush(self, mock_save_config):
+        config = {"sections": []}
+        with patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000), \
+             patch.object(dashy_config, 'DASHY_FLUSH_MAX_BATCH', 100):
+            for _ in range(5):
+                dashy_config.mark_dirty(config)
+            mock_save_config.assert_not_called()
+            self.assertIsNotNone(dashy_config._flush_timer)
+
+            self.assertTrue(dashy_config.flush_config())
+
+        mock_save_config.assert_called_once_with(config)
+        self.assertIsNone(dashy_config._flush_timer)
+        self.assertEqual(dashy_config.write_stats["coalesced"], 4)
+        self.assertFalse(dashy_config.flush_config())
+        mock_save_config.assert_called_once()
+
+    @patch('app.dashy_config.save_config')
+    def test_flush_records_event_commit_lag(self, mock_save_config):
+        config = {"sections": [{"name": "Test Docker Section", "items": []}]}
+        lag_count = dashy_config.metrics.EVENT_COMMIT_LAG.count()
+        coalesced = dashy_config.metrics.CONFIG_COALESCED.value()
+        with patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000):
+            dashy_config.update_entry(config, {"name": "app1", "port": "1"}, event_time_ns=1)
+            dashy_config.remove_entry(config, "missing", event_time_ns=2)
+            dashy_config.update_entry(config, {"name": "app2", "port": "2"}, event_time_ns=3)
+            dashy_config.flush_config()
+
+        self.assertEqual(dashy_config.metrics.EVENT_COMMIT_LAG.count(), lag_count + 2)
+        self.assertEqual(dashy_config.metrics.CONFIG_COALESCED.value(), coalesced + 1)
+
+    @patch('app.dashy_config.save_config')
+    def test_mark_dirty_flushes_at_max_batch(self, mock_save_config):
+        config = {"sections": []}
+        with patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000), \
+             patch.object(dashy_config, 'DASHY_FLUSH_MAX_BATCH', 3):
+            for _ in range(3):
+                dashy_config.mark_dirty(config)
+        mock_save_config.assert_called_once_with(config)
+        self.assertIsNone(dashy_config._flush_timer)
+
+    @patch('app.dashy_config.save_config')
+    def test_mark_dirty_timer_flushes_after_interval(self, mock_save_config):
+        config = {"sections": []}
+        with patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 10):
+            dashy_config.mark_dirty(config)
+            dashy_config.mark_dirty(config)
+            dashy_config._flush_timer.join(1)
+        mock_save_config.assert_called_once_with(config)
 
     def test_generate_entry(self):
         container_info = {"name": "my-app", "port": "8080"}
@@ -140,81 +590,205 @@ class TestDashyConfig(unittest.TestCase):
         entry = dashy_config.generate_entry(container_info)
         self.assertIsNone(entry)
 
-    @patch('app.dashy_config.save_config')
-    def test_update_entry_new(self, mock_save_config):
+    def test_generate_entry_memoizes_rendered_entries(self):
+        first = dashy_config.generate_entry({"name": "my-app", "port": "8080"})
+        with patch.object(dashy_config.EntryTemplates, 'title', side_effect=AssertionError("rendered again")):
+            second = dashy_config.generate_entry({"name": "my-app", "port": "8080", "section": "Apps"})
+        self.assertEqual(first, second)
+        # Callers get their own copy.
+        second["url"] = "changed"
+        self.assertEqual(dashy_config.generate_entry({"name": "my-app", "port": "8080"})["url"], "http://testhost:8080/my-app")
+
+    def test_entry_cache_evicts_least_recently_used(self):
+        with patch.object(dashy_config, 'ENTRY_CACHE_SIZE', 2):
+            templates = dashy_config.EntryTemplates("{name}", "http://{host}:{port}", "hl-{name}", "localhost")
+            templates.entry("a", "1")
+            templates.entry("b", "2")
+            templates.entry("a", "1")
+            templates.entry("c", "3")
+        self.assertEqual(list(templates._entries), [("a", "1", ""), ("c", "3", "")])
+
+    def test_templates_are_rebuilt_when_settings_change(self):
+        templates = dashy_config.get_entry_templates()
+        self.assertIs(dashy_config.get_entry_templates(), templates)
+        with patch.object(dashy_config, 'DASHY_DOCKER_TITLE_TEMPLATE', "{name} on {docker_host}"):
+            self.assertEqual(dashy_config.generate_entry({"name": "app", "port": "1", "docker_host": "nas"})["title"], "app on nas")
+
+    def test_validate_template_rejects_unknown_placeholders(self):
+        dashy_config.validate_template("DASHY_DOCKER_URL_TEMPLATE", "https://{name}.{host}:{port}/{docker_host}")
+        for setting, template in (
+            ("DASHY_DOCKER_TITLE_TEMPLATE", "{name} ({port})"),
+            ("DASHY_DOCKER_URL_TEMPLATE", "http://{hostname}:{port}"),
+            ("DASHY_DOCKER_ICON_TEMPLATE", "hl-{}"),
+            ("DASHY_DOCKER_ICON_TEMPLATE", "hl-{name"),
+            ("DASHY_DOCKER_URL_TEMPLATE", "http://{host}:{port:d}"),
+        ):
+            with self.assertRaises(ValueError, msg=template):
+                dashy_config.validate_template(setting, template)
+
+    @patch('pathlib.Path.exists', return_value=False)
+    def test_load_initial_config_fails_on_invalid_template(self, mock_exists):
+        with patch.object(dashy_config, 'DASHY_DOCKER_URL_TEMPLATE', "http://{host}:{prot}"), \
+             self.assertLogs(level="ERROR") as logs:
+            with self.assertRaises(ValueError):
+                dashy_config.load_initial_config()
+        self.assertIn("prot", logs.output[0])
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_update_entry_unchanged_does_not_mark_dirty(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": []}]}
+        dashy_config.update_entry(config, {"name": "app1", "port": "1111"})
+        dashy_config.update_entry(config, {"name": "app1", "port": "1111"})
+        mock_mark_dirty.assert_called_once_with(config)
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_update_entry_new(self, mock_mark_dirty):
         config = {"sections": [{"name": "Test Docker Section", "items": []}]}
         container_info = {"name": "app1", "port": "1111"}
         
         dashy_config.update_entry(config, container_info)
+        dashy_config.render_managed_section(config)
         
         section = config["sections"][0]
         self.assertEqual(len(section["items"]), 1)
         self.assertEqual(section["items"][0]["title"], "Title-app1")
-        mock_save_config.assert_called_once_with(config)
+        mock_mark_dirty.assert_called_once_with(config)
 
-    @patch('app.dashy_config.save_config')
-    def test_update_entry_existing(self, mock_save_config):
+    @patch('app.dashy_config.mark_dirty')
+    def test_update_entry_existing(self, mock_mark_dirty):
         config = {"sections": [{"name": "Test Docker Section", "items": [
             {"title": "Title-app1", "url": "old_url"}
         ]}]}
         container_info = {"name": "app1", "port": "2222"}
         
         dashy_config.update_entry(config, container_info)
+        dashy_config.render_managed_section(config)
         
         section = config["sections"][0]
         self.assertEqual(len(section["items"]), 1)
         self.assertEqual(section["items"][0]["title"], "Title-app1")
         self.assertEqual(section["items"][0]["url"], "http://testhost:2222/app1")
-        mock_save_config.assert_called_once_with(config)
+        mock_mark_dirty.assert_called_once_with(config)
 
-    @patch('app.dashy_config.save_config')
-    def test_update_entry_section_missing_creates_it(self, mock_save_config):
+    @patch('app.dashy_config.mark_dirty')
+    def test_update_entry_section_missing_creates_it(self, mock_mark_dirty):
         config = {"sections": []}
         container_info = {"name": "app2", "port": "3333"}
 
         dashy_config.update_entry(config, container_info)
+        dashy_config.render_managed_section(config)
 
         self.assertEqual(len(config["sections"]), 1)
         section = config["sections"][0]
         self.assertEqual(section["name"], "Test Docker Section")
         self.assertEqual(len(section["items"]), 1)
         self.assertEqual(section["items"][0]["title"], "Title-app2")
-        mock_save_config.assert_called_once_with(config)
+        mock_mark_dirty.assert_called_once_with(config)
+
+
+    def test_managed_section_keeps_sorted_order(self):
+        section = {"name": "Test Docker Section", "items": [{"title": "b"}, "junk", {"title": "D"}]}
+        managed = dashy_config.ManagedSection({}, section)
+
+        managed.upsert({"title": "a"})
+        managed.upsert({"title": "C"})
+        managed.upsert({"title": "b", "url": "new"})
+        self.assertTrue(managed.remove("D"))
+        self.assertFalse(managed.remove("missing"))
 
+        self.assertEqual([e["title"] for e in managed.items()], ["a", "b", "C"])
+        self.assertEqual(managed.get("b"), {"title": "b", "url": "new"})
+        self.assertEqual(len(section["items"]), 3)
+
+        items = managed.render()
+        self.assertIs(section["items"], items)
+        self.assertIs(managed.render(), items)
+        self.assertEqual([e["title"] for e in section["items"]], ["a", "b", "C"])
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_managed_section_is_resolved_once(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Test Docker Section", "items": []}]}
+        dashy_config.update_entry(config, {"name": "app1", "port": "1"})
+        managed = dashy_config.get_managed_section(config)
+
+        dashy_config.update_entry(config, {"name": "app2", "port": "2"})
+        self.assertIs(dashy_config.get_managed_section(config), managed)
+        self.assertEqual(len(managed), 2)
+
+        dashy_config.render_managed_section(config)
+        config["sections"][0]["items"] = []
+        self.assertIsNot(dashy_config.get_managed_section(config), managed)
+        self.assertEqual(len(dashy_config.get_managed_section(config)), 0)
 
     @patch('app.dashy_config.save_config')
-    def test_remove_entry_existing(self, mock_save_config):
+    def test_flush_config_renders_managed_section(self, mock_save_config):
+        config = {"sections": [{"name": "Test Docker Section", "items": []}]}
+        with patch.object(dashy_config, 'DASHY_FLUSH_INTERVAL_MS', 60000):
+            dashy_config.update_entry(config, {"name": "app1", "port": "1"})
+            self.assertEqual(config["sections"][0]["items"], [])
+            dashy_config.flush_config()
+
+        self.assertEqual([e["title"] for e in config["sections"][0]["items"]], ["Title-app1"])
+        mock_save_config.assert_called_once_with(config)
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_entries_from_several_hosts_go_to_per_host_sections(self, mock_mark_dirty):
+        config = {"sections": [{"name": "Other", "items": []}]}
+        with patch.object(dashy_config, 'DASHY_DOCKER_SECTION_NAME', "Docker on {docker_host}"), \
+             patch.object(dashy_config, 'DASHY_DOCKER_TITLE_TEMPLATE', "{name} ({docker_host})"):
+            dashy_config.update_entry(config, {"name": "web", "port": "80", "docker_host": "nas"})
+            dashy_config.update_entry(config, {"name": "web", "port": "81", "docker_host": "pi"})
+            dashy_config.update_entry(config, {"name": "db", "port": "5432", "docker_host": "nas"})
+            dashy_config.remove_entry(config, "web", "pi")
+            dashy_config.render_managed_section(config)
+
+            self.assertTrue(dashy_config.is_managed_section_name("Docker on nas"))
+            self.assertFalse(dashy_config.is_managed_section_name("Other"))
+
+        sections = {s["name"]: [e["title"] for e in s["items"]] for s in config["sections"]}
+        self.assertEqual(sections, {"Other": [], "Docker on nas": ["db (nas)", "web (nas)"], "Docker on pi": []})
+
+    def test_generate_entry_docker_host_placeholder(self):
+        with patch.object(dashy_config, 'DASHY_DOCKER_URL_TEMPLATE', "http://{docker_host}:{port}"):
+            entry = dashy_config.generate_entry({"name": "app", "port": "8080", "docker_host": "nas"})
+        self.assertEqual(entry["url"], "http://nas:8080")
+        self.assertEqual(entry["title"], "Title-app")
+
+    @patch('app.dashy_config.mark_dirty')
+    def test_remove_entry_existing(self, mock_mark_dirty):
         config = {"sections": [{"name": "Test Docker Section", "items": [
             {"title": "Title-app1"}, {"title": "Title-app2"}
         ]}]}
         
         dashy_config.remove_entry(config, "app1")
+        dashy_config.render_managed_section(config)
         
         section = config["sections"][0]
         self.assertEqual(len(section["items"]), 1)
         self.assertEqual(section["items"][0]["title"], "Title-app2")
-        mock_save_config.assert_called_once_with(config)
+        mock_mark_dirty.assert_called_once_with(config)
 
-    @patch('app.dashy_config.save_config')
-    def test_remove_entry_not_existing(self, mock_save_config):
+    @patch('app.dashy_config.mark_dirty')
+    def test_remove_entry_not_existing(self, mock_mark_dirty):
         config = {"sections": [{"name": "Test Docker Section", "items": [
             {"title": "Title-app2"}
         ]}]}
         
         dashy_config.remove_entry(config, "app1")
+        dashy_config.render_managed_section(config)
         
         section = config["sections"][0]
         self.assertEqual(len(section["items"]), 1)
-        mock_save_config.assert_not_called()
+        mock_mark_dirty.assert_not_called()
 
-    @patch('app.dashy_config.save_config')
-    def test_remove_entry_section_missing(self, mock_save_config):
+    @patch('app.dashy_config.mark_dirty')
+    def test_remove_entry_section_missing(self, mock_mark_dirty):
         config = {"sections": []}
         
         dashy_config.remove_entry(config, "app1")
         
         self.assertEqual(len(config["sections"]), 0)
-        mock_save_config.assert_not_called()
+        mock_mark_dirty.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -27,9 +27,261 @@ class TestDockerUtils(unittest.TestCase):
         
         client = docker_utils.get_docker_client()
         
-        mock_docker_client_constructor.assert_called_once_with(base_url=docker_utils.DOCKER_SOCKET)
+        mock_docker_client_constructor.assert_called_once_with(base_url=docker_utils.DOCKER_SOCKET, max_pool_size=docker_utils.DASHY_DOCKER_WORKERS + 1)
         self.assertEqual(client, mock_client_instance)
 
+    @patch('docker.DockerClient')
+    def test_get_docker_client_for_host(self, mock_docker_client_constructor):
+        docker_utils.get_docker_client("tcp://10.0.0.5:2375")
+        mock_docker_client_constructor.assert_called_once_with(base_url="tcp://10.0.0.5:2375", max_pool_size=docker_utils.DASHY_DOCKER_WORKERS + 1)
+
+    @patch('docker.DockerClient')
+    def test_get_docker_client_pool_matches_workers(self, mock_docker_client_constructor):
+        with patch.object(docker_utils, 'DASHY_DOCKER_WORKERS', 32):
+            docker_utils.get_docker_client()
+        self.assertEqual(mock_docker_client_constructor.call_args.kwargs["max_pool_size"], 33)
+
+    def test_get_container_infos_keeps_container_order(self):
+        import time
+        containers = [MagicMock(id=str(i), labels={"dashy": "true", "dashy.port": str(8000 + i)}) for i in range(6)]
+        for i, container in enumerate(containers):
+            container.name = f"app{i}"
+
+        def slow_first(container):
+            # The first lookups finish last, so any reordering would show.
+            time.sleep(0.01 * (6 - int(container.id)))
+            return {"name": container.name}
+
+        with patch.object(docker_utils, 'get_container_info', side_effect=slow_first):
+            infos = docker_utils.get_container_infos(containers)
+        self.assertEqual([info["name"] for info in infos], [f"app{i}" for i in range(6)])
+
+    def test_get_container_infos_runs_lookups_in_parallel(self):
+        import threading
+        barrier = threading.Barrier(2, timeout=5)
+        containers = [MagicMock(id="a"), MagicMock(id="b")]
+
+        def lookup(container):
+            # Only returns if both lookups are in flight at the same time.
+            barrier.wait()
+            return None
+
+        with patch.object(docker_utils, 'DASHY_DOCKER_WORKERS', 2), \
+             patch.object(docker_utils, 'get_container_info', side_effect=lookup):
+            self.assertEqual(docker_utils.get_container_infos(containers), [None, None])
+
+    def test_get_docker_hosts_defaults_to_docker_socket(self):
+        self.assertEqual(docker_utils.get_docker_hosts(), [("local", docker_utils.DOCKER_SOCKET)])
+
+    def test_get_docker_hosts_parses_names_and_urls(self):
+        with patch.object(docker_utils, 'DOCKER_HOSTS', "nas=tcp://10.0.0.5:2375, unix://var/run/docker.sock,tcp://pi.lan:2376,"):
+            self.assertEqual(docker_utils.get_docker_hosts(), [
+                ("nas", "tcp://10.0.0.5:2375"),
+                ("local", "unix://var/run/docker.sock"),
+                ("pi.lan", "tcp://pi.lan:2376"),
+            ])
+
+    def test_reconnect_delay_backs_off_with_jitter(self):
+        with patch.object(docker_utils.random, 'uniform', side_effect=lambda low, high: high):
+            self.assertEqual([docker_utils.reconnect_delay(a) for a in range(4)], [0.5, 1.0, 2.0, 4.0])
+            self.assertEqual(docker_utils.reconnect_delay(100), docker_utils.RECONNECT_MAX_SECONDS)
+        for attempt in range(10):
+            ceiling = min(docker_utils.RECONNECT_MAX_SECONDS, docker_utils.RECONNECT_BASE_SECONDS * 2 ** attempt)
+            self.assertTrue(ceiling / 2 <= docker_utils.reconnect_delay(attempt) <= ceiling)
+
+    def test_get_event_filters(self):
+        filters = docker_utils.get_event_filters()
+        self.assertEqual(filters, {"type": "container", "event": ["start", "die", "stop"]})
+
+        with patch.object(docker_utils, 'DASHY_DOCKER_DAEMON_FILTERS', False):
+            self.assertIsNone(docker_utils.get_event_filters())
+
+    def test_get_event_filters_swarm_mode(self):
+        with patch.object(docker_utils, 'DASHY_SWARM_MODE', True):
+            self.assertEqual(docker_utils.get_event_filters(), {"type": "service", "event": ["create", "update", "remove"]})
+            self.assertEqual(docker_utils.get_event_type(), ("service", ("create", "update", "remove")))
+        self.assertEqual(docker_utils.get_event_type()[0], "container")
+
+    def test_get_list_filters(self):
+        self.assertIsNone(docker_utils.get_list_filters())
+
+        with patch.object(docker_utils, 'DASHY_DOCKER_LABEL_FILTER', "dashy"):
+            self.assertEqual(docker_utils.get_list_filters(), {"label": "dashy"})
+
+            with patch.object(docker_utils, 'DASHY_EXPOSED_BY_DEFAULT', True):
+                self.assertIsNone(docker_utils.get_list_filters())
+
+            with patch.object(docker_utils, 'DASHY_DOCKER_DAEMON_FILTERS', False):
+                self.assertIsNone(docker_utils.get_list_filters())
+
+    def _create_event(self, action="start", attributes=None):
+        return {
+            "Type": "container",
+            "Action": action,
+            "id": "abc123",
+            "Actor": {"ID": "abc123", "Attributes": attributes if attributes is not None else {}},
+        }
+
+    def test_get_event_container_from_actor_attributes(self):
+        client = MagicMock()
+        event = self._create_event(attributes={
+            "name": "web", "image": "nginx", "exitCode": "0", "dashy": "true", "dashy.port": "8080"
+        })
+
+        container = docker_utils.get_event_container(client, event)
+
+        self.assertIsInstance(container, docker_utils.ContainerView)
+        self.assertEqual(container.id, "abc123")
+        self.assertEqual(container.name, "web")
+        self.assertEqual(container.labels, {"dashy": "true", "dashy.port": "8080"})
+        self.assertEqual(docker_utils.get_container_info(container), {"name": "web", "port": "8080"})
+        client.containers.get.assert_not_called()
+
+    def test_event_container_ports_inspected_lazily_once(self):
+        client = MagicMock()
+        client.api.inspect_container.return_value = {"NetworkSettings": {"Ports": {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8081"}]}}}
+        container = docker_utils.get_event_container(client, self._create_event(attributes={"name": "web", "dashy": "true"}))
+        client.api.inspect_container.assert_not_called()
+
+        self.assertEqual(docker_utils.get_container_port(container), "8081")
+        self.assertEqual(docker_utils.get_container_port(container), "8081")
+        client.api.inspect_container.assert_called_once_with("abc123")
+        client.containers.get.assert_not_called()
+
+    def test_event_container_ports_not_found(self):
+        client = MagicMock()
+        client.api.inspect_container.side_effect = docker_utils.docker.errors.NotFound("gone")
+        container = docker_utils.get_event_container(client, self._create_event(attributes={"name": "web"}))
+        self.assertEqual(container.ports, {})
+
+    def test_get_event_container_without_name_falls_back_to_inspect(self):
+        client = MagicMock()
+        client.api.inspect_container.return_value = {
+            "Id": "abc123",
+            "Name": "/web",
+            "State": {"Status": "running", "Pid": 42},
+            "Config": {"Labels": {"dashy": "true"}, "Env": ["PATH=/usr/bin"]},
+            "NetworkSettings": {"Ports": {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8081"}]}},
+        }
+        container = docker_utils.get_event_container(client, self._create_event())
+        client.api.inspect_container.assert_called_once_with("abc123")
+        self.assertIsInstance(container, docker_utils.ContainerView)
+        self.assertEqual((container.id, container.name, container.state), ("abc123", "web", "running"))
+        self.assertEqual(docker_utils.get_container_info(container), {"name": "web", "port": "8081"})
+
+        client.api.inspect_container.side_effect = docker_utils.docker.errors.NotFound("gone")
+        self.assertIsNone(docker_utils.get_event_container(client, self._create_event()))
+
+    def test_container_view_from_summary(self):
+        container = docker_utils.ContainerView.from_summary({
+            "Id": "abc123",
+            "Names": ["/web"],
+            "Labels": {"dashy": "true"},
+            "Ports": [
+                {"PrivatePort": 80, "PublicPort": 8080, "Type": "tcp", "IP": "0.0.0.0"},
+                {"PrivatePort": 80, "PublicPort": 8080, "Type": "tcp", "IP": "::"},
+                {"PrivatePort": 443, "Type": "tcp"},
+            ],
+        })
+
+        self.assertEqual(container.name, "web")
+        self.assertEqual(container.labels, {"dashy": "true"})
+        self.assertEqual(container.ports, {
+            "80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8080"}, {"HostIp": "::", "HostPort": "8080"}],
+            "443/tcp": None,
+        })
+        self.assertEqual(docker_utils.get_container_port(container), "8080")
+
+    def test_summary_and_inspect_pick_the_same_port(self):
+        summary = docker_utils.ContainerView.from_summary({
+            "Id": "abc123", "Names": ["/web"], "Labels": {"dashy": "true"},
+            "Ports": [
+                {"PrivatePort": 80, "PublicPort": 8080, "Type": "tcp", "IP": "0.0.0.0"},
+                {"PrivatePort": 443, "PublicPort": 8443, "Type": "tcp", "IP": "0.0.0.0"},
+            ],
+        })
+        inspected = docker_utils.ContainerView.from_inspect({
+            "Id": "abc123", "Name": "/web", "Config": {"Labels": {"dashy": "true"}},
+            "NetworkSettings": {"Ports": {
+                "443/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8443"}],
+                "80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8080"}],
+            }},
+        })
+
+        self.assertEqual(docker_utils.get_container_port(summary), docker_utils.get_container_port(inspected))
+        self.assertEqual(docker_utils.get_container_port(summary), "8443")
+
+    def test_container_view_is_a_slotted_record(self):
+        container = docker_utils.ContainerView.from_summary({"Id": "abc123", "Names": ["/web"], "State": "running"})
+        self.assertEqual(container.state, "running")
+        self.assertFalse(hasattr(container, "__dict__"))
+        with self.assertRaises(AttributeError):
+            container.attrs = {}
+
+    def test_list_containers_uses_raw_api(self):
+        client = MagicMock()
+        client.api.containers.return_value = [
+            {"Id": "abc123", "Names": ["/web"], "Labels": {"dashy": "true"}, "State": "running",
+             "Ports": [{"PrivatePort": 80, "PublicPort": 8080, "Type": "tcp", "IP": "0.0.0.0"}]},
+        ]
+
+        containers = docker_utils.list_containers(client)
+
+        client.api.containers.assert_called_once_with(filters=None)
+        client.containers.list.assert_not_called()
+        self.assertEqual([(c.name, c.state, c.labels) for c in containers], [("web", "running", {"dashy": "true"})])
+        self.assertEqual(docker_utils.get_container_info(containers[0]), {"name": "web", "port": "8080"})
+
+    def test_list_services_uses_raw_api(self):
+        client = MagicMock()
+        client.api.services.return_value = [self._service_attrs()]
+        services = docker_utils.list_services(client)
+        client.api.services.assert_called_once_with(filters=None)
+        self.assertEqual([s.name for s in services], ["stack_web"])
+
+    def _service_attrs(self, labels=None, ports=None):
+        return {
+            "ID": "svc123",
+            "Spec": {"Name": "stack_web", "Labels": labels if labels is not None else {"dashy": "true"}},
+            "Endpoint": {"Ports": ports if ports is not None else [
+                {"Protocol": "tcp", "TargetPort": 80, "PublishedPort": 8080, "PublishMode": "ingress"},
+                {"Protocol": "tcp", "TargetPort": 9100},
+            ]},
+        }
+
+    def test_service_view_from_attrs(self):
+        service = docker_utils.ServiceView.from_attrs(self._service_attrs())
+
+        self.assertEqual(service.id, "svc123")
+        self.assertEqual(service.name, "stack_web")
+        self.assertEqual(service.labels, {"dashy": "true"})
+        self.assertEqual(service.ports, {"80/tcp": [{"HostIp": "", "HostPort": "8080"}], "9100/tcp": None})
+        self.assertEqual(docker_utils.get_container_info(service), {"name": "stack_web", "port": "8080"})
+
+    def test_service_view_without_published_ports(self):
+        service = docker_utils.ServiceView.from_attrs(self._service_attrs(ports=[]))
+        self.assertEqual(service.ports, {})
+        self.assertIsNone(docker_utils.get_container_port(service))
+
+    def _service_event(self, action):
+        return {"Type": "service", "Action": action, "Actor": {"ID": "svc123", "Attributes": {"name": "stack_web"}}}
+
+    def test_get_event_service_remove_uses_event(self):
+        client = MagicMock()
+        service = docker_utils.get_event_service(client, self._service_event("remove"))
+        self.assertEqual((service.id, service.name), ("svc123", "stack_web"))
+        client.api.inspect_service.assert_not_called()
+
+    def test_get_event_service_inspects_on_update(self):
+        client = MagicMock()
+        client.api.inspect_service.return_value = self._service_attrs()
+        service = docker_utils.get_event_service(client, self._service_event("update"))
+        client.api.inspect_service.assert_called_once_with("svc123")
+        self.assertEqual(service.labels, {"dashy": "true"})
+
+        client.api.inspect_service.side_effect = docker_utils.docker.errors.NotFound("gone")
+        self.assertIsNone(docker_utils.get_event_service(client, self._service_event("create")))
+
     def _create_mock_container(self, name="test_container", labels=None, ports=None):
         container = MagicMock()
         container.name = name
@@ -110,6 +362,15 @@ class TestDockerUtils(unittest.TestCase):
             self.assertIsNotNone(info)
             self.assertEqual(info["name"], "test-skip-app-false")
 
+    def test_get_container_info_adds_routing_labels(self):
+        mock_container = MagicMock()
+        mock_container.name = "jellyfin"
+        mock_container.labels = {"dashy": "true", "dashy.port": "8096", "dashy.section": "Media", "dashy.file": "family.yml"}
+
+        with patch.object(docker_utils, 'DASHY_EXPOSED_BY_DEFAULT', False):
+            info = docker_utils.get_container_info(mock_container)
+        self.assertEqual(info, {"name": "jellyfin", "port": "8096", "section": "Media", "file": "family.yml"})
+
     @patch('app.docker_utils.get_container_port', return_value="8080")
     def test_get_container_info_ignore_label_present_value_other(self, mock_get_port):
         mock_container = MagicMock()
@@ -367,6 +628,43 @@ class TestDockerUtils(unittest.TestCase):
             self.assertEqual(info["name"], "service4")
             self.assertIsNone(info["port"])
 
+    def test_label_classifier_single_pass_decision(self):
+        classifier = docker_utils.LabelClassifier(
+            re.compile(r"^(?:dashy$|dashy\..+)"), re.compile(r"^dashy\.ignore$"), re.compile(r"^dashy\.port$"), False
+        )
+        labels = {f"com.docker.compose.label{i}": "x" for i in range(40)}
+
+        self.assertFalse(classifier.classify(labels).included)
+        decision = classifier.classify({**labels, "dashy": "true", "dashy.port": "8080"})
+        self.assertEqual((decision.included, decision.port), (True, "8080"))
+        self.assertFalse(classifier.classify({"dashy": "true", "dashy.ignore": "TRUE"}).included)
+        self.assertFalse(classifier.classify({"dashy": "false"}).included)
+
+    def test_label_classifier_caches_decisions_by_label_set(self):
+        include = MagicMock(wraps=re.compile(r"^dashy$"))
+        classifier = docker_utils.LabelClassifier(include, re.compile(r"^dashy\.ignore$"), re.compile(r"^dashy\.port$"), False)
+
+        first = classifier.classify({"dashy": "true", "other": "x"})
+        self.assertIs(classifier.classify({"other": "x", "dashy": "true"}), first)
+        self.assertEqual(include.match.call_count, 2)
+
+        classifier.classify({"dashy": "true", "other": "y"})
+        self.assertEqual(include.match.call_count, 2)
+
+    def test_get_label_classifier_follows_pattern_changes(self):
+        classifier = docker_utils.get_label_classifier()
+        self.assertIs(docker_utils.get_label_classifier(), classifier)
+
+        with patch.object(docker_utils, 'DOCKER_LABEL_PATTERN', re.compile(r"^custom$")):
+            self.assertTrue(docker_utils.get_label_classifier().classify({"custom": "1"}).included)
+        self.assertFalse(docker_utils.get_label_classifier().classify({"custom": "1"}).included)
+
+    @patch('app.docker_utils.get_container_port')
+    def test_get_container_info_uses_port_label_without_port_lookup(self, mock_get_port):
+        container = self._create_mock_container(name="web", labels={"dashy": "true", "dashy.port": "9000"})
+        self.assertEqual(docker_utils.get_container_info(container), {"name": "web", "port": "9000"})
+        mock_get_port.assert_not_called()
+
     @classmethod
     def tearDownClass(cls):
         import importlib
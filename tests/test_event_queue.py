@@ -0,0 +1,130 @@
+import unittest
+import threading
+import time
+
+from app import metrics
+from app.event_queue import EventCursor, EventQueue
+
+
+def _event(container_id, action):
+    return {"Type": "container", "Action": action, "id": container_id}
+
+
+class TestEventQueue(unittest.TestCase):
+
+    def test_keeps_latest_event_per_container_in_first_arrival_order(self):
+        events = EventQueue(docker_host="test-order")
+        events.put("a", _event("a", "start"))
+        events.put("b", _event("b", "start"))
+        events.put("a", _event("a", "die"))
+
+        self.assertEqual(events.depth, 2)
+        self.assertEqual(events.get(), _event("a", "die"))
+        self.assertEqual(events.get(), _event("b", "start"))
+        self.assertEqual(events.depth, 0)
+        self.assertEqual((events.received, events.collapsed, events.max_depth), (3, 1, 2))
+
+    def test_restart_storm_scales_with_distinct_containers(self):
+        events = EventQueue(docker_host="test-storm")
+        for _ in range(5):
+            for i in range(100):
+                events.put(str(i), _event(str(i), "start"))
+                events.put(str(i), _event(str(i), "die"))
+
+        taken = [events.get() for _ in range(events.depth)]
+        self.assertEqual(len(taken), 100)
+        self.assertTrue(all(event["Action"] == "die" for event in taken))
+        self.assertEqual(events.collapsed, 900)
+        self.assertEqual(metrics.EVENTS_COLLAPSED.value(docker_host="test-storm"), 900)
+        self.assertEqual(metrics.EVENT_QUEUE_DEPTH.value(docker_host="test-storm"), 0)
+
+    def test_event_is_held_back_for_the_window(self):
+        events = EventQueue(window_seconds=0.05)
+        put_at = time.monotonic()
+        events.put("a", _event("a", "start"))
+        events.get()
+        self.assertGreaterEqual(time.monotonic() - put_at, 0.05)
+
+    def test_event_after_get_is_queued_again(self):
+        events = EventQueue()
+        events.put("a", _event("a", "start"))
+        events.get()
+        events.put("a", _event("a", "die"))
+
+        self.assertEqual(events.get(), _event("a", "die"))
+        self.assertEqual(events.collapsed, 0)
+
+    def test_join_waits_for_task_done(self):
+        events = EventQueue()
+        events.put("a", _event("a", "start"))
+        events.put("a", _event("a", "die"))
+        done = []
+
+        def worker():
+            events.get()
+            time.sleep(0.02)
+            done.append(True)
+            events.task_done()
+
+        threading.Thread(target=worker).start()
+        events.join()
+        self.assertEqual(done, [True])
+
+
+class TestEventCursor(unittest.TestCase):
+
+    def _event(self, container_id, action, time_ns):
+        return {"Type": "container", "Action": action, "id": container_id, "Actor": {"ID": container_id}, "timeNano": time_ns}
+
+    def test_since_resumes_at_newest_event(self):
+        cursor = EventCursor()
+        self.assertIsNone(cursor.since())
+        cursor.advance(self._event("a", "start", 1_700_000_000_000_000_123))
+        self.assertEqual(cursor.since(), "1700000000.000000123")
+
+    def test_replayed_events_are_skipped(self):
+        cursor = EventCursor()
+        self.assertTrue(cursor.advance(self._event("a", "start", 100)))
+        self.assertTrue(cursor.advance(self._event("b", "start", 200)))
+        self.assertTrue(cursor.advance(self._event("c", "die", 200)))
+
+        # A stream resumed with since=200 sends everything from 200 on again.
+        self.assertEqual(cursor.resume(), "0.000000200")
+        self.assertFalse(cursor.advance(self._event("b", "start", 200)))
+        self.assertFalse(cursor.advance(self._event("c", "die", 200)))
+        self.assertFalse(cursor.advance(self._event("a", "start", 100)))
+        self.assertTrue(cursor.advance(self._event("d", "start", 200)))
+        self.assertTrue(cursor.advance(self._event("b", "die", 300)))
+        self.assertEqual(cursor.duplicates, 3)
+
+    def test_out_of_order_live_events_are_not_dropped(self):
+        cursor = EventCursor()
+        self.assertTrue(cursor.advance(self._event("a", "start", 1_000)))
+        self.assertTrue(cursor.advance(self._event("b", "die", 999)))
+        self.assertEqual(cursor.since(), "0.000001000")
+
+        # After a resume, events past the resume point end the replay window.
+        cursor.resume()
+        self.assertFalse(cursor.advance(self._event("a", "start", 1_000)))
+        self.assertTrue(cursor.advance(self._event("c", "start", 1_001)))
+        self.assertTrue(cursor.advance(self._event("d", "die", 999)))
+        self.assertTrue(cursor.advance(self._event("a", "start", 1_000)))
+        self.assertEqual(cursor.duplicates, 1)
+
+    def test_skip_to_only_moves_forward(self):
+        cursor = EventCursor()
+        cursor.advance(self._event("a", "start", 500))
+        cursor.skip_to(400)
+        self.assertEqual(cursor.time_ns, 500)
+        cursor.skip_to(1_000)
+        self.assertEqual(cursor.time_ns, 1_000)
+        self.assertTrue(cursor.advance(self._event("a", "start", 1_000)))
+
+    def test_events_without_time_are_always_new(self):
+        cursor = EventCursor()
+        self.assertTrue(cursor.advance({"Type": "container", "Action": "start", "id": "a"}))
+        self.assertTrue(cursor.advance({"Type": "container", "Action": "start", "id": "a"}))
+        self.assertIsNone(cursor.since())
+
+if __name__ == '__main__':
+    unittest.main()
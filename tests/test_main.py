@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from app import main
+from app import dashy_config
+from app import docker_utils
+from app import metrics
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.tmp_dir.name) / "conf.yml"
+        self.patches = [
+            patch.object(dashy_config, 'DASHY_CONFIG_PATH', self.config_path),
+            patch.object(dashy_config, 'DASHY_DOCKER_SECTION_NAME', "Docker"),
+            patch.object(main, 'DASHY_STATE_PATH', ""),
+            patch.object(main, 'setup_logging'),
+            patch.object(main.atexit, 'register'),
+            patch.object(metrics, '_startup_observed', False),
+        ]
+        for p in self.patches:
+            p.start()
+        dashy_config._managed_sections.clear()
+        dashy_config._serialized_cache = {}
+
+    def tearDown(self):
+        dashy_config.flush_config()
+        for p in reversed(self.patches):
+            p.stop()
+        dashy_config._managed_sections.clear()
+        self.tmp_dir.cleanup()
+
+    def test_import_does_not_load_docker_or_yaml(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, app.main; print(sorted(m for m in ('docker', 'requests', 'yaml', 'colorlog') if m in sys.modules))"],
+            capture_output=True, text=True, cwd=Path(__file__).resolve().parent.parent, check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_parse_args(self):
+        self.assertFalse(main.parse_args([]).once)
+        self.assertTrue(main.parse_args(["--once"]).once)
+        self.assertTrue(main.parse_args(["--check"]).check)
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            main.parse_args(["--once", "--check"])
+
+    def test_check_validates_without_docker(self):
+        with patch.object(docker_utils, 'get_docker_client') as get_client:
+            self.assertEqual(main.main(["--check"]), 0)
+            get_client.assert_not_called()
+        self.assertFalse(self.config_path.exists())
+
+        with patch.object(dashy_config, 'DASHY_DOCKER_TITLE_TEMPLATE', "{nme}"):
+            self.assertEqual(main.main(["--check"]), 1)
+
+    def test_check_reports_malformed_config(self):
+        self.config_path.write_text("sections:\n  - name: Docker\n    items: [\n")
+        with self.assertLogs(level="ERROR") as logs:
+            self.assertEqual(main.main(["--check"]), 1)
+        self.assertIn("is not valid YAML", "\n".join(logs.output))
+        self.assertEqual(main.main(["--once"]), 1)
+
+    def _client(self, containers):
+        client = MagicMock()
+        client.api.containers.return_value = containers
+        return client
+
+    def test_once_reconciles_every_host_and_exits(self):
+        client = self._client([
+            {"Id": "abc123", "Names": ["/web"], "Labels": {"dashy": "true", "dashy.port": "8080"}, "State": "running"},
+        ])
+        with patch.object(docker_utils, 'get_docker_hosts', return_value=[("local", "unix://var/run/docker.sock")]), \
+             patch.object(docker_utils, 'get_docker_client', return_value=client):
+            self.assertEqual(main.main(["--once"]), 0)
+
+        client.events.assert_not_called()
+        saved = yaml.safe_load(self.config_path.read_text())
+        section = next(s for s in saved["sections"] if s["name"] == "Docker")
+        self.assertEqual([item["title"] for item in section["items"]], ["web"])
+        self.assertIsNotNone(metrics.STARTUP_SECONDS.value())
+
+    def test_once_fails_when_a_host_is_unreachable(self):
+        client = self._client([])
+        hosts = [("local", "unix://var/run/docker.sock"), ("nas", "tcp://nas:2375")]
+
+        def get_client(base_url):
+            if "nas" in base_url:
+                raise docker_utils.docker.errors.DockerException("unreachable")
+            return client
+
+        with patch.object(docker_utils, 'get_docker_hosts', return_value=hosts), \
+             patch.object(docker_utils, 'get_docker_client', side_effect=get_client):
+            self.assertEqual(main.main(["--once"]), 1)
+        client.api.containers.assert_called_once()
+
+    def test_watch_host_replays_since_last_event_after_a_stream_error(self):
+        def event(container_id, time_ns):
+            return {"Type": "container", "Action": "start", "id": container_id, "Actor": {"ID": container_id}, "timeNano": time_ns}
+
+        streams = [
+            [event("a", 1_700_000_000_000_000_100), event("b", 1_700_000_000_000_000_200), docker_utils.docker.errors.APIError("broken")],
+            [event("b", 1_700_000_000_000_000_200), event("c", 1_700_000_000_000_000_300), KeyboardInterrupt()],
+        ]
+        calls = []
+
+        def events(decode, filters, since, until):
+            calls.append(since)
+            for item in streams[len(calls) - 1]:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+
+        client = MagicMock()
+        client.events.side_effect = events
+        seen = []
+        sleeps = []
+        with patch.object(docker_utils, 'get_docker_client', return_value=client), \
+             patch.object(main, 'DASHY_RESYNC_INTERVAL_SECONDS', 0), \
+             patch.object(main, 'scan_host'), \
+             patch.object(main, 'commit_startup_scan'), \
+             patch.object(main, 'is_actionable_event', side_effect=lambda host, e: seen.append(e["id"]) and False), \
+             patch.object(main.time, 'sleep', side_effect=sleeps.append):
+            with self.assertRaises(KeyboardInterrupt):
+                main.watch_host("local", "unix://var/run/docker.sock")
+
+        self.assertEqual(calls, [None, "1700000000.000000200"])
+        self.assertEqual(seen, ["a", "b", "c"])
+        self.assertEqual(len(sleeps), 1)
+        self.assertLessEqual(sleeps[0], docker_utils.RECONNECT_BASE_SECONDS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+import socket
+import time
+import urllib.error
+import urllib.request
+
+from app import metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = patch.object(metrics, '_registry', [])
+        self.registry.start()
+
+    def tearDown(self):
+        self.registry.stop()
+
+    def test_counter_render(self):
+        counter = metrics.Counter("test_events_total", "Events.", ("action",))
+        counter.inc(action="start")
+        counter.inc(2, action="die")
+        counter.inc(action="start")
+
+        self.assertEqual(counter.value(action="start"), 2)
+        self.assertEqual(metrics.render(), (
+            "# HELP test_events_total Events.\n"
+            "# TYPE test_events_total counter\n"
+            'test_events_total{action="die"} 2\n'
+            'test_events_total{action="start"} 2\n'
+        ))
+
+    def test_unlabelled_counter_renders_zero(self):
+        metrics.Counter("test_reconnects_total", "Reconnects.")
+        self.assertIn("test_reconnects_total 0\n", metrics.render())
+
+    def test_gauge_render(self):
+        gauge = metrics.Gauge("test_queue_depth", "Depth.", ("docker_host",))
+        gauge.set(5, docker_host="local")
+        gauge.set(2, docker_host="local")
+
+        self.assertEqual(gauge.value(docker_host="local"), 2)
+        self.assertEqual(metrics.render(), (
+            "# HELP test_queue_depth Depth.\n"
+            "# TYPE test_queue_depth gauge\n"
+            'test_queue_depth{docker_host="local"} 2\n'
+        ))
+
+    def test_histogram_render(self):
+        histogram = metrics.Histogram("test_seconds", "Durations.", buckets=(0.1, 1))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        self.assertEqual(histogram.count(), 3)
+        self.assertEqual(metrics.render().splitlines()[2:], [
+            'test_seconds_bucket{le="0.1"} 1',
+            'test_seconds_bucket{le="1"} 2',
+            'test_seconds_bucket{le="+Inf"} 3',
+            "test_seconds_sum 5.55",
+            "test_seconds_count 3",
+        ])
+
+    def test_label_values_are_escaped(self):
+        counter = metrics.Counter("test_total", "Test.", ("action",))
+        counter.inc(action='exec_start: sh -c "echo"')
+        self.assertIn('test_total{action="exec_start: sh -c \\"echo\\""} 1', metrics.render())
+
+    def test_observe_commit_records_event_lag(self):
+        histogram = metrics.Histogram("test_lag_seconds", "Lag.", buckets=metrics.LAG_BUCKETS)
+        with patch.object(metrics, 'EVENT_COMMIT_LAG', histogram):
+            metrics.record_pending_event(time.time_ns() - 2_000_000_000)
+            metrics.record_pending_event(None)
+            metrics.observe_commit()
+            metrics.observe_commit()
+
+        self.assertEqual(histogram.count(), 1)
+        self.assertIn('test_lag_seconds_bucket{le="1"} 0', metrics.render())
+        self.assertIn('test_lag_seconds_bucket{le="2.5"} 1', metrics.render())
+
+    def test_observe_startup_only_once(self):
+        gauge = metrics.Gauge("test_startup_seconds", "Startup.")
+        with patch.object(metrics, 'STARTUP_SECONDS', gauge), patch.object(metrics, '_startup_observed', False):
+            first = metrics.observe_startup()
+            self.assertIsNone(metrics.observe_startup())
+
+        self.assertGreaterEqual(first, 0)
+        self.assertEqual(gauge.value(), first)
+
+    def test_process_uptime_without_proc(self):
+        with patch("builtins.open", side_effect=OSError):
+            self.assertGreaterEqual(metrics.process_uptime(), 0)
+
+    def test_metrics_server(self):
+        self.assertIsNone(metrics.start_metrics_server(0))
+
+        metrics.Counter("test_total", "Test.").inc()
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = metrics.start_metrics_server(port, "127.0.0.1")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                self.assertIn("test_total 1", response.read().decode())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/other")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
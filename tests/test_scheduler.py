@@ -0,0 +1,83 @@
+import unittest
+import threading
+import time
+
+from app.scheduler import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_runs_actions_in_due_order(self):
+        scheduler = Scheduler("test")
+        ran = []
+        done = threading.Event()
+        scheduler.call_later("b", 0.04, lambda: (ran.append("b"), done.set()))
+        scheduler.call_later("a", 0.02, lambda: ran.append("a"))
+
+        self.assertEqual(scheduler.pending, 2)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(ran, ["a", "b"])
+        self.assertEqual(scheduler.pending, 0)
+
+    def test_cancelled_action_never_runs(self):
+        scheduler = Scheduler("test")
+        ran = []
+        done = threading.Event()
+        scheduler.call_later(("local", "web"), 0.02, lambda: ran.append("web"))
+        scheduler.call_later(("local", "api"), 0.04, done.set)
+
+        self.assertTrue(scheduler.cancel(("local", "web")))
+        self.assertFalse(scheduler.cancel(("local", "web")))
+        self.assertTrue(done.wait(2))
+        self.assertEqual(ran, [])
+
+    def test_keys_lists_pending_actions(self):
+        scheduler = Scheduler("test")
+        scheduler.call_later(("local", "web"), 10, lambda: None)
+        scheduler.call_later(("local", "api"), 10, lambda: None)
+        scheduler.cancel(("local", "api"))
+
+        self.assertEqual(scheduler.keys(), [("local", "web")])
+        scheduler.cancel(("local", "web"))
+
+    def test_rescheduling_a_pending_key_keeps_the_first_due_time(self):
+        scheduler = Scheduler("test")
+        ran = []
+        done = threading.Event()
+        self.assertTrue(scheduler.call_later("web", 0.02, lambda: (ran.append(1), done.set())))
+        self.assertFalse(scheduler.call_later("web", 10, lambda: ran.append(2)))
+
+        self.assertTrue(done.wait(2))
+        self.assertEqual(ran, [1])
+
+    def test_zero_delay_runs_immediately_in_caller(self):
+        scheduler = Scheduler("test")
+        ran = []
+        scheduler.call_later("web", 0, lambda: ran.append(threading.current_thread()))
+
+        self.assertEqual(ran, [threading.current_thread()])
+        self.assertIsNone(scheduler._thread)
+
+    def test_many_timers_share_one_thread(self):
+        scheduler = Scheduler("test-shared")
+        done = threading.Event()
+        for i in range(500):
+            scheduler.call_later(i, 0.01, lambda: None)
+        scheduler.call_later("last", 0.02, done.set)
+
+        self.assertTrue(done.wait(2))
+        self.assertEqual(sum(1 for t in threading.enumerate() if t.name == "test-shared"), 1)
+
+    def test_failing_action_does_not_stop_the_scheduler(self):
+        scheduler = Scheduler("test")
+        done = threading.Event()
+        scheduler.call_later("bad", 0.01, lambda: 1 / 0)
+        scheduler.call_later("good", 0.02, done.set)
+
+        with self.assertLogs(level="ERROR"):
+            self.assertTrue(done.wait(2))
+            time.sleep(0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
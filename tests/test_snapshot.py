@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+import json
+import re
+import tempfile
+from pathlib import Path
+
+from app import docker_utils
+from app import snapshot
+from app.docker_utils import ContainerView
+
+
+def _container(container_id, name, labels, host_port="8080"):
+    return ContainerView(None, container_id, name, labels, ports={"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": host_port}]})
+
+
+class TestContainerSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmp_dir.name) / "state.json"
+        self.fleet = [
+            _container("a1", "app", {"dashy": "true", "dashy.port": "9000"}),
+            _container("b1", "db", {"com.docker.compose.service": "db"}),
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_warm_restart_skips_unchanged_containers(self):
+        cold = snapshot.ContainerSnapshot(self.state_path)
+        self.assertEqual(cold.evaluate("local", self.fleet), [{"name": "app", "port": "9000"}])
+        self.assertEqual(cold.misses, 2)
+        self.assertTrue(cold.save())
+        self.assertFalse(cold.save())
+
+        warm = snapshot.ContainerSnapshot(self.state_path)
+        with patch.object(docker_utils, 'get_container_info') as mock_get_info:
+            infos = warm.evaluate("local", self.fleet)
+        mock_get_info.assert_not_called()
+        self.assertEqual(infos, [{"name": "app", "port": "9000"}])
+        self.assertEqual((warm.hits, warm.misses), (2, 0))
+        self.assertFalse(warm.save())
+
+    def test_changed_and_removed_containers(self):
+        cold = snapshot.ContainerSnapshot(self.state_path)
+        cold.evaluate("local", self.fleet)
+        cold.save()
+
+        warm = snapshot.ContainerSnapshot(self.state_path)
+        changed = [_container("a1", "app", {"dashy": "true"}, host_port="8081")]
+        self.assertEqual(warm.evaluate("local", changed), [{"name": "app", "port": "8081"}])
+        self.assertEqual((warm.hits, warm.misses), (0, 1))
+        self.assertTrue(warm.save())
+        self.assertEqual(list(json.loads(self.state_path.read_text())["hosts"]["local"]), ["a1"])
+
+    def test_label_settings_change_invalidates_snapshot(self):
+        cold = snapshot.ContainerSnapshot(self.state_path)
+        cold.evaluate("local", self.fleet)
+        cold.save()
+
+        with patch.object(docker_utils, 'DOCKER_LABEL_PATTERN', re.compile(r"^other$")):
+            warm = snapshot.ContainerSnapshot(self.state_path)
+            self.assertEqual(warm.evaluate("local", self.fleet), [])
+        self.assertEqual(warm.misses, 2)
+
+    def test_in_memory_snapshot_and_unreadable_file(self):
+        memory_only = snapshot.ContainerSnapshot(None)
+        memory_only.evaluate("local", self.fleet)
+        self.assertFalse(memory_only.save())
+
+        self.state_path.write_text("{not json")
+        self.assertEqual(snapshot.ContainerSnapshot(self.state_path).evaluate("local", self.fleet), [{"name": "app", "port": "9000"}])
+
+
+if __name__ == '__main__':
+    unittest.main()